@@ -0,0 +1,424 @@
+"""baseline_schema
+
+Revision ID: 0c2e4a6b8d10
+Revises:
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0c2e4a6b8d10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 基线：f84694c3537e 之前的核心表结构（原先由启动时的 create_all 创建）。
+# 之后的迁移在此基础上变更，因此这里保持变更前的形态：
+# - therapists 仍为 is_active 列（f84694c3537e 改为 status）
+# - 通知表（58ec6ae3b5c3）、财务表（de687e177d24）、技师评价用户表（a1f09d4f9beb）
+#   以及 rating_aggregates / therapist_ranks 由各自的迁移创建
+# - 排班、时段、预约、评价的约束和复合索引由后续迁移添加
+ENUMS = [
+    postgresql.ENUM('USER', 'THERAPIST', 'ADMIN', name='userrole', create_type=False),
+    postgresql.ENUM('BRONZE', 'SILVER', 'GOLD', 'PLATINUM', name='memberlevel', create_type=False),
+    postgresql.ENUM('PERCENTAGE', 'FIXED', name='coupontype', create_type=False),
+    postgresql.ENUM('ACTIVE', 'USED', 'EXPIRED', 'DISABLED', name='couponstatus', create_type=False),
+    postgresql.ENUM(
+        'PENDING', 'CONFIRMED', 'EN_ROUTE', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', 'REFUNDED',
+        name='bookingstatus', create_type=False,
+    ),
+    postgresql.ENUM('WECHAT', 'ALIPAY', 'APPLE_PAY', 'CARD', name='paymentmethod', create_type=False),
+    postgresql.ENUM(
+        'PENDING', 'PAID', 'REFUND_PENDING', 'REFUNDED', 'FAILED', name='paymentstatus', create_type=False,
+    ),
+]
+userrole, memberlevel, coupontype, couponstatus, bookingstatus, paymentmethod, paymentstatus = ENUMS
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for enum in ENUMS:
+        enum.create(bind)
+
+    # ==================== 用户 ====================
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('nickname', sa.String(length=50), nullable=True),
+    sa.Column('avatar', sa.String(length=500), nullable=True),
+    sa.Column('gender', sa.String(length=10), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=True),
+    sa.Column('wechat_openid', sa.String(length=100), nullable=True),
+    sa.Column('wechat_unionid', sa.String(length=100), nullable=True),
+    sa.Column('role', userrole, nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=False),
+    sa.Column('member_level', memberlevel, nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('last_login_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('wechat_openid')
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_phone'), 'users', ['phone'], unique=True)
+
+    op.create_table('addresses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('label', sa.String(length=50), nullable=False),
+    sa.Column('contact_name', sa.String(length=50), nullable=False),
+    sa.Column('contact_phone', sa.String(length=20), nullable=False),
+    sa.Column('province', sa.String(length=50), nullable=False),
+    sa.Column('city', sa.String(length=50), nullable=False),
+    sa.Column('district', sa.String(length=50), nullable=False),
+    sa.Column('street', sa.String(length=200), nullable=False),
+    sa.Column('detail', sa.String(length=200), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('is_default', sa.Boolean(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_addresses_id'), 'addresses', ['id'], unique=False)
+    op.create_index(op.f('ix_addresses_user_id'), 'addresses', ['user_id'], unique=False)
+
+    op.create_table('points_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.String(length=200), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_points_history_id'), 'points_history', ['id'], unique=False)
+    op.create_index(op.f('ix_points_history_user_id'), 'points_history', ['user_id'], unique=False)
+
+    # ==================== 服务 ====================
+    op.create_table('service_categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('name_en', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('icon', sa.String(length=200), nullable=True),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_service_categories_id'), 'service_categories', ['id'], unique=False)
+
+    op.create_table('services',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('name_en', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('short_description', sa.String(length=200), nullable=True),
+    sa.Column('image', sa.String(length=500), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('base_price', sa.Float(), nullable=False),
+    sa.Column('duration', sa.Integer(), nullable=False),
+    sa.Column('benefits', sa.JSON(), nullable=True),
+    sa.Column('includes', sa.JSON(), nullable=True),
+    sa.Column('precautions', sa.Text(), nullable=True),
+    sa.Column('booking_count', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_featured', sa.Boolean(), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['service_categories.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_services_category_id'), 'services', ['category_id'], unique=False)
+    op.create_index(op.f('ix_services_id'), 'services', ['id'], unique=False)
+
+    # ==================== 技师 ====================
+    op.create_table('therapists',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('avatar', sa.String(length=500), nullable=True),
+    sa.Column('about', sa.Text(), nullable=True),
+    sa.Column('experience_years', sa.Integer(), nullable=False),
+    sa.Column('specialties', sa.JSON(), nullable=True),
+    sa.Column('certifications', sa.JSON(), nullable=True),
+    sa.Column('video_url', sa.String(length=500), nullable=True),
+    sa.Column('video_thumbnail', sa.String(length=500), nullable=True),
+    sa.Column('gallery', sa.JSON(), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('booking_count', sa.Integer(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('base_price', sa.Float(), nullable=False),
+    sa.Column('service_areas', sa.JSON(), nullable=True),
+    sa.Column('max_distance', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=False),
+    sa.Column('is_featured', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_therapists_id'), 'therapists', ['id'], unique=False)
+    op.create_index(op.f('ix_therapists_user_id'), 'therapists', ['user_id'], unique=True)
+
+    op.create_table('therapist_services',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id']),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_therapist_services_id'), 'therapist_services', ['id'], unique=False)
+    op.create_index(op.f('ix_therapist_services_service_id'), 'therapist_services', ['service_id'], unique=False)
+    op.create_index(op.f('ix_therapist_services_therapist_id'), 'therapist_services', ['therapist_id'], unique=False)
+
+    op.create_table('therapist_schedules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('is_available', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_therapist_schedules_date'), 'therapist_schedules', ['date'], unique=False)
+    op.create_index(op.f('ix_therapist_schedules_id'), 'therapist_schedules', ['id'], unique=False)
+    op.create_index(op.f('ix_therapist_schedules_therapist_id'), 'therapist_schedules', ['therapist_id'], unique=False)
+
+    op.create_table('therapist_time_slots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('is_available', sa.Boolean(), nullable=False),
+    sa.Column('is_booked', sa.Boolean(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_therapist_time_slots_date'), 'therapist_time_slots', ['date'], unique=False)
+    op.create_index(op.f('ix_therapist_time_slots_id'), 'therapist_time_slots', ['id'], unique=False)
+    op.create_index(op.f('ix_therapist_time_slots_therapist_id'), 'therapist_time_slots', ['therapist_id'], unique=False)
+
+    op.create_table('favorites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_favorites_id'), 'favorites', ['id'], unique=False)
+    op.create_index(op.f('ix_favorites_therapist_id'), 'favorites', ['therapist_id'], unique=False)
+    op.create_index(op.f('ix_favorites_user_id'), 'favorites', ['user_id'], unique=False)
+
+    # ==================== 优惠券 ====================
+    op.create_table('coupon_templates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('coupon_type', coupontype, nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('min_order_amount', sa.Float(), nullable=False),
+    sa.Column('max_discount', sa.Float(), nullable=True),
+    sa.Column('applicable_services', sa.Text(), nullable=True),
+    sa.Column('applicable_therapists', sa.Text(), nullable=True),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('issued_count', sa.Integer(), nullable=False),
+    sa.Column('per_user_limit', sa.Integer(), nullable=False),
+    sa.Column('valid_start', sa.DateTime(), nullable=False),
+    sa.Column('valid_end', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_coupon_templates_code'), 'coupon_templates', ['code'], unique=True)
+    op.create_index(op.f('ix_coupon_templates_id'), 'coupon_templates', ['id'], unique=False)
+
+    op.create_table('user_coupons',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('coupon_type', coupontype, nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('min_order_amount', sa.Float(), nullable=False),
+    sa.Column('max_discount', sa.Float(), nullable=True),
+    sa.Column('valid_start', sa.DateTime(), nullable=False),
+    sa.Column('valid_end', sa.DateTime(), nullable=False),
+    sa.Column('status', couponstatus, nullable=False),
+    sa.Column('used_at', sa.DateTime(), nullable=True),
+    sa.Column('used_order_id', sa.Integer(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_coupons_code'), 'user_coupons', ['code'], unique=False)
+    op.create_index(op.f('ix_user_coupons_id'), 'user_coupons', ['id'], unique=False)
+    op.create_index(op.f('ix_user_coupons_template_id'), 'user_coupons', ['template_id'], unique=False)
+    op.create_index(op.f('ix_user_coupons_user_id'), 'user_coupons', ['user_id'], unique=False)
+
+    # ==================== 预约与订单 ====================
+    op.create_table('bookings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('booking_no', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('address_id', sa.Integer(), nullable=False),
+    sa.Column('booking_date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('duration', sa.Integer(), nullable=False),
+    sa.Column('service_price', sa.Float(), nullable=False),
+    sa.Column('discount_amount', sa.Float(), nullable=False),
+    sa.Column('points_used', sa.Integer(), nullable=False),
+    sa.Column('points_deduction', sa.Float(), nullable=False),
+    sa.Column('coupon_id', sa.Integer(), nullable=True),
+    sa.Column('coupon_deduction', sa.Float(), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('status', bookingstatus, nullable=False),
+    sa.Column('user_note', sa.Text(), nullable=True),
+    sa.Column('therapist_note', sa.Text(), nullable=True),
+    sa.Column('cancel_reason', sa.Text(), nullable=True),
+    sa.Column('cancelled_by', sa.String(length=20), nullable=True),
+    sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+    sa.Column('therapist_arrived_at', sa.DateTime(), nullable=True),
+    sa.Column('service_started_at', sa.DateTime(), nullable=True),
+    sa.Column('service_completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['address_id'], ['addresses.id']),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id']),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bookings_address_id'), 'bookings', ['address_id'], unique=False)
+    op.create_index(op.f('ix_bookings_booking_date'), 'bookings', ['booking_date'], unique=False)
+    op.create_index(op.f('ix_bookings_booking_no'), 'bookings', ['booking_no'], unique=True)
+    op.create_index(op.f('ix_bookings_id'), 'bookings', ['id'], unique=False)
+    op.create_index(op.f('ix_bookings_service_id'), 'bookings', ['service_id'], unique=False)
+    op.create_index(op.f('ix_bookings_therapist_id'), 'bookings', ['therapist_id'], unique=False)
+    op.create_index(op.f('ix_bookings_user_id'), 'bookings', ['user_id'], unique=False)
+
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_no', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('paid_amount', sa.Float(), nullable=False),
+    sa.Column('refund_amount', sa.Float(), nullable=False),
+    sa.Column('payment_method', paymentmethod, nullable=True),
+    sa.Column('payment_status', paymentstatus, nullable=False),
+    sa.Column('transaction_id', sa.String(length=100), nullable=True),
+    sa.Column('payment_time', sa.DateTime(), nullable=True),
+    sa.Column('refund_no', sa.String(length=50), nullable=True),
+    sa.Column('refund_reason', sa.Text(), nullable=True),
+    sa.Column('refund_time', sa.DateTime(), nullable=True),
+    sa.Column('invoice_requested', sa.Boolean(), nullable=False),
+    sa.Column('invoice_type', sa.String(length=20), nullable=True),
+    sa.Column('invoice_title', sa.String(length=200), nullable=True),
+    sa.Column('invoice_tax_id', sa.String(length=50), nullable=True),
+    sa.Column('invoice_email', sa.String(length=100), nullable=True),
+    sa.Column('invoice_no', sa.String(length=50), nullable=True),
+    sa.Column('invoice_issued_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id']),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_orders_booking_id'), 'orders', ['booking_id'], unique=True)
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+    op.create_index(op.f('ix_orders_order_no'), 'orders', ['order_no'], unique=True)
+    op.create_index(op.f('ix_orders_user_id'), 'orders', ['user_id'], unique=False)
+
+    # ==================== 评价 ====================
+    op.create_table('reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('skill_rating', sa.Integer(), nullable=True),
+    sa.Column('attitude_rating', sa.Integer(), nullable=True),
+    sa.Column('punctuality_rating', sa.Integer(), nullable=True),
+    sa.Column('tip_amount', sa.Float(), nullable=False),
+    sa.Column('is_anonymous', sa.Boolean(), nullable=False),
+    sa.Column('is_visible', sa.Boolean(), nullable=False),
+    sa.Column('reply_content', sa.Text(), nullable=True),
+    sa.Column('reply_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id']),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id']),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reviews_booking_id'), 'reviews', ['booking_id'], unique=True)
+    op.create_index(op.f('ix_reviews_id'), 'reviews', ['id'], unique=False)
+    op.create_index(op.f('ix_reviews_service_id'), 'reviews', ['service_id'], unique=False)
+    op.create_index(op.f('ix_reviews_therapist_id'), 'reviews', ['therapist_id'], unique=False)
+    op.create_index(op.f('ix_reviews_user_id'), 'reviews', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('reviews')
+    op.drop_table('orders')
+    op.drop_table('bookings')
+    op.drop_table('user_coupons')
+    op.drop_table('coupon_templates')
+    op.drop_table('favorites')
+    op.drop_table('therapist_time_slots')
+    op.drop_table('therapist_schedules')
+    op.drop_table('therapist_services')
+    op.drop_table('therapists')
+    op.drop_table('services')
+    op.drop_table('service_categories')
+    op.drop_table('points_history')
+    op.drop_table('addresses')
+    op.drop_table('users')
+
+    bind = op.get_bind()
+    for enum in reversed(ENUMS):
+        enum.drop(bind)
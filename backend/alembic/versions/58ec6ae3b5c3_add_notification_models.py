@@ -19,26 +19,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_index('ix_notifications_created_at', table_name='notifications')
-    op.drop_index('ix_notifications_id', table_name='notifications')
-    op.drop_index('ix_notifications_sent_at', table_name='notifications')
-    op.drop_index('ix_notifications_status', table_name='notifications')
-    op.drop_index('ix_notifications_therapist_id', table_name='notifications')
-    op.drop_index('ix_notifications_type', table_name='notifications')
-    op.drop_table('notifications')
-    op.drop_index('ix_push_tokens_expo_push_token', table_name='push_tokens')
-    op.drop_index('ix_push_tokens_id', table_name='push_tokens')
-    op.drop_index('ix_push_tokens_therapist_id', table_name='push_tokens')
-    op.drop_table('push_tokens')
-    op.drop_index('ix_therapist_notification_settings_id', table_name='therapist_notification_settings')
-    op.drop_index('ix_therapist_notification_settings_therapist_id', table_name='therapist_notification_settings')
-    op.drop_table('therapist_notification_settings')
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
+    # 自动生成时模型未被导入，生成的语句方向相反（删除通知表）；这里按通知模型创建表
+    # （notificationtype 的 BOOKING_REMINDER 由 d5f1b3a8c902 添加）
     op.create_table('therapist_notification_settings',
     sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
     sa.Column('therapist_id', sa.INTEGER(), autoincrement=False, nullable=False),
@@ -99,5 +81,22 @@ def downgrade() -> None:
     op.create_index('ix_notifications_sent_at', 'notifications', ['sent_at'], unique=False)
     op.create_index('ix_notifications_id', 'notifications', ['id'], unique=False)
     op.create_index('ix_notifications_created_at', 'notifications', ['created_at'], unique=False)
-    # ### end Alembic commands ###
 
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_created_at', table_name='notifications')
+    op.drop_index('ix_notifications_id', table_name='notifications')
+    op.drop_index('ix_notifications_sent_at', table_name='notifications')
+    op.drop_index('ix_notifications_status', table_name='notifications')
+    op.drop_index('ix_notifications_therapist_id', table_name='notifications')
+    op.drop_index('ix_notifications_type', table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_index('ix_push_tokens_expo_push_token', table_name='push_tokens')
+    op.drop_index('ix_push_tokens_id', table_name='push_tokens')
+    op.drop_index('ix_push_tokens_therapist_id', table_name='push_tokens')
+    op.drop_table('push_tokens')
+    op.drop_index('ix_therapist_notification_settings_id', table_name='therapist_notification_settings')
+    op.drop_index('ix_therapist_notification_settings_therapist_id', table_name='therapist_notification_settings')
+    op.drop_table('therapist_notification_settings')
+    for name in ('notificationtype', 'notificationpriority', 'notificationstatus'):
+        postgresql.ENUM(name=name).drop(op.get_bind())
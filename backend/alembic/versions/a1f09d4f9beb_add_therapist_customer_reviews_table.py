@@ -20,12 +20,29 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    pass
+    op.create_table('therapist_customer_reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('private_note', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id']),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_therapist_customer_reviews_booking_id'), 'therapist_customer_reviews', ['booking_id'], unique=True)
+    op.create_index(op.f('ix_therapist_customer_reviews_id'), 'therapist_customer_reviews', ['id'], unique=False)
+    op.create_index(op.f('ix_therapist_customer_reviews_therapist_id'), 'therapist_customer_reviews', ['therapist_id'], unique=False)
+    op.create_index(op.f('ix_therapist_customer_reviews_user_id'), 'therapist_customer_reviews', ['user_id'], unique=False)
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    pass
+    op.drop_table('therapist_customer_reviews')
     # ### end Alembic commands ###
-
@@ -0,0 +1,39 @@
+"""add_rating_aggregates
+
+Revision ID: a8c3f5e1d724
+Revises: f2b7d4e91a06
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c3f5e1d724'
+down_revision: Union[str, None] = 'f2b7d4e91a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 数据由定时任务 recompute_rating_aggregates 首次运行时回填
+    op.create_table(
+        'rating_aggregates',
+        sa.Column('subject_type', sa.Enum('THERAPIST', 'SERVICE', name='ratingsubject'), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('star_1', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('star_2', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('star_3', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('star_4', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('star_5', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('subject_type', 'subject_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rating_aggregates')
+    sa.Enum(name='ratingsubject').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,33 @@
+"""add_reviews_keyset_index
+
+Revision ID: b4e9d2c7f351
+Revises: a8c3f5e1d724
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e9d2c7f351'
+down_revision: Union[str, None] = 'a8c3f5e1d724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 复合索引以 therapist_id 开头，替代原单列索引
+    op.create_index(
+        'ix_reviews_therapist_id_is_visible_created_at_id',
+        'reviews',
+        ['therapist_id', 'is_visible', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.drop_index('ix_reviews_therapist_id', table_name='reviews')
+
+
+def downgrade() -> None:
+    op.create_index('ix_reviews_therapist_id', 'reviews', ['therapist_id'])
+    op.drop_index('ix_reviews_therapist_id_is_visible_created_at_id', table_name='reviews')
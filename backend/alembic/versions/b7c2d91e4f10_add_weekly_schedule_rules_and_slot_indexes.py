@@ -0,0 +1,62 @@
+"""add_weekly_schedule_rules_and_slot_indexes
+
+Revision ID: b7c2d91e4f10
+Revises: a1f09d4f9beb
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2d91e4f10'
+down_revision: Union[str, None] = 'a1f09d4f9beb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 排班表：支持每周规则（weekday）与指定日期例外（date）
+    op.add_column('therapist_schedules', sa.Column('weekday', sa.SmallInteger(), nullable=True))
+    op.alter_column('therapist_schedules', 'date', existing_type=sa.Date(), nullable=True)
+    op.create_check_constraint(
+        'ck_therapist_schedules_weekday_or_date',
+        'therapist_schedules',
+        '(weekday IS NULL) <> (date IS NULL)',
+    )
+
+    # 时段表：同一技师同一天同一开始时间只有一行（预生成任务依赖 ON CONFLICT DO NOTHING）
+    # 重复行只保留一行：优先保留已预约的行，其次 ID 最小的行。预约与时段的关联保存在时段行的 booking_id 上
+    # （bookings 表没有指向时段的列），被删除的重复行不需要改写其他表；占用判断以 bookings 表为准
+    op.execute("""
+        DELETE FROM therapist_time_slots a
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY therapist_id, date, start_time
+                ORDER BY is_booked DESC, id
+            ) AS rn
+            FROM therapist_time_slots
+        ) ranked
+        WHERE a.id = ranked.id
+          AND ranked.rn > 1
+    """)
+    op.create_unique_constraint(
+        'uq_therapist_time_slots_therapist_date_start',
+        'therapist_time_slots',
+        ['therapist_id', 'date', 'start_time'],
+    )
+
+    # 预约表：按技师 + 日期查询占用区间
+    op.create_index('ix_bookings_therapist_id_booking_date', 'bookings', ['therapist_id', 'booking_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_therapist_id_booking_date', table_name='bookings')
+    op.drop_constraint('uq_therapist_time_slots_therapist_date_start', 'therapist_time_slots', type_='unique')
+    op.drop_constraint('ck_therapist_schedules_weekday_or_date', 'therapist_schedules', type_='check')
+    op.execute("DELETE FROM therapist_schedules WHERE date IS NULL")
+    op.alter_column('therapist_schedules', 'date', existing_type=sa.Date(), nullable=False)
+    op.drop_column('therapist_schedules', 'weekday')
@@ -0,0 +1,50 @@
+"""add_booking_interval_exclusion_constraint
+
+Revision ID: c3e8a5f27b61
+Revises: b7c2d91e4f10
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a5f27b61'
+down_revision: Union[str, None] = 'b7c2d91e4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    # 预约占用区间 [开始, 开始 + 服务时长)
+    op.add_column('bookings', sa.Column(
+        'during',
+        postgresql.TSRANGE(),
+        sa.Computed(
+            "tsrange(booking_date + start_time, booking_date + start_time + duration * interval '1 minute', '[)')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+
+    # 同一技师未取消的预约区间不能重叠；已有重叠数据需先人工处理，否则此处会失败
+    op.create_exclude_constraint(
+        'ex_bookings_therapist_during',
+        'bookings',
+        ('therapist_id', '='),
+        ('during', '&&'),
+        using='gist',
+        where="status NOT IN ('CANCELLED', 'REFUNDED')",
+    )
+
+
+def downgrade() -> None:
+    # alembic 的 drop_constraint 不支持 type_='exclude'，不指定类型即按名称删除
+    op.drop_constraint('ex_bookings_therapist_during', 'bookings')
+    op.drop_column('bookings', 'during')
@@ -0,0 +1,41 @@
+"""add_therapist_ranks
+
+Revision ID: c6f1a9b3e482
+Revises: b4e9d2c7f351
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f1a9b3e482'
+down_revision: Union[str, None] = 'b4e9d2c7f351'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 数据由定时任务 refresh_therapist_ranks 首次运行时生成
+    op.create_table(
+        'therapist_ranks',
+        sa.Column('therapist_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('rating', sa.Float(), nullable=False),
+        sa.Column('review_count', sa.Integer(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('acceptance_rate', sa.Float(), nullable=False),
+        sa.Column('open_slots', sa.Integer(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('therapist_id'),
+    )
+    op.create_index('ix_therapist_ranks_score_therapist_id', 'therapist_ranks', ['score', 'therapist_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_therapist_ranks_score_therapist_id', table_name='therapist_ranks')
+    op.drop_table('therapist_ranks')
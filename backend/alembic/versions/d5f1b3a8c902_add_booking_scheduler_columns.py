@@ -0,0 +1,39 @@
+"""add_booking_scheduler_columns
+
+Revision ID: d5f1b3a8c902
+Revises: c3e8a5f27b61
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1b3a8c902'
+down_revision: Union[str, None] = 'c3e8a5f27b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('bookings', sa.Column('reminder_sent_at', sa.DateTime(), nullable=True))
+
+    # 定时任务按状态 + 开始时间批量扫描
+    op.create_index(
+        'ix_bookings_status_booking_date_start_time',
+        'bookings',
+        ['status', 'booking_date', 'start_time'],
+    )
+
+    # 新增通知类型（ALTER TYPE ... ADD VALUE 不能在事务内使用新值，单独提交）
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE notificationtype ADD VALUE IF NOT EXISTS 'BOOKING_REMINDER'")
+
+
+def downgrade() -> None:
+    # PostgreSQL 不支持删除枚举值，保留 BOOKING_REMINDER
+    op.drop_index('ix_bookings_status_booking_date_start_time', table_name='bookings')
+    op.drop_column('bookings', 'reminder_sent_at')
@@ -20,12 +20,59 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    pass
+    op.create_table('therapist_balances',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('total_income', sa.Float(), nullable=False),
+    sa.Column('frozen_amount', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_therapist_balances_id'), 'therapist_balances', ['id'], unique=False)
+    op.create_index(op.f('ix_therapist_balances_therapist_id'), 'therapist_balances', ['therapist_id'], unique=True)
+    op.create_table('withdrawals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'APPROVED', 'REJECTED', 'PAID', name='withdrawalstatus'), nullable=False),
+    sa.Column('account_type', sa.String(length=20), nullable=False),
+    sa.Column('account_name', sa.String(length=100), nullable=False),
+    sa.Column('account_no', sa.String(length=100), nullable=False),
+    sa.Column('bank_name', sa.String(length=100), nullable=True),
+    sa.Column('remark', sa.Text(), nullable=True),
+    sa.Column('admin_note', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_withdrawals_id'), 'withdrawals', ['id'], unique=False)
+    op.create_index(op.f('ix_withdrawals_therapist_id'), 'withdrawals', ['therapist_id'], unique=False)
+    op.create_table('transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('therapist_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.Enum('INCOME', 'WITHDRAWAL', 'REFUND', 'ADJUSTMENT', name='transactiontype'), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('balance_after', sa.Float(), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('reference_id', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['therapist_id'], ['therapists.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_transactions_id'), 'transactions', ['id'], unique=False)
+    op.create_index(op.f('ix_transactions_therapist_id'), 'transactions', ['therapist_id'], unique=False)
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    pass
+    op.drop_table('transactions')
+    op.drop_table('withdrawals')
+    op.drop_table('therapist_balances')
+    sa.Enum(name='transactiontype').drop(op.get_bind())
+    sa.Enum(name='withdrawalstatus').drop(op.get_bind())
     # ### end Alembic commands ###
-
@@ -0,0 +1,31 @@
+"""store_midnight_slot_end_as_zero
+
+Revision ID: e1a7c3b5d924
+Revises: c6f1a9b3e482
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c3b5d924'
+down_revision: Union[str, None] = 'c6f1a9b3e482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 到 24:00 结束的时段原先被截断为 23:59，按分钟区间计算时少一分钟，无法覆盖到 24:00 的预约；
+    # 统一记为 00:00（结束时间不晚于开始时间即视为当天 24:00）
+    op.execute("UPDATE therapist_time_slots SET end_time = '00:00' WHERE end_time = '23:59'")
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE therapist_time_slots SET end_time = '23:59' "
+        "WHERE end_time = '00:00' AND start_time > '00:00'"
+    )
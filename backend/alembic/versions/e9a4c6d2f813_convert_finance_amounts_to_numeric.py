@@ -0,0 +1,57 @@
+"""convert_finance_amounts_to_numeric
+
+Revision ID: e9a4c6d2f813
+Revises: d5f1b3a8c902
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a4c6d2f813'
+down_revision: Union[str, None] = 'd5f1b3a8c902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+AMOUNT_COLUMNS = [
+    ('therapist_balances', 'balance'),
+    ('therapist_balances', 'total_income'),
+    ('therapist_balances', 'frozen_amount'),
+    ('withdrawals', 'amount'),
+    ('transactions', 'amount'),
+    ('transactions', 'balance_after'),
+]
+
+
+def upgrade() -> None:
+    # 金额字段 Float -> Numeric(12, 2)，按分四舍五入
+    for table, column in AMOUNT_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.Float(),
+            type_=sa.Numeric(12, 2),
+            postgresql_using=f'round({column}::numeric, 2)',
+        )
+
+    # 流水幂等键
+    op.add_column('transactions', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_unique_constraint('transactions_idempotency_key_key', 'transactions', ['idempotency_key'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('transactions_idempotency_key_key', 'transactions', type_='unique')
+    op.drop_column('transactions', 'idempotency_key')
+    for table, column in AMOUNT_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.Numeric(12, 2),
+            type_=sa.Float(),
+            postgresql_using=f'{column}::double precision',
+        )
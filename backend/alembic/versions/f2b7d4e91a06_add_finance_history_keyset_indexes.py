@@ -0,0 +1,41 @@
+"""add_finance_history_keyset_indexes
+
+Revision ID: f2b7d4e91a06
+Revises: e9a4c6d2f813
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7d4e91a06'
+down_revision: Union[str, None] = 'e9a4c6d2f813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 复合索引以 therapist_id 开头，替代原单列索引
+    op.create_index(
+        'ix_withdrawals_therapist_id_created_at_id',
+        'withdrawals',
+        ['therapist_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.drop_index('ix_withdrawals_therapist_id', table_name='withdrawals')
+    op.create_index(
+        'ix_transactions_therapist_id_created_at_id',
+        'transactions',
+        ['therapist_id', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    op.drop_index('ix_transactions_therapist_id', table_name='transactions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_transactions_therapist_id', 'transactions', ['therapist_id'])
+    op.drop_index('ix_transactions_therapist_id_created_at_id', table_name='transactions')
+    op.create_index('ix_withdrawals_therapist_id', 'withdrawals', ['therapist_id'])
+    op.drop_index('ix_withdrawals_therapist_id_created_at_id', table_name='withdrawals')
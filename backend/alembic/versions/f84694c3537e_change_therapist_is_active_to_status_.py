@@ -1,7 +1,7 @@
 """change_therapist_is_active_to_status_enum
 
 Revision ID: f84694c3537e
-Revises: 
+Revises: 0c2e4a6b8d10
 Create Date: 2025-12-26 08:16:33.176808
 
 """
@@ -9,19 +9,23 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
 revision: str = 'f84694c3537e'
-down_revision: Union[str, None] = None
+down_revision: Union[str, None] = '0c2e4a6b8d10'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+therapiststatus = postgresql.ENUM('ONLINE', 'BUSY', 'OFFLINE', name='therapiststatus', create_type=False)
+
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    # 步骤 1: 添加新的 status 列（先设置为可空）
-    op.add_column('therapists', sa.Column('status', sa.Enum('ONLINE', 'BUSY', 'OFFLINE', name='therapiststatus'), nullable=True))
+    # 步骤 1: 添加新的 status 列（先设置为可空；add_column 不会自动创建枚举类型）
+    therapiststatus.create(op.get_bind())
+    op.add_column('therapists', sa.Column('status', therapiststatus, nullable=True))
     
     # 步骤 2: 迁移数据 - 将所有技师设置为 offline（安全的默认值）
     # 注意：即使 is_active=true，也设置为 offline，让技师登录后主动上线
@@ -59,5 +63,6 @@ def downgrade() -> None:
     
     # 步骤 4: 删除 status 列
     op.drop_column('therapists', 'status')
+    therapiststatus.drop(op.get_bind())
     # ### end Alembic commands ###
 
@@ -7,8 +7,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, release_connection
 from app.core.security import verify_token
+from app.core.token_revocation import revocation_store
 from app.models.user import User
 from app.models.therapist import Therapist
 
@@ -16,6 +17,15 @@ from app.models.therapist import Therapist
 security = HTTPBearer()
 
 
+async def is_token_revoked(token_data: dict) -> bool:
+    """检查已解码的 Token 是否被吊销（布隆过滤器前置，正常 Token 不访问 Redis）"""
+    return await revocation_store.is_revoked(
+        token_data.get("jti"),
+        int(token_data["user_id"]),
+        token_data.get("iat"),
+    )
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -36,7 +46,7 @@ async def get_current_user(
     token = credentials.credentials
     token_data = verify_token(token, "access")
     
-    if not token_data:
+    if not token_data or await is_token_revoked(token_data):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
@@ -64,6 +74,8 @@ async def get_current_user(
             detail="User is inactive"
         )
     
+    # 认证查询结束即归还连接，handler 中的查询/写入按需重新获取
+    await release_connection(db)
     return user
 
 
@@ -82,7 +94,7 @@ async def get_current_user_optional(
     token = credentials.credentials
     token_data = verify_token(token, "access")
     
-    if not token_data:
+    if not token_data or await is_token_revoked(token_data):
         return None
     
     user_id = token_data.get("user_id")
@@ -91,6 +103,7 @@ async def get_current_user_optional(
         select(User).where(User.id == int(user_id))
     )
     user = result.scalar_one_or_none()
+    await release_connection(db)
     
     return user if user and user.is_active else None
 
@@ -141,5 +154,6 @@ async def get_current_therapist(
             detail="技师档案不存在"
         )
     
+    await release_connection(db)
     return therapist
 
@@ -1,28 +1,37 @@
 """
 API v1 路由
-"""
-from fastapi import APIRouter
 
-from app.api.v1 import auth, therapist_auth, therapist_orders, therapist_income, notifications, users, services, therapists, bookings, upload, finance, therapist_customer_reviews
+各模块路由直接注册到应用（不经过中间的 APIRouter 聚合）：FastAPI 每次 include_router
+都会重新构建一遍路由对象，少一层聚合即少一轮构建，缩短启动时间。
+"""
+from fastapi import FastAPI
 
-api_router = APIRouter()
+from app.api.v1 import auth, therapist_auth, therapist_orders, therapist_income, notifications, users, services, therapists, bookings, reviews, upload, finance, therapist_customer_reviews
 
-# C端（客户端）路由
-api_router.include_router(auth.router, prefix="/auth", tags=["认证-客户端"])
-api_router.include_router(users.router, prefix="/users", tags=["用户"])
-api_router.include_router(services.router, prefix="/services", tags=["服务"])
-api_router.include_router(therapists.router, prefix="/therapists", tags=["治疗师"])
-api_router.include_router(bookings.router, prefix="/bookings", tags=["预约"])
+# (路由, 路径前缀, 标签)
+ROUTERS = [
+    # C端（客户端）路由
+    (auth.router, "/auth", ["认证-客户端"]),
+    (users.router, "/users", ["用户"]),
+    (services.router, "/services", ["服务"]),
+    (therapists.router, "/therapists", ["治疗师"]),
+    (bookings.router, "/bookings", ["预约"]),
+    (reviews.router, "/reviews", ["评价"]),
 
-# B端（技师端）路由
-api_router.include_router(therapist_auth.router, prefix="/therapist/auth", tags=["认证-技师端"])
-api_router.include_router(therapist_orders.router, prefix="/therapist", tags=["订单-技师端"])
-api_router.include_router(therapist_income.router, prefix="/therapist/income", tags=["收入-技师端"])
-api_router.include_router(notifications.router, prefix="/therapist/notifications", tags=["通知-技师端"])
-api_router.include_router(finance.router, prefix="/therapist/finance", tags=["财务-技师端"])
-api_router.include_router(therapist_customer_reviews.router, prefix="/therapist", tags=["客户评价-技师端"])
+    # B端（技师端）路由
+    (therapist_auth.router, "/therapist/auth", ["认证-技师端"]),
+    (therapist_orders.router, "/therapist", ["订单-技师端"]),
+    (therapist_income.router, "/therapist/income", ["收入-技师端"]),
+    (notifications.router, "/therapist/notifications", ["通知-技师端"]),
+    (finance.router, "/therapist/finance", ["财务-技师端"]),
+    (therapist_customer_reviews.router, "/therapist", ["客户评价-技师端"]),
 
-# 通用路由
-api_router.include_router(upload.router, prefix="/upload", tags=["文件上传"])
+    # 通用路由
+    (upload.router, "/upload", ["文件上传"]),
+]
 
 
+def include_api_routes(app: FastAPI, prefix: str):
+    """将 v1 的所有路由注册到应用"""
+    for router, router_prefix, tags in ROUTERS:
+        app.include_router(router, prefix=prefix + router_prefix, tags=tags)
@@ -6,11 +6,13 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from loguru import logger
 
 from app.core.database import get_db
 from app.core.security import create_access_token, create_refresh_token, verify_token
 from app.core.config import settings
 from app.models.user import User
+from app.api.deps import is_token_revoked
 from app.schemas.auth import (
     SMSCodeRequest, 
     SMSCodeResponse,
@@ -53,7 +55,7 @@ async def send_sms_code(request: SMSCodeRequest):
     
     # 开发环境打印验证码
     if settings.DEBUG:
-        print(f"[DEBUG] 验证码: {phone} -> {code}")
+        logger.info("[DEBUG] 验证码: {} -> {}", phone, code)
     
     return SMSCodeResponse(message="验证码已发送")
 
@@ -140,7 +142,7 @@ async def refresh_token(
     """
     user_id = verify_token(request.refresh_token, "refresh")
     
-    if not user_id:
+    if not user_id or (isinstance(user_id, dict) and await is_token_revoked(user_id)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
@@ -1,21 +1,28 @@
 """
 财务相关 API 端点
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+import csv
+import io
 from datetime import datetime
+from decimal import Decimal
+from typing import List, Literal, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db, get_primary_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_paginate, split_page
 from app.api.deps import get_current_therapist
 from app.models.therapist import Therapist
 from app.models.finance import (
     TherapistBalance, 
     Withdrawal, 
     Transaction, 
-    WithdrawalStatus,
-    TransactionType
+    TransactionType,
+    WithdrawalStatus
 )
 from app.schemas.finance import (
     TherapistBalanceResponse,
@@ -23,6 +30,7 @@ from app.schemas.finance import (
     WithdrawalResponse,
     TransactionResponse
 )
+from app.services.ledger import Ledger, InsufficientBalance, DuplicateOperation, client_idempotency_key
 
 router = APIRouter()
 
@@ -44,9 +52,9 @@ async def get_balance(
         # 自动初始化
         balance_obj = TherapistBalance(
             therapist_id=current_therapist.id,
-            balance=0.0,
-            total_income=0.0,
-            frozen_amount=0.0
+            balance=Decimal("0"),
+            total_income=Decimal("0"),
+            frozen_amount=Decimal("0")
         )
         db.add(balance_obj)
         await db.commit()
@@ -58,38 +66,52 @@ async def get_balance(
 @router.post("/withdrawals", response_model=WithdrawalResponse, summary="申请提现")
 async def create_withdrawal(
     request: WithdrawalCreateRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     current_therapist: Therapist = Depends(get_current_therapist),
     db: AsyncSession = Depends(get_db)
 ):
     """
     提交提现申请
-    """
-    # 1. 检查余额是否充足
-    result = await db.execute(
-        select(TherapistBalance).where(TherapistBalance.therapist_id == current_therapist.id)
-    )
-    balance_obj = result.scalar_one_or_none()
     
-    if not balance_obj:
-        # 应该不太可能发生，因为通常先查询余额
-        balance_obj = TherapistBalance(therapist_id=current_therapist.id)
-        db.add(balance_obj)
-        await db.commit()
+    - 可用余额转入冻结金额，余额检查与扣减在同一条语句中完成
+    - 携带 Idempotency-Key 请求头时，重复提交返回第一次创建的提现申请
+    """
+    # 1. 预先分配提现申请ID，流水的 reference_id 直接引用，无需提交后回填
+    withdrawal_id = (await db.execute(
+        select(func.nextval(func.pg_get_serial_sequence("withdrawals", "id")))
+    )).scalar_one()
     
-    if balance_obj.balance < request.amount:
+    # 2. 扣除余额，增加冻结金额，追加提现流水
+    try:
+        entry = await Ledger(db).freeze_for_withdrawal(
+            current_therapist.id,
+            request.amount,
+            description=f"申请提现到 {request.account_type}",
+            reference_id=str(withdrawal_id),
+            idempotency_key=(
+                client_idempotency_key("withdrawal", current_therapist.id, idempotency_key)
+                if idempotency_key else None
+            )
+        )
+    except InsufficientBalance:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="余额不足"
         )
-        
-    # 2. 扣除余额，增加冻结金额
-    balance_obj.balance -= request.amount
-    balance_obj.frozen_amount += request.amount
+    except DuplicateOperation as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    if entry.replayed:
+        result = await db.execute(
+            select(Withdrawal).where(Withdrawal.id == int(entry.reference_id))
+        )
+        return result.scalar_one()
     
     # 3. 创建提现记录
     withdrawal = Withdrawal(
+        id=withdrawal_id,
         therapist_id=current_therapist.id,
-        amount=request.amount,
+        amount=entry.amount.copy_abs(),
         status=WithdrawalStatus.PENDING,
         account_type=request.account_type,
         account_name=request.account_name,
@@ -99,24 +121,6 @@ async def create_withdrawal(
     )
     db.add(withdrawal)
     
-    # 4. 创建交易流水 (类型为 WITHDRAWAL)
-    # 注意：这里记录的是负数，表示余额减少
-    transaction = Transaction(
-        therapist_id=current_therapist.id,
-        type=TransactionType.WITHDRAWAL,
-        amount=-request.amount,
-        balance_after=balance_obj.balance,
-        description=f"申请提现到 {request.account_type}",
-        # reference_id 将在提交后关联，这里稍微棘手，因为 withdrawal.id 还没生成
-        # 我们可以先 commit withdrawal 再更新 reference_id，或者利用 flush
-    )
-    db.add(transaction)
-    
-    await db.commit()
-    await db.refresh(withdrawal)
-    
-    # 更新 transaction 的 reference_id
-    transaction.reference_id = str(withdrawal.id)
     await db.commit()
     
     return withdrawal
@@ -124,40 +128,154 @@ async def create_withdrawal(
 
 @router.get("/withdrawals", response_model=List[WithdrawalResponse], summary="获取提现记录")
 async def get_withdrawals(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 返回的游标"),
+    limit: int = Query(20, ge=1, le=100),
+    status_filter: Optional[WithdrawalStatus] = Query(None, alias="status", description="提现状态"),
+    start: Optional[datetime] = Query(None, description="起始时间（含）"),
+    end: Optional[datetime] = Query(None, description="结束时间（不含）"),
     current_therapist: Therapist = Depends(get_current_therapist),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
-    分页获取提现记录
+    游标分页获取提现记录（按申请时间倒序）
+
+    还有下一页时，通过响应头 X-Next-Cursor 返回下一页游标
     """
-    result = await db.execute(
-        select(Withdrawal)
-        .where(Withdrawal.therapist_id == current_therapist.id)
-        .order_by(desc(Withdrawal.created_at))
-        .offset(skip)
-        .limit(limit)
+    stmt = _in_range(
+        select(Withdrawal).where(Withdrawal.therapist_id == current_therapist.id),
+        Withdrawal.created_at, start, end
     )
-    return result.scalars().all()
+    if status_filter:
+        stmt = stmt.where(Withdrawal.status == status_filter)
+
+    result = await db.execute(keyset_paginate(stmt, Withdrawal.created_at, Withdrawal.id, cursor, limit))
+    items, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
 
 
 @router.get("/transactions", response_model=List[TransactionResponse], summary="获取资金流水")
 async def get_transactions(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 返回的游标"),
+    limit: int = Query(20, ge=1, le=100),
+    type: Optional[TransactionType] = Query(None, description="流水类型"),
+    start: Optional[datetime] = Query(None, description="起始时间（含）"),
+    end: Optional[datetime] = Query(None, description="结束时间（不含）"),
+    current_therapist: Therapist = Depends(get_current_therapist),
+    db: AsyncSession = Depends(get_primary_read_db)
+):
+    """
+    游标分页获取资金流水（按时间倒序）
+
+    还有下一页时，通过响应头 X-Next-Cursor 返回下一页游标
+    """
+    stmt = _transactions_query(current_therapist.id, type, start, end)
+    result = await db.execute(keyset_paginate(stmt, Transaction.created_at, Transaction.id, cursor, limit))
+    items, next_cursor = split_page(result.all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
+
+@router.get("/transactions/export", summary="导出资金流水")
+async def export_transactions(
+    format: Literal["csv", "ndjson"] = Query("csv", description="导出格式"),
+    type: Optional[TransactionType] = Query(None, description="流水类型"),
+    start: Optional[datetime] = Query(None, description="起始时间（含）"),
+    end: Optional[datetime] = Query(None, description="结束时间（不含）"),
     current_therapist: Therapist = Depends(get_current_therapist),
-    db: AsyncSession = Depends(get_db)
 ):
     """
-    分页获取资金流水
+    流式导出资金流水（CSV 或 NDJSON，按时间倒序）
+
+    使用服务端游标分批读取并逐批写出，内存占用与流水总量无关
     """
-    result = await db.execute(
-        select(Transaction)
-        .where(Transaction.therapist_id == current_therapist.id)
-        .order_by(desc(Transaction.created_at))
-        .offset(skip)
-        .limit(limit)
+    stmt = _transactions_query(current_therapist.id, type, start, end).order_by(
+        Transaction.created_at.desc(), Transaction.id.desc()
+    )
+    encode = _csv_chunk if format == "csv" else _ndjson_chunk
+
+    async def generate():
+        # 响应开始发送前请求级会话已关闭，导出使用独立会话
+        async with AsyncSessionLocal() as session:
+            if format == "csv":
+                yield "\ufeff" + _csv_chunk([EXPORT_COLUMNS])
+            result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                yield encode(rows)
+
+    filename = f"transactions_{datetime.now():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    return result.scalars().all()
 
+
+# 导出字段
+EXPORT_COLUMNS = ("id", "type", "amount", "balance_after", "description", "reference_id", "created_at")
+EXPORT_BATCH_SIZE = 1000
+
+
+def _in_range(stmt, column, start: Optional[datetime], end: Optional[datetime]):
+    if start:
+        stmt = stmt.where(column >= start)
+    if end:
+        stmt = stmt.where(column < end)
+    return stmt
+
+
+def _transactions_query(
+    therapist_id: int,
+    type: Optional[TransactionType],
+    start: Optional[datetime],
+    end: Optional[datetime],
+):
+    """
+    技师资金流水查询（只取响应所需字段）
+
+    不按类型过滤时走 (therapist_id, created_at, id) 索引，按类型过滤时走 (therapist_id, type, created_at, id) 索引
+    """
+    stmt = select(
+        Transaction.id,
+        Transaction.type,
+        Transaction.amount,
+        Transaction.balance_after,
+        Transaction.description,
+        Transaction.reference_id,
+        Transaction.created_at,
+    ).where(Transaction.therapist_id == therapist_id)
+    if type:
+        stmt = stmt.where(Transaction.type == type)
+    return _in_range(stmt, Transaction.created_at, start, end)
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            value.value if isinstance(value, TransactionType)
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in row
+        )
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows) -> bytes:
+    return b"".join(
+        orjson.dumps({
+            "id": row.id,
+            "type": row.type.value,
+            "amount": str(row.amount),
+            "balance_after": str(row.balance_after),
+            "description": row.description,
+            "reference_id": row.reference_id,
+            "created_at": row.created_at,
+        }) + b"\n"
+        for row in rows
+    )
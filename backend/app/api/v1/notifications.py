@@ -2,13 +2,14 @@
 通知相关 API
 """
 from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db, get_primary_read_db
 from app.api.deps import require_role, get_current_user
 from app.models.user import User, UserRole
 from app.models.therapist import Therapist
@@ -25,6 +26,9 @@ from loguru import logger
 
 router = APIRouter()
 
+# WebSocket 心跳消息日志采样比例（每个在线技师定期发送）
+_heartbeat_log = logger.bind(sample=0.01)
+
 
 # ==================== 测试和调试 API ====================
 
@@ -140,7 +144,7 @@ async def send_test_notification_debug(request: SendTestNotificationRequest):
     
     # 发送通知
     websocket_sent = False
-    fcm_sent = False
+    push_sent = False
     
     # 1. 尝试通过 WebSocket 发送（如果在线）
     if is_online:
@@ -151,48 +155,42 @@ async def send_test_notification_debug(request: SendTestNotificationRequest):
         except Exception as e:
             logger.error(f"❌ WebSocket 发送失败: {e}")
     
-    # 2. 尝试通过 FCM 发送推送（如果未在线或 WebSocket 失败）
+    # 2. 尝试发送推送（如果未在线或 WebSocket 失败）
     if not websocket_sent:
         try:
-            from app.services.fcm_service import fcm_service
-            from app.db.session import get_db
-            from app.models.therapist import TherapistPushToken
-            from sqlalchemy import select
+            # 读取技师的 Push Token（读完即归还连接，推送期间不占用数据库连接）
+            async with AsyncSessionLocal() as db:
+                push_token = (await db.execute(
+                    select(PushToken.expo_push_token).where(
+                        PushToken.therapist_id == request.therapist_id,
+                        PushToken.is_active == True
+                    )
+                )).scalar_one_or_none()
             
-            # 获取技师的 FCM token
-            async for db in get_db():
-                result = await db.execute(
-                    select(TherapistPushToken).where(
-                        TherapistPushToken.therapist_id == request.therapist_id,
-                        TherapistPushToken.is_active == True
-                    ).order_by(TherapistPushToken.updated_at.desc())
+            if push_token:
+                result = await push_service.send_push_notification(
+                    tokens=[push_token],
+                    title=notification["title"],
+                    body=notification["body"],
+                    data=notification.get("data", {}),
+                    priority="high" if notification.get("priority") == "high" else "default"
                 )
-                push_token = result.scalar_one_or_none()
-                
-                if push_token:
-                    fcm_sent = await fcm_service.send_notification(
-                        token=push_token.token,
-                        title=notification["title"],
-                        body=notification["body"],
-                        data=notification.get("data", {}),
-                        priority=notification.get("priority", "high")
-                    )
-                    if fcm_sent:
-                        logger.success(f"✅ FCM 推送已发送到技师 {request.therapist_id}")
-                else:
-                    logger.warning(f"⚠️ 技师 {request.therapist_id} 没有注册 Push Token")
-                break
+                push_sent = bool(result.get("success"))
+                if push_sent:
+                    logger.success(f"✅ 推送已发送到技师 {request.therapist_id}")
+            else:
+                logger.warning(f"⚠️ 技师 {request.therapist_id} 没有注册 Push Token")
         except Exception as e:
-            logger.error(f"❌ FCM 发送失败: {e}")
+            logger.error(f"❌ 推送发送失败: {e}")
     
     # 返回结果
-    if websocket_sent or fcm_sent:
+    if websocket_sent or push_sent:
         return {
             "success": True,
             "message": f"通知已成功发送到技师 {request.therapist_id}",
             "channels": {
                 "websocket": websocket_sent,
-                "fcm": fcm_sent
+                "push": push_sent
             },
             "notification": notification
         }
@@ -289,6 +287,8 @@ async def websocket_endpoint(
         from app.core.security import decode_access_token
         from app.core.database import AsyncSessionLocal
         
+        from app.core.token_revocation import revocation_store
+        
         payload = decode_access_token(token)
         user_id = payload.get("sub")
         
@@ -296,13 +296,18 @@ async def websocket_endpoint(
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
         
+        # 检查 Token 是否已吊销（登出/封禁）
+        if await revocation_store.is_revoked(payload.get("jti"), int(user_id), payload.get("iat")):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        
         async with AsyncSessionLocal() as db:
             user_result = await db.execute(
                 select(User).where(User.id == int(user_id))
             )
             user = user_result.scalar_one_or_none()
             
-            if not user or user.role != UserRole.THERAPIST:
+            if not user or not user.is_active or user.role != UserRole.THERAPIST:
                 await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
                 return
             
@@ -334,7 +339,8 @@ async def websocket_endpoint(
         # 3. 保持连接，接收客户端消息（心跳等）
         while True:
             data = await websocket.receive_text()
-            logger.debug(f"📨 收到技师 {therapist.id} 的消息: {data}")
+            # 心跳消息很频繁，按比例采样记录
+            _heartbeat_log.debug("📨 收到技师 {} 的消息: {}", therapist.id, data)
             
             # 可以处理心跳、已读确认等消息
             # 这里简单回复 pong
@@ -344,10 +350,9 @@ async def websocket_endpoint(
             })
     
     except WebSocketDisconnect:
-        logger.info(f"🔌 技师 {therapist.id} 断开 WebSocket 连接")
         ws_manager.disconnect(websocket)
     except Exception as e:
-        logger.error(f"❌ WebSocket 错误: {e}")
+        logger.error("❌ WebSocket 错误（技师 {}）: {}", therapist.id, e)
         ws_manager.disconnect(websocket)
 
 
@@ -415,7 +420,7 @@ async def get_notifications(
     unread_only: bool = Query(False, description="仅显示未读"),
     notification_type: Optional[NotificationType] = Query(None, description="通知类型筛选"),
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """获取技师通知列表"""
     # 获取技师信息
@@ -466,28 +471,29 @@ async def get_notifications(
     )
     notifications = notifications_result.scalars().all()
     
-    return NotificationListResponse(
-        notifications=[
-            NotificationResponse(
-                id=n.id,
-                type=n.type.value,
-                priority=n.priority.value,
-                title=n.title,
-                body=n.body,
-                data=n.data,
-                status=n.status.value,
-                sent_via=n.sent_via,
-                sent_at=n.sent_at,
-                read_at=n.read_at,
-                created_at=n.created_at
-            )
+    # 快速路径：直接序列化为 JSON，跳过 Pydantic 模型构建与 response_model 二次校验
+    return ORJSONResponse({
+        "notifications": [
+            {
+                "id": n.id,
+                "type": n.type.value,
+                "priority": n.priority.value,
+                "title": n.title,
+                "body": n.body,
+                "data": n.data,
+                "status": n.status.value,
+                "sent_via": n.sent_via,
+                "sent_at": n.sent_at,
+                "read_at": n.read_at,
+                "created_at": n.created_at
+            }
             for n in notifications
         ],
-        total=total,
-        unread_count=unread_count,
-        page=page,
-        page_size=page_size
-    )
+        "total": total,
+        "unread_count": unread_count,
+        "page": page,
+        "page_size": page_size
+    })
 
 
 @router.put("/notifications/{notification_id}/read", summary="标记通知已读")
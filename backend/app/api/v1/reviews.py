@@ -0,0 +1,87 @@
+"""
+评价接口
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.therapist import Therapist
+from app.models.service import Service
+from app.models.booking import Booking, BookingStatus
+from app.models.review import Review
+from app.schemas.booking import ReviewCreate, ReviewResponse
+from app.services.ratings import RatingAggregates
+
+router = APIRouter()
+
+
+@router.post("", response_model=ReviewResponse, summary="评价订单")
+async def create_review(
+    data: ReviewCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    评价已完成的预约（每个预约只能评价一次）
+
+    评价写入与技师/服务评分聚合更新在同一事务内完成
+    """
+    result = await db.execute(
+        select(Booking.therapist_id, Booking.service_id, Booking.status, Therapist.name, Service.name)
+        .join(Therapist, Booking.therapist_id == Therapist.id)
+        .join(Service, Booking.service_id == Service.id)
+        .where(Booking.id == data.booking_id)
+        .where(Booking.user_id == current_user.id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="预约不存在")
+    therapist_id, service_id, booking_status, therapist_name, service_name = row
+    if booking_status != BookingStatus.COMPLETED:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="服务完成后才能评价")
+
+    review = Review(
+        user_id=current_user.id,
+        therapist_id=therapist_id,
+        booking_id=data.booking_id,
+        service_id=service_id,
+        rating=data.rating,
+        content=data.content,
+        images=data.images,
+        skill_rating=data.skill_rating,
+        attitude_rating=data.attitude_rating,
+        punctuality_rating=data.punctuality_rating,
+        tip_amount=data.tip_amount,
+        is_anonymous=data.is_anonymous,
+        is_visible=True
+    )
+    db.add(review)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # booking_id 唯一约束：重复评价
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="该订单已评价")
+
+    await RatingAggregates(db).review_added(review)
+
+    # tip_amount 只记录在评价上，不计入技师余额：小费入账须以实际收款为准，不能由客户填写的金额直接生成
+
+    await db.commit()
+
+    return ReviewResponse(
+        id=review.id,
+        booking_id=review.booking_id,
+        therapist_name=therapist_name,
+        service_name=service_name,
+        rating=review.rating,
+        content=review.content,
+        images=review.images,
+        tip_amount=review.tip_amount,
+        is_anonymous=review.is_anonymous,
+        reply_content=review.reply_content,
+        created_at=review.created_at
+    )
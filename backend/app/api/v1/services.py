@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.projection import Projection
 from app.models.service import Service, ServiceCategory, TherapistService
 from app.models.therapist import Therapist
 from app.schemas.service import (
@@ -18,10 +19,27 @@ from app.schemas.service import (
 
 router = APIRouter()
 
+# 服务列表只查询响应字段
+SERVICE_LIST = Projection(
+    ServiceListResponse,
+    id=Service.id,
+    name=Service.name,
+    name_en=Service.name_en,
+    short_description=Service.short_description,
+    image=Service.image,
+    base_price=Service.base_price,
+    duration=Service.duration,
+    rating=Service.rating,
+    review_count=Service.review_count,
+    is_featured=Service.is_featured,
+    category_id=Service.category_id,
+    category_name=ServiceCategory.name,
+)
+
 
 @router.get("/categories", response_model=List[ServiceCategoryResponse], summary="获取服务分类")
 async def get_categories(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取所有服务分类"""
     result = await db.execute(
@@ -60,10 +78,10 @@ async def get_services(
     search: Optional[str] = Query(None, description="搜索关键词"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取服务列表"""
-    query = select(Service, ServiceCategory).join(
+    query = SERVICE_LIST.select().join(
         ServiceCategory, 
         Service.category_id == ServiceCategory.id,
         isouter=True
@@ -86,30 +104,13 @@ async def get_services(
     
     result = await db.execute(query)
     
-    response = []
-    for service, category in result:
-        response.append(ServiceListResponse(
-            id=service.id,
-            name=service.name,
-            name_en=service.name_en,
-            short_description=service.short_description,
-            image=service.image,
-            base_price=service.base_price,
-            duration=service.duration,
-            rating=service.rating,
-            review_count=service.review_count,
-            is_featured=service.is_featured,
-            category_id=service.category_id,
-            category_name=category.name if category else None
-        ))
-    
-    return response
+    return SERVICE_LIST.models(result)
 
 
 @router.get("/{service_id}", response_model=ServiceDetailResponse, summary="获取服务详情")
 async def get_service_detail(
     service_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取服务详情"""
     result = await db.execute(
@@ -152,7 +153,7 @@ async def get_service_therapists(
     service_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取提供该服务的治疗师列表"""
     # 检查服务是否存在
@@ -3,13 +3,16 @@
 """
 import random
 from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_read_db
 from app.core.security import create_access_token, create_refresh_token, verify_token
 from app.core.config import settings
+from app.core.token_revocation import revocation_store
 from app.models.user import User, UserRole
 from app.models.therapist import Therapist, TherapistStatus
 from app.schemas.auth import (
@@ -20,9 +23,10 @@ from app.schemas.auth import (
     TokenResponse
 )
 from app.schemas.therapist import UpdateProfileRequest
-from app.api.deps import get_current_user, require_role
+from app.api.deps import get_current_user, require_role, security, is_token_revoked
 from app.utils.avatar import generate_default_avatar  # 添加头像生成工具
 from pydantic import BaseModel, Field
+from loguru import logger
 
 router = APIRouter()
 
@@ -55,6 +59,11 @@ class TherapistInfo(BaseModel):
         from_attributes = True
 
 
+class TherapistLogoutRequest(BaseModel):
+    """技师登出请求"""
+    refresh_token: Optional[str] = Field(None, description="同时吊销的 refresh_token")
+
+
 class TherapistLoginResponse(BaseModel):
     """技师登录响应"""
     access_token: str
@@ -92,7 +101,7 @@ async def send_therapist_sms_code(request: SMSCodeRequest):
     
     # 开发环境打印验证码
     if settings.DEBUG:
-        print(f"[DEBUG] 技师验证码: {phone} -> {code}")
+        logger.info("[DEBUG] 技师验证码: {} -> {}", phone, code)
     
     return SMSCodeResponse(message="验证码已发送")
 
@@ -141,10 +150,6 @@ async def therapist_login(
         default_nickname = f"技师{phone[-4:]}"
         default_avatar = generate_default_avatar(phone)  # 使用 DiceBear
         
-        print(f"🆕 创建新技师用户: {phone}")
-        print(f"   昵称: {default_nickname}")
-        print(f"   头像: {default_avatar}")
-        
         user = User(
             phone=phone,
             nickname=default_nickname,
@@ -180,8 +185,7 @@ async def therapist_login(
     # 如果技师档案不存在，自动创建
     if not therapist:
         default_avatar = user.avatar or generate_default_avatar(phone)
-        
-        print(f"📝 创建技师档案: user_id={user.id}")
+        logger.info("📝 创建技师档案: user_id={}", user.id)
         
         therapist = Therapist(
             user_id=user.id,
@@ -211,7 +215,7 @@ async def therapist_login(
     await db.refresh(therapist)
     
     if is_new_user:
-        print(f"✅ 新技师注册成功: {phone}")
+        logger.info("🆕 新技师注册成功: user_id={}, therapist_id={}", user.id, therapist.id)
     
     # 生成 Token（包含 role='therapist'）
     access_token = create_access_token(user.id, role=UserRole.THERAPIST.value)
@@ -251,7 +255,7 @@ async def refresh_therapist_token(
     """
     token_data = verify_token(request.refresh_token, "refresh")
     
-    if not token_data:
+    if not token_data or await is_token_revoked(token_data):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
@@ -287,21 +291,58 @@ async def refresh_therapist_token(
 
 
 @router.post("/logout", summary="技师登出")
-async def therapist_logout():
+async def therapist_logout(
+    request: Optional[TherapistLogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
     """
     技师登出
     
+    - 当前 access_token 加入黑名单，立即失效（包括 WebSocket 握手）
+    - 如传入 refresh_token，一并吊销
     - 前端清除本地 Token
-    - 后端可以将 Token 加入黑名单（需要 Redis）
     """
-    # TODO: 将 Token 加入黑名单（Redis）
+    token_data = verify_token(credentials.credentials, "access")
+    if not token_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if token_data.get("jti"):
+        await revocation_store.revoke(token_data["jti"], token_data["exp"])
+    
+    if request and request.refresh_token:
+        refresh_data = verify_token(request.refresh_token, "refresh")
+        if (
+            refresh_data
+            and refresh_data.get("jti")
+            and refresh_data["user_id"] == token_data["user_id"]
+        ):
+            await revocation_store.revoke(refresh_data["jti"], refresh_data["exp"])
+    
     return {"message": "登出成功"}
 
 
+@router.post("/logout-all", summary="技师全部设备登出")
+async def therapist_logout_all(
+    current_user: User = Depends(require_role(UserRole.THERAPIST))
+):
+    """
+    技师全部设备登出
+
+    - 该技师此前签发的所有 access_token / refresh_token 立即失效（各 worker 通过 Redis 同步）
+    - 当前设备需重新登录
+    """
+    await revocation_store.revoke_user(current_user.id)
+    return {"message": "已在所有设备登出"}
+
+
 @router.get("/profile", response_model=TherapistInfo, summary="获取当前技师信息")
 async def get_current_therapist_profile(
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     获取当前已登录技师的完整信息
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_read_db
 from app.api.deps import get_current_therapist
 from app.models.therapist import Therapist
 from app.models.booking import Booking, BookingStatus
@@ -104,7 +104,7 @@ async def get_customer_reviews(
     skip: int = 0,
     limit: int = 20,
     current_therapist: Therapist = Depends(get_current_therapist),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     获取技师提交的所有客户评价列表
@@ -154,7 +154,7 @@ async def get_customer_reviews(
 async def get_customer_review_by_booking(
     booking_id: int,
     current_therapist: Therapist = Depends(get_current_therapist),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     获取指定订单的客户评价详情
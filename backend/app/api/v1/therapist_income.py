@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from pydantic import BaseModel, Field
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.api.deps import require_role
 from app.models.user import User, UserRole
 from app.models.therapist import Therapist
@@ -86,7 +86,7 @@ class IncomeDetailsResponse(BaseModel):
 @router.get("/summary", response_model=IncomeSummary, summary="获取收入汇总")
 async def get_income_summary(
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取技师收入汇总数据"""
     # 获取技师信息
@@ -176,7 +176,7 @@ async def get_income_summary(
 async def get_income_statistics(
     period: str = Query(..., description="统计周期: today/this_week/this_month"),
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取技师收入统计数据"""
     # 获取技师信息
@@ -281,7 +281,7 @@ async def get_income_details(
     page_size: int = Query(20, ge=1, le=100),
     settled: Optional[bool] = Query(None, description="是否已结算"),
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取技师收入明细列表"""
     # 获取技师信息
@@ -4,18 +4,20 @@
 from datetime import datetime, date
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from pydantic import BaseModel, Field
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_read_db
 from app.api.deps import require_role
 from app.models.user import User, UserRole, Address
 from app.models.therapist import Therapist
 from app.models.service import Service
 from app.models.booking import Booking, BookingStatus
 from app.models.order import Order
-from app.models.finance import TherapistBalance, Transaction, TransactionType
+from app.services.booking_state import BookingStateMachine
+from app.services.ledger import Ledger, THERAPIST_SHARE, to_money
 
 router = APIRouter()
 
@@ -115,7 +117,7 @@ async def get_therapist_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     获取技师的订单列表
@@ -199,43 +201,44 @@ async def get_therapist_orders(
         if address.detail:
             full_address += f" {address.detail}"
         
-        response_data.append(TherapistOrderListItem(
-            id=booking.id,
-            booking_no=booking.booking_no,
-            customer_name=user.nickname or "客户",
-            customer_phone=user.phone,
-            customer_avatar=user.avatar,
-            service_id=service.id,
-            service_name=service.name,
-            service_duration=booking.duration,
-            service_price=booking.service_price,
-            address_detail=full_address,  # 使用组合的完整地址
-            address_contact=address.contact_name,
-            address_phone=address.contact_phone,  # 修复：使用 contact_phone
-            address_lat=address.latitude,
-            address_lng=address.longitude,
-            booking_date=booking.booking_date,
-            start_time=booking.start_time.strftime("%H:%M"),
-            end_time=booking.end_time.strftime("%H:%M"),
-            status=booking.status,
-            total_price=booking.total_price,
-            user_note=booking.user_note,
-            therapist_note=booking.therapist_note,
-            therapist_arrived_at=booking.therapist_arrived_at,
-            service_started_at=booking.service_started_at,
-            service_completed_at=booking.service_completed_at,
-            created_at=booking.created_at,
-            updated_at=booking.updated_at
-        ))
-    
-    return response_data
+        response_data.append({
+            "id": booking.id,
+            "booking_no": booking.booking_no,
+            "customer_name": user.nickname or "客户",
+            "customer_phone": user.phone,
+            "customer_avatar": user.avatar,
+            "service_id": service.id,
+            "service_name": service.name,
+            "service_duration": booking.duration,
+            "service_price": booking.service_price,
+            "address_detail": full_address,  # 使用组合的完整地址
+            "address_contact": address.contact_name,
+            "address_phone": address.contact_phone,  # 修复：使用 contact_phone
+            "address_lat": address.latitude,
+            "address_lng": address.longitude,
+            "booking_date": booking.booking_date,
+            "start_time": booking.start_time.strftime("%H:%M"),
+            "end_time": booking.end_time.strftime("%H:%M"),
+            "status": booking.status.value,
+            "total_price": booking.total_price,
+            "user_note": booking.user_note,
+            "therapist_note": booking.therapist_note,
+            "therapist_arrived_at": booking.therapist_arrived_at,
+            "service_started_at": booking.service_started_at,
+            "service_completed_at": booking.service_completed_at,
+            "created_at": booking.created_at,
+            "updated_at": booking.updated_at
+        })
+    
+    # 快速路径：直接序列化为 JSON，跳过 Pydantic 模型构建与 response_model 二次校验
+    return ORJSONResponse(response_data)
 
 
 @router.get("/orders/{booking_id}", response_model=TherapistOrderDetail, summary="获取订单详情")
 async def get_order_detail(
     booking_id: int,
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """获取订单详细信息"""
     # 获取技师信息
@@ -338,36 +341,15 @@ async def accept_order(
             detail="技师档案不存在"
         )
     
-    # 获取订单
-    booking_result = await db.execute(
-        select(Booking).where(
-            and_(
-                Booking.id == booking_id,
-                Booking.therapist_id == therapist.id
-            )
-        )
+    # 更新订单状态（PENDING -> CONFIRMED）
+    booking = await BookingStateMachine(db).transition(
+        booking_id,
+        BookingStatus.CONFIRMED,
+        therapist_id=therapist.id,
+        action="接单"
     )
-    booking = booking_result.scalar_one_or_none()
-    
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="订单不存在或无权访问"
-        )
-    
-    # 检查订单状态
-    if booking.status != BookingStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"订单当前状态为 {booking.status.value}，无法接单"
-        )
-    
-    # 更新订单状态
-    booking.status = BookingStatus.CONFIRMED
-    booking.updated_at = datetime.utcnow()
     
     await db.commit()
-    await db.refresh(booking)
     
     return {"message": "接单成功", "booking_id": booking.id, "status": booking.status.value}
 
@@ -392,43 +374,29 @@ async def reject_order(
             detail="技师档案不存在"
         )
     
-    # 获取订单
-    booking_result = await db.execute(
-        select(Booking).where(
-            and_(
-                Booking.id == booking_id,
-                Booking.therapist_id == therapist.id
-            )
-        )
+    # 更新订单状态（只能拒绝待接单的订单），同时释放时段
+    booking = await BookingStateMachine(db).transition(
+        booking_id,
+        BookingStatus.CANCELLED,
+        therapist_id=therapist.id,
+        sources=[BookingStatus.PENDING],
+        values={"cancel_reason": request.reason, "cancelled_by": "therapist"},
+        action="拒单"
     )
-    booking = booking_result.scalar_one_or_none()
-    
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="订单不存在或无权访问"
-        )
-    
-    # 检查订单状态
-    if booking.status != BookingStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"订单当前状态为 {booking.status.value}，无法拒单"
-        )
-    
-    # 更新订单状态
-    booking.status = BookingStatus.CANCELLED
-    booking.cancel_reason = request.reason
-    booking.cancelled_by = "therapist"
-    booking.cancelled_at = datetime.utcnow()
-    booking.updated_at = datetime.utcnow()
     
     await db.commit()
-    await db.refresh(booking)
     
     return {"message": "拒单成功", "booking_id": booking.id}
 
 
+# 技师可直接更新到的状态（接单、拒单、取消、退款走各自的流程）
+THERAPIST_STATUS_TARGETS = frozenset({
+    BookingStatus.EN_ROUTE,
+    BookingStatus.IN_PROGRESS,
+    BookingStatus.COMPLETED,
+})
+
+
 @router.post("/orders/{booking_id}/update-status", summary="更新订单状态")
 async def update_order_status(
     booking_id: int,
@@ -449,41 +417,28 @@ async def update_order_status(
             detail="技师档案不存在"
         )
     
-    # 获取订单
-    booking_result = await db.execute(
-        select(Booking).where(
-            and_(
-                Booking.id == booking_id,
-                Booking.therapist_id == therapist.id
-            )
-        )
-    )
-    booking = booking_result.scalar_one_or_none()
-    
-    if not booking:
+    if request.status not in THERAPIST_STATUS_TARGETS:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="订单不存在或无权访问"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法将订单更新为 {request.status.value}"
         )
     
-    # 更新状态和备注
-    booking.status = request.status
+    # 备注和状态相关的时间戳（开始/完成时间由状态机写入）
+    values = {}
     if request.note:
-        booking.therapist_note = request.note
-    booking.updated_at = datetime.utcnow()
-    
-    # 根据状态更新时间戳
+        values["therapist_note"] = request.note
     if request.status == BookingStatus.EN_ROUTE:
-        booking.therapist_arrived_at = None  # 正在前往
-    elif request.status == BookingStatus.IN_PROGRESS:
-        booking.service_started_at = datetime.utcnow()
-    elif request.status == BookingStatus.COMPLETED:
-        booking.service_completed_at = datetime.utcnow()
-        # 更新技师完成订单数
-        therapist.completed_count += 1
+        values["therapist_arrived_at"] = None  # 正在前往
+    
+    booking = await BookingStateMachine(db).transition(
+        booking_id,
+        request.status,
+        therapist_id=therapist.id,
+        values=values,
+        action="更新为该状态"
+    )
     
     await db.commit()
-    await db.refresh(booking)
     
     return {
         "message": "状态更新成功",
@@ -492,6 +447,14 @@ async def update_order_status(
     }
 
 
+# 打卡类型 -> 目标状态
+CHECKIN_TRANSITIONS = {
+    "arrived": (BookingStatus.EN_ROUTE, "到达打卡成功"),
+    "start_service": (BookingStatus.IN_PROGRESS, "开始服务打卡成功"),
+    "complete_service": (BookingStatus.COMPLETED, "完成服务打卡成功"),
+}
+
+
 @router.post("/orders/{booking_id}/checkin", summary="订单打卡")
 async def checkin_order(
     booking_id: int,
@@ -507,6 +470,13 @@ async def checkin_order(
     - start_service: 开始服务
     - complete_service: 完成服务
     """
+    if request.check_type not in CHECKIN_TRANSITIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的打卡类型"
+        )
+    target, message = CHECKIN_TRANSITIONS[request.check_type]
+    
     # 获取技师信息
     therapist_result = await db.execute(
         select(Therapist).where(Therapist.user_id == current_user.id)
@@ -519,100 +489,33 @@ async def checkin_order(
             detail="技师档案不存在"
         )
     
-    # 获取订单
-    booking_result = await db.execute(
-        select(Booking).where(
-            and_(
-                Booking.id == booking_id,
-                Booking.therapist_id == therapist.id
-            )
-        )
-    )
-    booking = booking_result.scalar_one_or_none()
-    
-    if not booking:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="订单不存在或无权访问"
-        )
-    
-    # 获取地址信息进行距离验证
-    address_result = await db.execute(
-        select(Address).where(Address.id == booking.address_id)
-    )
-    address = address_result.scalar_one()
-    
-    # TODO: 计算距离，验证是否在有效范围内（100米）
+    # TODO: 读取预约地址，计算距离，验证是否在有效范围内（100米）
     # distance = calculate_distance(request.latitude, request.longitude, address.latitude, address.longitude)
     # if distance > 100:
     #     raise HTTPException(status_code=400, detail="距离目标地址太远，无法打卡")
     
-    # 根据打卡类型更新状态
+    # 更新状态（开始/完成时间由状态机写入，完成时同时累加技师完成订单数）
     now = datetime.utcnow()
+    values = {"therapist_arrived_at": now} if target == BookingStatus.EN_ROUTE else {}
+    booking = await BookingStateMachine(db).transition(
+        booking_id,
+        target,
+        therapist_id=therapist.id,
+        values=values,
+        action="打卡"
+    )
     
-    if request.check_type == "arrived":
-        booking.therapist_arrived_at = now
-        booking.status = BookingStatus.EN_ROUTE
-        message = "到达打卡成功"
-    elif request.check_type == "start_service":
-        booking.service_started_at = now
-        booking.status = BookingStatus.IN_PROGRESS
-        message = "开始服务打卡成功"
-    elif request.check_type == "complete_service":
-        booking.service_completed_at = now
-        booking.status = BookingStatus.COMPLETED
-        therapist.completed_count += 1
-        
-        # ✅ 更新技师余额和创建收入流水
-        # 计算技师收入（假设平台抽成30%，技师得70%）
-        commission_rate = 0.7
-        therapist_income = booking.total_price * commission_rate
-        
-        # 1. 获取或创建技师余额记录
-        balance_result = await db.execute(
-            select(TherapistBalance).where(
-                TherapistBalance.therapist_id == therapist.id
-            )
-        )
-        balance = balance_result.scalar_one_or_none()
-        
-        if not balance:
-            # 首次完成订单，创建余额记录
-            balance = TherapistBalance(
-                therapist_id=therapist.id,
-                balance=therapist_income,
-                total_income=therapist_income,
-                frozen_amount=0.0
-            )
-            db.add(balance)
-        else:
-            # 更新余额
-            balance.balance += therapist_income
-            balance.total_income += therapist_income
-            balance.updated_at = now
-        
-        # 2. 创建收入流水记录
-        transaction = Transaction(
-            therapist_id=therapist.id,
-            type=TransactionType.INCOME,
-            amount=therapist_income,
-            balance_after=balance.balance,
+    if target == BookingStatus.COMPLETED:
+        # ✅ 记录技师收入（余额与流水原子更新；幂等键保证同一订单只入账一次）
+        await Ledger(db).credit_income(
+            therapist.id,
+            to_money(booking.total_price) * THERAPIST_SHARE,
             description=f"完成订单 {booking.booking_no}",
             reference_id=str(booking.id),
-            created_at=now
-        )
-        db.add(transaction)
-        
-        message = "完成服务打卡成功"
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="无效的打卡类型"
+            idempotency_key=f"booking:{booking.id}:income"
         )
     
-    booking.updated_at = now
     await db.commit()
-    await db.refresh(booking)
     
     return {
         "message": message,
@@ -625,7 +528,7 @@ async def checkin_order(
 @router.get("/orders/stats/summary", summary="订单统计")
 async def get_order_stats(
     current_user: User = Depends(require_role(UserRole.THERAPIST)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """获取技师订单统计"""
     # 获取技师信息
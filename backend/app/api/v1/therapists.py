@@ -3,16 +3,20 @@
 """
 from datetime import date, datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_paginate, split_page
+from app.core.projection import Projection
 from app.api.deps import get_current_user_optional
 from app.models.user import User, Favorite
-from app.models.therapist import Therapist, TherapistTimeSlot
+from app.models.therapist import Therapist, TherapistRank
 from app.models.service import TherapistService, Service
-from app.models.review import Review
+from app.models.review import Review, RatingSubject
+from app.services import ratings, slot_engine
 from app.schemas.therapist import (
     TherapistListResponse,
     TherapistDetailResponse,
@@ -25,6 +29,34 @@ from app.schemas.therapist import (
 
 router = APIRouter()
 
+# 列表只查询响应字段
+THERAPIST_LIST = Projection(
+    TherapistListResponse,
+    id=Therapist.id,
+    name=Therapist.name,
+    title=Therapist.title,
+    avatar=Therapist.avatar,
+    rating=Therapist.rating,
+    review_count=Therapist.review_count,
+    base_price=Therapist.base_price,
+    specialties=Therapist.specialties,
+    is_featured=Therapist.is_featured,
+)
+
+
+def feed_query():
+    """
+    已验证技师的列表查询（投影列 + 排序分）
+
+    从 therapist_ranks 出发按 (score, therapist_id) 翻页，走 ix_therapist_ranks_score_therapist_id 反向扫描；
+    技师通过认证时即写入默认排序分（见 app.models.therapist），不会在下次重算前从列表中消失
+    """
+    return (
+        THERAPIST_LIST.select(TherapistRank.score, TherapistRank.therapist_id)
+        .join(Therapist, Therapist.id == TherapistRank.therapist_id)
+        .where(Therapist.is_verified == True)
+    )
+
 
 @router.get("", response_model=List[TherapistListResponse], summary="获取治疗师列表")
 async def get_therapists(
@@ -32,13 +64,18 @@ async def get_therapists(
     specialty: Optional[str] = Query(None, description="专长"),
     search: Optional[str] = Query(None, description="搜索关键词"),
     min_rating: Optional[float] = Query(None, ge=0, le=5, description="最低评分"),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 返回的游标"),
     page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取治疗师列表"""
+    """
+    获取治疗师列表
+
+    按预计算的排序分（app.services.therapist_rank）倒序游标分页，
+    还有下一页时，通过响应头 X-Next-Cursor 返回下一页游标
+    """
     # 只显示已验证的技师（不管在线状态）
-    query = select(Therapist).where(Therapist.is_verified == True)
+    query = feed_query()
     
     if featured is not None:
         query = query.where(Therapist.is_featured == featured)
@@ -47,30 +84,22 @@ async def get_therapists(
     if search:
         query = query.where(Therapist.name.ilike(f"%{search}%"))
     
-    query = query.order_by(Therapist.is_featured.desc(), Therapist.rating.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    
+    query = keyset_paginate(query, TherapistRank.score, TherapistRank.therapist_id, cursor, page_size)
     result = await db.execute(query)
-    therapists = result.scalars().all()
+    rows, next_cursor = split_page(result.all(), page_size, sort_key="score", id_key="therapist_id")
     
-    return [TherapistListResponse(
-        id=t.id,
-        name=t.name,
-        title=t.title,
-        avatar=t.avatar,
-        rating=t.rating,
-        review_count=t.review_count,
-        base_price=t.base_price,
-        specialties=t.specialties,
-        is_featured=t.is_featured
-    ) for t in therapists]
+    # 快速路径：直接序列化为 JSON，跳过 Pydantic 模型构建与 response_model 二次校验
+    return ORJSONResponse(
+        THERAPIST_LIST.dicts(rows),
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+    )
 
 
 @router.get("/{therapist_id}", response_model=TherapistDetailResponse, summary="获取治疗师详情")
 async def get_therapist_detail(
     therapist_id: int,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取治疗师详情"""
     result = await db.execute(
@@ -109,7 +138,7 @@ async def get_therapist_detail(
 @router.get("/{therapist_id}/services", response_model=List[TherapistServiceResponse], summary="获取治疗师服务")
 async def get_therapist_services(
     therapist_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取治疗师提供的服务列表"""
     result = await db.execute(
@@ -140,7 +169,7 @@ async def get_therapist_availability(
     therapist_id: int,
     start_date: date = Query(..., description="开始日期"),
     end_date: Optional[date] = Query(None, description="结束日期"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取治疗师指定日期范围内的可用时段
@@ -162,37 +191,23 @@ async def get_therapist_availability(
     if (end_date - start_date).days > 14:
         end_date = start_date + timedelta(days=14)
     
-    # 查询时段数据
-    result = await db.execute(
-        select(TherapistTimeSlot)
-        .where(TherapistTimeSlot.therapist_id == therapist_id)
-        .where(TherapistTimeSlot.date >= start_date)
-        .where(TherapistTimeSlot.date <= end_date)
-        .order_by(TherapistTimeSlot.date, TherapistTimeSlot.start_time)
-    )
-    slots = result.scalars().all()
-    
-    # 按日期分组
-    availability_map = {}
-    for slot in slots:
-        date_str = slot.date.isoformat()
-        if date_str not in availability_map:
-            availability_map[date_str] = []
-        
-        availability_map[date_str].append(TimeSlotResponse(
-            time=slot.start_time.strftime("%H:%M"),
-            available=slot.is_available and not slot.is_booked,
-            booked=slot.is_booked
-        ))
+    # 按排班规则实时计算时段
+    availability = await slot_engine.get_availability(db, therapist_id, start_date, end_date)
     
     # 构建响应
     response = []
     current_date = start_date
     while current_date <= end_date:
-        date_str = current_date.isoformat()
         response.append(DayAvailabilityResponse(
             date=current_date,
-            slots=availability_map.get(date_str, [])
+            slots=[
+                TimeSlotResponse(
+                    time=slot.start.strftime("%H:%M"),
+                    available=slot.available,
+                    booked=slot.booked
+                )
+                for slot in availability.get(current_date, [])
+            ]
         ))
         current_date += timedelta(days=1)
     
@@ -202,60 +217,68 @@ async def get_therapist_availability(
 @router.get("/{therapist_id}/reviews", response_model=List[TherapistReviewResponse], summary="获取治疗师评价")
 async def get_therapist_reviews(
     therapist_id: int,
-    page: int = Query(1, ge=1),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 返回的游标"),
     page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取治疗师的评价列表"""
-    result = await db.execute(
-        select(Review, User)
+    """
+    获取治疗师的评价列表（按时间倒序游标分页）
+
+    还有下一页时，通过响应头 X-Next-Cursor 返回下一页游标
+    """
+    # 只取响应所需的列（不加载 Review/User 实体及其关联）
+    stmt = (
+        select(
+            Review.id,
+            Review.rating,
+            Review.content,
+            Review.images,
+            Review.is_anonymous,
+            Review.reply_content,
+            Review.created_at,
+            User.nickname,
+            User.avatar,
+        )
         .join(User, Review.user_id == User.id)
         .where(Review.therapist_id == therapist_id)
         .where(Review.is_visible == True)
-        .order_by(Review.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
     )
+    result = await db.execute(keyset_paginate(stmt, Review.created_at, Review.id, cursor, page_size))
+    rows, next_cursor = split_page(result.all(), page_size)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    response = []
-    for review, user in result:
-        response.append(TherapistReviewResponse(
-            id=review.id,
-            user_nickname=user.nickname if not review.is_anonymous else "匿名用户",
-            user_avatar=user.avatar if not review.is_anonymous else None,
-            rating=review.rating,
-            content=review.content,
-            images=review.images,
-            is_anonymous=review.is_anonymous,
-            reply_content=review.reply_content,
-            created_at=review.created_at
-        ))
-    
-    return response
+    return [
+        TherapistReviewResponse(
+            id=row.id,
+            user_nickname=row.nickname if not row.is_anonymous else "匿名用户",
+            user_avatar=row.avatar if not row.is_anonymous else None,
+            rating=row.rating,
+            content=row.content,
+            images=row.images,
+            is_anonymous=row.is_anonymous,
+            reply_content=row.reply_content,
+            created_at=row.created_at
+        )
+        for row in rows
+    ]
 
 
 @router.get("/{therapist_id}/rating-distribution", response_model=RatingDistribution, summary="获取评分分布")
 async def get_rating_distribution(
     therapist_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取治疗师的评分分布"""
-    result = await db.execute(
-        select(Review.rating, func.count(Review.id))
-        .where(Review.therapist_id == therapist_id)
-        .where(Review.is_visible == True)
-        .group_by(Review.rating)
-    )
-    
-    distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    for rating, count in result:
-        distribution[rating] = count
+    """获取治疗师的评分分布（读取评分聚合表，一次主键查询）"""
+    aggregate = await ratings.get_aggregate(db, RatingSubject.THERAPIST, therapist_id)
+    if aggregate is None:
+        return RatingDistribution()
     
     return RatingDistribution(
-        star_5=distribution[5],
-        star_4=distribution[4],
-        star_3=distribution[3],
-        star_2=distribution[2],
-        star_1=distribution[1]
+        star_5=aggregate.star_5,
+        star_4=aggregate.star_4,
+        star_3=aggregate.star_3,
+        star_2=aggregate.star_2,
+        star_1=aggregate.star_1
     )
-
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_read_db
 from app.api.deps import get_current_user
 from app.models.user import User, Address, Favorite
 from app.models.therapist import Therapist
@@ -29,7 +29,7 @@ router = APIRouter()
 @router.get("/me", response_model=UserDetailResponse, summary="获取当前用户信息")
 async def get_current_user_info(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """获取当前登录用户的详细信息"""
     # 统计数据
@@ -77,7 +77,7 @@ async def update_user_info(
 @router.get("/me/addresses", response_model=List[AddressResponse], summary="获取地址列表")
 async def get_addresses(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """获取当前用户的地址列表"""
     result = await db.execute(
@@ -199,7 +199,7 @@ async def delete_address(
 @router.get("/me/favorites", response_model=List[FavoriteResponse], summary="获取收藏列表")
 async def get_favorites(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """获取收藏的治疗师列表"""
     result = await db.execute(
@@ -1,11 +1,25 @@
 # Core module
-from app.core.config import settings
-from app.core.database import get_db, Base
-from app.core.security import (
-    create_access_token,
-    create_refresh_token,
-    verify_token,
-    verify_password,
-    get_password_hash,
-)
+#
+# 按需导入：gunicorn.conf.py 在 master 中导入 app.core.config，不能因此提前导入 app.core.database
+# （引擎和连接池必须在 worker fork 之后、按 worker 数均分后再创建）
+import importlib
 
+_EXPORTS = {
+    "settings": "app.core.config",
+    "get_db": "app.core.database",
+    "Base": "app.core.database",
+    "create_access_token": "app.core.security",
+    "create_refresh_token": "app.core.security",
+    "verify_token": "app.core.security",
+    "verify_password": "app.core.security",
+    "get_password_hash": "app.core.security",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
@@ -1,19 +1,101 @@
 """
 数据库配置
+
+主库（engine）承担全部写入；配置 DATABASE_READ_URL 后，只读接口通过 get_read_db 把查询路由到只读副本：
+
+- 同一请求内已经写过主库（get_db 会话发生 flush / INSERT / UPDATE / DELETE）后，读会话改读主库（读己之写）
+- 读会话自身出现写操作时，该会话此后全部走主库
+- 副本复制延迟超过 DATABASE_READ_MAX_LAG_SECONDS 或不可用时，读会话退回主库
+
+事务策略：
+
+- 只读接口用 get_read_db / get_primary_read_db：连接以 AUTOCOMMIT 模式执行查询，没有 BEGIN / COMMIT / ROLLBACK
+- 写接口用 get_db：请求结束时只在确有未提交写入时提交；handler 内用 unit_of_work 显式划定写事务，
+  块结束即提交并把连接还给连接池
+- 推送、WebSocket 等外部网络调用放在事务之外（unit_of_work 之后，或先 release_connection）
 """
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from uuid import uuid4
+
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.dml import UpdateBase
+from starlette.requests import HTTPConnection
 
 from app.core.config import settings
+from app.core.pool_stats import instrumented_pool, track
+from app.core.query_stats import instrument_engine
+
+
+def per_worker(total: int) -> int:
+    """
+    将全局连接数预算按 worker 数量均分（每个 worker 进程独立持有连接池）
+
+    worker 数量在创建引擎时从环境变量读取：gunicorn master 在 fork 前已创建 settings，
+    worker 继承的 settings.WEB_CONCURRENCY 可能仍为空，以 post_fork 写入的 WEB_CONCURRENCY 为准。
+    """
+    workers = int(os.environ.get("WEB_CONCURRENCY") or settings.WEB_CONCURRENCY or 1)
+    return max(1, math.ceil(total / workers))
+
 
-# 创建异步引擎
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    echo=settings.DEBUG,
+def _create_engine(name: str, url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    """
+    按连接池配置创建异步引擎
+
+    - DATABASE_PGBOUNCER：PgBouncer 事务模式下同一会话的语句可能落在不同的后端连接上，
+      关闭 asyncpg 和 SQLAlchemy 的预编译语句缓存，并为预编译语句生成唯一名称
+    - DATABASE_NULL_POOL：不在应用侧保留连接（交给 PgBouncer 复用），用完即关闭
+    """
+    kwargs = {"echo": settings.DEBUG}
+    if settings.DATABASE_NULL_POOL:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            poolclass=instrumented_pool(name),
+            pool_size=per_worker(pool_size),
+            max_overflow=per_worker(max_overflow),
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+
+    if make_url(url).get_driver_name() == "asyncpg":
+        cache_size = 0 if settings.DATABASE_PGBOUNCER else settings.DATABASE_STATEMENT_CACHE_SIZE
+        connect_args = {
+            "statement_cache_size": cache_size,
+            "prepared_statement_cache_size": cache_size,
+        }
+        if settings.DATABASE_PGBOUNCER:
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        kwargs["connect_args"] = connect_args
+
+    async_engine = create_async_engine(url, **kwargs)
+    track(name, async_engine)
+    if settings.SQL_QUERY_STATS:
+        instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+# 创建异步引擎（主库）
+engine = _create_engine(
+    "primary", settings.DATABASE_URL, settings.DATABASE_POOL_SIZE, settings.DATABASE_MAX_OVERFLOW
 )
 
+# 只读副本引擎（未配置时为 None，读会话全部走主库）
+read_engine = _create_engine(
+    "replica", settings.DATABASE_READ_URL,
+    settings.DATABASE_READ_POOL_SIZE, settings.DATABASE_READ_MAX_OVERFLOW,
+) if settings.DATABASE_READ_URL else None
+
 # 创建异步会话工厂
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -29,17 +111,180 @@ class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncSession:
+# ==================== 写入标记 ====================
+
+def _mark_written(session: Session):
+    """标记会话（及其所属请求）已写主库，且当前事务有未提交的写入"""
+    session.info["use_primary"] = True
+    session.info["pending_writes"] = True
+    state = session.info.get("request_state")
+    if state is not None:
+        state.db_written = True
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    _mark_written(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _after_transaction(session):
+    session.info.pop("pending_writes", None)
+
+
+def has_pending_writes(session: AsyncSession) -> bool:
+    """会话是否有尚未提交的写入（未 flush 的对象变更，或已执行未提交的 flush / DML）"""
+    return bool(session.new or session.dirty or session.deleted or session.info.get("pending_writes"))
+
+
+async def release_connection(session: AsyncSession):
+    """
+    结束只读事务并把连接还给连接池（会话和已加载的对象仍可继续使用）
+
+    用于在外部网络调用或耗时计算之前释放连接；有未提交写入时不做任何事。
+    """
+    if session.in_transaction() and not has_pending_writes(session):
+        await session.commit()
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession):
+    """
+    显式写事务
+
+        async with unit_of_work(db):
+            ...  # 修改数据
+        await push_service.send_notification(...)  # 此时连接已归还
+
+    块内正常结束时提交一次，异常时回滚并继续抛出。
+    """
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+
+# ==================== 读写路由 ====================
+
+# 只读查询使用的 AUTOCOMMIT 引擎（共享连接池，每条查询单独执行，不发送 BEGIN / COMMIT）
+_primary_autocommit = engine.sync_engine.execution_options(isolation_level="AUTOCOMMIT")
+_replica_autocommit = (
+    read_engine.sync_engine.execution_options(isolation_level="AUTOCOMMIT") if read_engine is not None else None
+)
+
+
+class RoutingSession(Session):
+    """按语句选择主库或只读副本的同步会话（AsyncSession 底层使用）"""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+        if self.info.get("wrote"):
+            # 读会话中出现写入：此后全部在主库事务中执行，保证能读到自己未提交的写入
+            return engine.sync_engine
+        state = self.info.get("request_state")
+        if (
+            read_engine is None
+            or self.info.get("use_primary")
+            or getattr(state, "db_written", False)
+        ):
+            return _primary_autocommit
+        return _replica_autocommit
+
+
+AsyncReadSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+class ReplicaMonitor:
+    """
+    副本复制延迟检查
+
+    每 DATABASE_READ_LAG_CHECK_SECONDS 秒最多查询一次副本延迟并缓存结果，
+    延迟超过 DATABASE_READ_MAX_LAG_SECONDS 或查询失败时判定副本不可用。
+    """
+
+    # 副本已回放到最新 WAL 时 pg_last_xact_replay_timestamp() 不再前进，此时延迟按 0 计算
+    LAG_SQL = text(
+        "SELECT CASE"
+        " WHEN NOT pg_is_in_recovery() THEN 0"
+        " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+        " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+        " END"
+    )
+
+    def __init__(self):
+        self._checked_at = 0.0
+        self._usable = True
+        self._lag: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def lag(self) -> Optional[float]:
+        """最近一次测得的复制延迟（秒），查询失败或尚未检查时为 None"""
+        return self._lag
+
+    async def usable(self) -> bool:
+        if read_engine is None:
+            return False
+        if time.monotonic() - self._checked_at < settings.DATABASE_READ_LAG_CHECK_SECONDS:
+            return self._usable
+        async with self._lock:
+            if time.monotonic() - self._checked_at >= settings.DATABASE_READ_LAG_CHECK_SECONDS:
+                await self._check()
+        return self._usable
+
+    async def _check(self):
+        try:
+            async with read_engine.connect() as conn:
+                self._lag = float((await conn.execute(self.LAG_SQL)).scalar() or 0)
+            usable = self._lag <= settings.DATABASE_READ_MAX_LAG_SECONDS
+            if not usable:
+                logger.warning(f"只读副本复制延迟 {self._lag:.1f}s，读请求暂时改走主库")
+        except Exception as e:
+            self._lag = None
+            usable = False
+            logger.warning(f"只读副本不可用，读请求暂时改走主库: {e}")
+        if usable and not self._usable:
+            logger.info("只读副本已恢复")
+        self._usable = usable
+        self._checked_at = time.monotonic()
+
+
+replica_monitor = ReplicaMonitor()
+
+
+async def get_db(connection: HTTPConnection = None) -> AsyncSession:
     """
-    获取数据库会话（依赖注入）
+    获取数据库会话（依赖注入，写接口使用）
+
+    请求结束时仅在有未提交写入时提交（handler 已显式提交则不再发送 COMMIT），异常时回滚。
     
     Yields:
         AsyncSession: 数据库会话
     """
     async with AsyncSessionLocal() as session:
+        if connection is not None:
+            session.info["request_state"] = connection.state
         try:
             yield session
-            await session.commit()
+            if has_pending_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -47,13 +292,39 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
-async def init_db():
-    """初始化数据库表"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def get_read_db(connection: HTTPConnection = None) -> AsyncSession:
+    """
+    获取只读数据库会话（依赖注入，允许读副本的只读接口使用）
+
+    查询优先走只读副本；同一请求已写主库或副本延迟过大时走主库。AUTOCOMMIT 执行，不提交也不回滚。
+
+    Yields:
+        AsyncSession: 数据库会话
+    """
+    async with AsyncReadSessionLocal() as session:
+        if connection is not None:
+            session.info["request_state"] = connection.state
+        if not await replica_monitor.usable():
+            session.info["use_primary"] = True
+        yield session
+
+
+async def get_primary_read_db(connection: HTTPConnection = None) -> AsyncSession:
+    """
+    获取主库只读会话（依赖注入，需要读到用户自己最新数据的只读接口使用，如订单、地址、流水）
+
+    Yields:
+        AsyncSession: 数据库会话
+    """
+    async with AsyncReadSessionLocal() as session:
+        if connection is not None:
+            session.info["request_state"] = connection.state
+        session.info["use_primary"] = True
+        yield session
 
 
 async def close_db():
     """关闭数据库连接"""
     await engine.dispose()
-
+    if read_engine is not None:
+        await read_engine.dispose()
@@ -0,0 +1,130 @@
+"""
+启动检查与健康探针
+
+- 启动时只校验数据库的 Alembic 版本与代码中的迁移 head 一致（不再 create_all），
+  表结构变更统一由部署流程中的 alembic upgrade head 完成
+- /livez：进程存活即返回 200，不检查依赖（用于重启判断）
+- /readyz：检查数据库和 Redis 连通性（用于摘流/接流），结果缓存 HEALTH_CHECK_CACHE_SECONDS 秒，
+  并发探测共享同一次检查，避免探针放大对数据库的压力
+"""
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine, replica_monitor
+from app.core.redis import get_redis
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent.parent / "alembic"
+
+
+class SchemaRevisionMismatch(RuntimeError):
+    """数据库迁移版本与代码不一致"""
+
+
+def expected_revisions() -> Set[str]:
+    """代码中迁移脚本的 head 版本"""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(str(ALEMBIC_DIR)).get_heads())
+
+
+async def current_revisions() -> Set[str]:
+    """数据库 alembic_version 表记录的版本（未迁移过的库为空集合）"""
+    async with engine.connect() as conn:
+        exists = (await conn.execute(text("SELECT to_regclass('alembic_version')"))).scalar()
+        if exists is None:
+            return set()
+        return set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+
+
+async def check_schema_revision():
+    """
+    校验数据库迁移版本
+
+    SCHEMA_REVISION_CHECK=strict 时版本不一致抛出 SchemaRevisionMismatch（拒绝启动），
+    warn 时只记录告警，off 时跳过。
+    """
+    mode = settings.SCHEMA_REVISION_CHECK
+    if mode == "off":
+        return
+
+    expected = expected_revisions()
+    current = await current_revisions()
+    if current == expected:
+        logger.info(f"数据库迁移版本: {', '.join(sorted(current))}")
+        return
+
+    message = (
+        f"数据库迁移版本 {sorted(current) or '（未迁移）'} 与代码 {sorted(expected)} 不一致，"
+        f"请先执行 alembic upgrade head"
+    )
+    if mode == "strict":
+        raise SchemaRevisionMismatch(message)
+    logger.warning(message)
+
+
+class ReadinessChecker:
+    """依赖连通性检查（结果短时缓存）"""
+
+    def __init__(self):
+        self._checked_at = 0.0
+        self._result: Optional[Dict] = None
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> Dict:
+        if self._fresh():
+            return self._result
+        async with self._lock:
+            if not self._fresh():
+                self._result = await self._run()
+                self._checked_at = time.monotonic()
+        return self._result
+
+    def _fresh(self) -> bool:
+        return (
+            self._result is not None
+            and time.monotonic() - self._checked_at < settings.HEALTH_CHECK_CACHE_SECONDS
+        )
+
+    async def _run(self) -> Dict:
+        database, redis = await asyncio.gather(
+            self._probe(self._check_database()),
+            self._probe(self._check_redis()),
+        )
+        checks = {"database": database, "redis": redis}
+        if settings.DATABASE_READ_URL:
+            # 副本不可用时读请求自动退回主库，只报告状态，不影响就绪
+            usable = await replica_monitor.usable()
+            checks["replica"] = {"ok": usable, "lag_seconds": replica_monitor.lag, "required": False}
+
+        required = ["database"] + (["redis"] if settings.READINESS_REQUIRE_REDIS else [])
+        ready = all(checks[name]["ok"] for name in required)
+        if not ready:
+            logger.warning(f"就绪检查未通过: {checks}")
+        return {"status": "ready" if ready else "unavailable", "checks": checks}
+
+    @staticmethod
+    async def _check_database():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    @staticmethod
+    async def _check_redis():
+        await get_redis().ping()
+
+    @staticmethod
+    async def _probe(awaitable) -> Dict:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(awaitable, timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+readiness = ReadinessChecker()
@@ -0,0 +1,40 @@
+"""
+共享 HTTP 客户端
+
+推送等外部调用共用一个 httpx.AsyncClient（复用连接和 TLS 会话）。
+httpx 在首次使用时才导入并创建客户端，不计入服务启动耗时；应用关闭时释放。
+启用链路追踪时，客户端创建后注册 httpx 埋点（见 app.core.tracing）。
+"""
+from typing import TYPE_CHECKING, Optional
+
+from app.core.tracing import instrument_http_client
+
+if TYPE_CHECKING:
+    import httpx
+
+# 全局 HTTP 客户端（首次使用时创建）
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """
+    获取共享的异步 HTTP 客户端
+
+    Returns:
+        httpx.AsyncClient: 默认超时 10 秒
+    """
+    global _client
+    if _client is None:
+        import httpx
+
+        _client = httpx.AsyncClient(timeout=10.0)
+        instrument_http_client(_client)
+    return _client
+
+
+async def close_http_client():
+    """关闭 HTTP 客户端"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,143 @@
+"""
+日志配置
+
+统一使用 loguru 输出：
+
+- 单一 stderr sink，LOG_ENQUEUE=true 时由后台线程写出，请求协程只把记录放入队列
+- LOG_JSON=true 时每条记录输出一行 JSON（bind 的字段在 record.extra 中），便于日志平台解析
+- 标准库 logging（uvicorn、SQLAlchemy、第三方库）转发到 loguru，格式和级别一致
+- 按模块设置级别：LOG_MODULE_LEVELS="app.services.websocket_manager=WARNING,sqlalchemy.engine=INFO"
+
+高频日志的两种降噪方式（对绑定了对应字段的记录生效）：
+
+- 限流：logger.bind(throttle="ws.send_failed") 同一 key 每 LOG_THROTTLE_SECONDS 秒最多输出一条，
+  被丢弃的条数写入下一条记录的 extra.suppressed
+- 采样：logger.bind(sample=0.01) 只按比例输出
+
+热路径的日志使用 logger.debug("... {}", value) 形式，级别未开启时不做字符串格式化。
+"""
+import inspect
+import logging
+import random
+import sys
+import time
+from typing import Dict, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+
+# 文本格式（JSON 模式下不使用）
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+    "{extra[suppressed_note]}"
+)
+
+# 转发到 loguru 的标准库 logger（uvicorn 自带 handler，需要替换）
+STDLIB_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "uvicorn.asgi")
+
+
+def _parse_module_levels(value: str) -> Dict[str, int]:
+    """解析 "module=LEVEL,module=LEVEL" 为 {模块名: 级别数值}"""
+    levels = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        levels[name.strip()] = logger.level(level.strip().upper()).no
+    return levels
+
+
+class LogFilter:
+    """按模块级别过滤，并处理限流（throttle）和采样（sample）字段"""
+
+    def __init__(self, default_level: int, module_levels: Dict[str, int], throttle_seconds: float):
+        self.default_level = default_level
+        self.module_levels = module_levels
+        self.throttle_seconds = throttle_seconds
+        # 模块名 -> 生效级别（按点分前缀逐级查找，结果缓存）
+        self._resolved: Dict[str, int] = {}
+        # 限流 key -> (上次输出时间, 之后被丢弃的条数)
+        self._throttled: Dict[str, Tuple[float, int]] = {}
+
+    def level_for(self, name: str) -> int:
+        level = self._resolved.get(name)
+        if level is None:
+            level = self.default_level
+            module = name
+            while module:
+                if module in self.module_levels:
+                    level = self.module_levels[module]
+                    break
+                module = module.rpartition(".")[0]
+            self._resolved[name] = level
+        return level
+
+    def __call__(self, record) -> bool:
+        if record["level"].no < self.level_for(record["name"] or ""):
+            return False
+
+        extra = record["extra"]
+        extra["suppressed_note"] = ""
+        sample = extra.get("sample")
+        if sample is not None and random.random() >= sample:
+            return False
+
+        key = extra.get("throttle")
+        if key is not None:
+            now = time.monotonic()
+            last, suppressed = self._throttled.get(key, (0.0, 0))
+            if now - last < self.throttle_seconds:
+                self._throttled[key] = (last, suppressed + 1)
+                return False
+            self._throttled[key] = (now, 0)
+            if suppressed:
+                extra["suppressed"] = suppressed
+                extra["suppressed_note"] = f"（{self.throttle_seconds:g}s 内另有 {suppressed} 条相同日志被丢弃）"
+        return True
+
+
+class InterceptHandler(logging.Handler):
+    """把标准库 logging 的记录转发给 loguru（保留原调用位置）"""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        frame, depth = inspect.currentframe(), 0
+        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+def setup_logging():
+    """按配置重建 loguru sink，并接管标准库 logging（应用导入时调用一次）"""
+    default_level = logger.level(settings.LOG_LEVEL.upper()).no
+    module_levels = _parse_module_levels(settings.LOG_MODULE_LEVELS)
+
+    logger.remove()
+    logger.configure(extra={"suppressed_note": ""})
+    logger.add(
+        sys.stderr,
+        # sink 级别取最低的配置级别，具体过滤由 LogFilter 按模块完成
+        level=min([default_level, *module_levels.values()]),
+        filter=LogFilter(default_level, module_levels, settings.LOG_THROTTLE_SECONDS),
+        format=TEXT_FORMAT,
+        serialize=settings.LOG_JSON,
+        enqueue=settings.LOG_ENQUEUE,
+        backtrace=False,
+        diagnose=settings.DEBUG,
+    )
+
+    # loguru 与标准库的级别数值一致；标准库 logger 先按级别过滤，未开启的级别不会转发
+    logging.basicConfig(handlers=[InterceptHandler()], level=default_level, force=True)
+    for name, level in module_levels.items():
+        logging.getLogger(name).setLevel(level)
+    for name in STDLIB_LOGGERS:
+        stdlib_logger = logging.getLogger(name)
+        stdlib_logger.handlers = []
+        stdlib_logger.propagate = True
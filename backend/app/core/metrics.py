@@ -0,0 +1,206 @@
+"""
+Prometheus 指标
+
+通过 GET /metrics 输出（Prometheus 文本格式）：
+
+- HTTP：按 方法 / 路由模板 / 状态码 的请求耗时直方图；每个请求的 SQL 语句数和数据库耗时
+- 数据库连接池：获取连接等待耗时、获取超时次数、当前占用连接数和容量
+- WebSocket：当前连接数、在线技师数（来自 ConnectionManager.active_connections）
+- 推送：Expo / FCM 发送成功与失败次数
+- 预约漏斗：创建、接单、完成、取消次数
+
+gunicorn 多 worker 部署时各进程各自计数，gunicorn.conf.py 设置 PROMETHEUS_MULTIPROC_DIR，
+各 worker 把指标写入共享目录，/metrics 由任一 worker 汇总全部进程的数据。
+
+热路径上只做一次字典查找和计数，标签组合在进程内缓存，不经过 prometheus_client 的加锁查找。
+"""
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.routing import Mount
+
+from app.core.query_stats import _route_template, current_query_stats
+
+# 未匹配任何路由的请求（404 扫描等）统一归为一个标签，避免路径导致标签基数膨胀
+UNMATCHED_ROUTE = "unmatched"
+
+
+# ==================== 指标定义 ====================
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP 请求耗时（秒）",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "单个 HTTP 请求执行的 SQL 语句数",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+HTTP_REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "单个 HTTP 请求的数据库耗时（秒）",
+    ["route"],
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "从连接池获取连接的等待耗时（秒，含 pre-ping 和新建连接）",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "获取连接超时次数",
+    ["pool"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "当前占用的连接数",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity_connections",
+    "连接池容量（pool_size + max_overflow）",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "当前 WebSocket 连接数",
+    multiprocess_mode="livesum",
+)
+WEBSOCKET_THERAPISTS = Gauge(
+    "websocket_online_therapists",
+    "当前有 WebSocket 连接的技师数",
+    multiprocess_mode="livesum",
+)
+
+PUSH_NOTIFICATIONS = Counter(
+    "push_notifications_total",
+    "推送发送次数（Expo 按消息条数计）",
+    ["provider", "result"],
+)
+
+BOOKING_EVENTS = Counter(
+    "booking_events_total",
+    "预约漏斗事件数",
+    ["event"],
+)
+
+
+# ==================== 记录 ====================
+
+_request_children: Dict[Tuple[str, str, str], object] = {}
+_db_children: Dict[str, Tuple[object, object]] = {}
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float):
+    key = (method, route, str(status_code))
+    child = _request_children.get(key)
+    if child is None:
+        child = _request_children[key] = HTTP_REQUEST_DURATION.labels(*key)
+    child.observe(seconds)
+
+
+def observe_request_db(route: str, queries: int, db_ms: float):
+    children = _db_children.get(route)
+    if children is None:
+        children = _db_children[route] = (
+            HTTP_REQUEST_DB_QUERIES.labels(route),
+            HTTP_REQUEST_DB_DURATION.labels(route),
+        )
+    children[0].observe(queries)
+    children[1].observe(db_ms / 1000)
+
+
+def record_push(provider: str, success: bool, count: int = 1):
+    """记录推送结果（provider: expo / fcm）"""
+    PUSH_NOTIFICATIONS.labels(provider, "success" if success else "failure").inc(count)
+
+
+def record_booking_event(event: str, count: int = 1):
+    """记录预约漏斗事件（created / accepted / completed / cancelled）"""
+    BOOKING_EVENTS.labels(event).inc(count)
+
+
+def set_websocket_connections(connections: int, therapists: int):
+    WEBSOCKET_CONNECTIONS.set(connections)
+    WEBSOCKET_THERAPISTS.set(therapists)
+
+
+# ==================== 输出 ====================
+
+def render() -> Tuple[bytes, str]:
+    """生成 /metrics 响应体，多进程模式下汇总所有 worker"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# ==================== ASGI 中间件 ====================
+
+class MetricsMiddleware:
+    """
+    HTTP 请求指标中间件（纯 ASGI 实现，不包装响应体）
+
+    注册在 QueryStatsMiddleware 内层，请求结束时读取当前请求的 SQL 统计。
+    路由标签使用路由模板；挂载的子应用（/uploads）使用挂载路径。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._mounts: Optional[Tuple[str, ...]] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = self._route(scope)
+            observe_request(scope["method"], route, status_code, time.perf_counter() - started)
+            stats = current_query_stats()
+            if stats is not None:
+                observe_request_db(route, stats.count, stats.total_ms)
+
+    def _route(self, scope) -> str:
+        if self._mounts is None:
+            self._mounts = tuple(
+                route.path for route in scope["app"].routes if isinstance(route, Mount)
+            )
+        path = scope.get("path", "")
+        for mount in self._mounts:
+            if path == mount or path.startswith(mount + "/"):
+                return mount
+        if "endpoint" in scope:
+            return _route_template(scope)
+        return UNMATCHED_ROUTE
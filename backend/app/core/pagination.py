@@ -0,0 +1,58 @@
+"""
+游标（keyset）分页
+
+按 (排序列 DESC, id DESC) 排序的列表使用行比较代替 OFFSET：
+
+    WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC LIMIT n + 1
+
+配合 (owner_id, created_at DESC, id DESC) 之类的复合索引，翻到任意页都只扫描 n + 1 行，
+并发插入新记录时也不会出现重复或遗漏。游标对客户端不透明（base64 编码的 JSON [排序值, id]）。
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, TypeVar
+
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+
+# 下一页游标的响应头（列表接口保持返回数组，游标通过响应头传递）
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+def encode_cursor(value: Any, id: int) -> str:
+    """编码游标"""
+    raw = orjson.dumps([value, id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, python_type: type = datetime) -> Tuple[Any, int]:
+    """解码游标（排序值按 python_type 还原），格式错误时返回 400"""
+    try:
+        value, id = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value = datetime.fromisoformat(value) if python_type is datetime else python_type(value)
+        return value, int(id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
+def keyset_paginate(stmt: Select, sort_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """为查询追加游标条件、倒序排序和 LIMIT（多取一行用于判断是否还有下一页）"""
+    if cursor:
+        value, id = decode_cursor(cursor, sort_column.type.python_type)
+        stmt = stmt.where(tuple_(sort_column, id_column) < (value, id))
+    return stmt.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence[T], limit: int, sort_key: str = "created_at", id_key: str = "id"
+) -> Tuple[List[T], Optional[str]]:
+    """截取当前页，返回 (当前页, 下一页游标)；没有下一页时游标为 None"""
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(getattr(last, sort_key), getattr(last, id_key))
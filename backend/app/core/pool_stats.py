@@ -0,0 +1,120 @@
+"""
+连接池指标
+
+每个 worker 进程各自持有连接池，这里按引擎（primary / replica）统计本进程的：
+
+- 获取连接耗时（含 pre-ping 和新建连接）：次数、总耗时、最大值、累计分桶
+- 获取超时次数（超过 DATABASE_POOL_TIMEOUT 仍未拿到连接）
+- 当前占用 / 空闲 / 溢出连接数、利用率和峰值占用
+
+通过 /health/pool 查看（单个 worker 的明细），同样的数据也输出到 /metrics（见 app.core.metrics）。各 worker 的利用率长期偏低说明预算过大，
+等待耗时和超时增多则说明 DATABASE_POOL_SIZE / DATABASE_MAX_OVERFLOW 偏小。
+"""
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core import metrics
+
+# 获取连接耗时分桶上界（毫秒，累计计数）
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass
+class PoolStats:
+    """单个连接池的获取连接统计"""
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    peak_checked_out: int = 0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(WAIT_BUCKETS_MS))
+
+    def record(self, wait_ms: float, checked_out: int):
+        self.checkouts += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        self.peak_checked_out = max(self.peak_checked_out, checked_out)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.buckets[i] += 1
+
+
+_engines: Dict[str, AsyncEngine] = {}
+_stats: Dict[str, PoolStats] = {}
+
+
+def instrumented_pool(name: str) -> type:
+    """
+    返回记录获取连接耗时的连接池类（传给 create_async_engine 的 poolclass）
+
+    统计挂在类上，engine.dispose() 重建连接池后继续累计。
+    """
+    stats = _stats.setdefault(name, PoolStats())
+    wait_histogram = metrics.DB_POOL_CHECKOUT_WAIT.labels(name)
+    timeout_counter = metrics.DB_POOL_TIMEOUTS.labels(name)
+
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                stats.timeouts += 1
+                timeout_counter.inc()
+                raise
+            elapsed = time.perf_counter() - started
+            stats.record(elapsed * 1000, self.checkedout())
+            wait_histogram.observe(elapsed)
+            return connection
+
+    InstrumentedPool.__name__ = f"InstrumentedPool[{name}]"
+    return InstrumentedPool
+
+
+def track(name: str, engine: AsyncEngine):
+    """登记需要输出指标的引擎，并通过 checkout / checkin 事件维护占用连接数"""
+    _engines[name] = engine
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    metrics.DB_POOL_CAPACITY.labels(name).set(pool.size() + max(pool._max_overflow, 0))
+
+    checked_out = metrics.DB_POOL_CHECKED_OUT.labels(name)
+    event.listen(engine.sync_engine, "checkout", lambda *args: checked_out.inc())
+    event.listen(engine.sync_engine, "checkin", lambda *args: checked_out.dec())
+
+
+def pool_metrics() -> Dict:
+    """本 worker 进程所有连接池的当前状态和累计统计"""
+    pools = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            pools[name] = {"pool_class": type(pool).__name__}
+            continue
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        stats = _stats.get(name, PoolStats())
+        pools[name] = {
+            "pool_class": type(pool).__name__,
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "utilization": round(checked_out / capacity, 4) if capacity else None,
+            "peak_checked_out": stats.peak_checked_out,
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_ms_total": round(stats.wait_ms_total, 2),
+            "wait_ms_avg": round(stats.wait_ms_total / stats.checkouts, 3) if stats.checkouts else 0.0,
+            "wait_ms_max": round(stats.wait_ms_max, 2),
+            "wait_ms_buckets": dict(zip((str(b) for b in WAIT_BUCKETS_MS), stats.buckets)),
+        }
+    return {"pid": os.getpid(), "pools": pools}
@@ -0,0 +1,57 @@
+"""
+列表查询投影
+
+列表接口只需要少数字段，直接 select(实体) 会构建完整 ORM 对象（身份映射、属性状态、
+lazy="selectin" 关联的额外查询），随后又只拷贝几个字段到响应模型。Projection 声明
+“响应字段 -> 列表达式” 的映射，只查询这些列，结果行直接构造响应模型：
+
+    THERAPIST_LIST = Projection(
+        TherapistListResponse,
+        id=Therapist.id,
+        name=Therapist.name,
+        ...
+    )
+    result = await db.execute(THERAPIST_LIST.select().where(...))
+    items = THERAPIST_LIST.models(result)
+
+定义时校验必填字段都有对应的列，字段改名或新增必填字段时在导入阶段即报错。
+"""
+from typing import Any, Dict, Generic, Iterable, List, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class Projection(Generic[M]):
+    """响应模型字段到列表达式的映射"""
+
+    def __init__(self, schema: Type[M], **columns):
+        unknown = set(columns) - set(schema.model_fields)
+        missing = {
+            name for name, field in schema.model_fields.items()
+            if field.is_required() and name not in columns
+        }
+        if unknown or missing:
+            raise TypeError(
+                f"{schema.__name__} 投影字段不匹配: 缺少 {sorted(missing)}，多余 {sorted(unknown)}"
+            )
+        self.schema = schema
+        self.fields = tuple(columns)
+        self.columns = tuple(expr.label(name) for name, expr in columns.items())
+
+    def select(self, *extra) -> Select:
+        """只查询投影列（extra 为额外需要的列，如游标排序列，不进入响应）"""
+        return select(*self.columns, *extra)
+
+    def dicts(self, rows: Iterable[Any]) -> List[Dict[str, Any]]:
+        """结果行 -> dict（用于 ORJSONResponse 快速路径）"""
+        return [{name: row._mapping[name] for name in self.fields} for row in rows]
+
+    def models(self, rows: Iterable[Any]) -> List[M]:
+        """结果行 -> 响应模型（列类型已与模型一致，跳过校验）"""
+        return [
+            self.schema.model_construct(**{name: row._mapping[name] for name in self.fields})
+            for row in rows
+        ]
@@ -0,0 +1,179 @@
+"""
+请求级 SQL 统计
+
+通过 SQLAlchemy 游标事件统计每个请求执行的 SQL 语句数和数据库耗时：
+- 结果写入响应头 Server-Timing（db;dur=12.3;desc="8 queries"）
+- 每个请求输出一条结构化日志（loguru bind 字段）
+- 超过 SQL_SLOW_QUERY_MS 的语句按归一化指纹记录慢查询日志
+- 同一请求内同一指纹重复超过 SQL_N_PLUS_ONE_THRESHOLD 次时告警（疑似 N+1）
+"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+# ==================== 语句指纹 ====================
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_CAST_RE = re.compile(r"::\w+(?:\[\])?")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"\$\d+|%\([^)]+\)s|%s|:\w+|\?")
+_IN_LIST_RE = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_RE = re.compile(r"\bvalues\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*", re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    归一化 SQL 语句：去掉注释、字面量、类型转换和绑定参数，折叠 IN 列表和多行 VALUES
+
+    参数不同但结构相同的语句得到相同的指纹，用于聚合慢查询和识别 N+1。
+    """
+    sql = _COMMENT_RE.sub(" ", statement)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _CAST_RE.sub("", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("in (?+)", sql)
+    sql = _VALUES_RE.sub("values (?+)", sql)
+    return _SPACE_RE.sub(" ", sql).strip().lower()
+
+
+# ==================== 请求上下文 ====================
+
+@dataclass
+class QueryStats:
+    """单个请求的 SQL 统计"""
+    count: int = 0
+    total_ms: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    slow: List[Dict] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        fp = fingerprint(statement)
+        self.fingerprints[fp] += 1
+        if elapsed_ms >= settings.SQL_SLOW_QUERY_MS:
+            self.slow.append({"fingerprint": fp, "duration_ms": round(elapsed_ms, 2)})
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """同一请求中重复次数达到阈值的指纹（疑似 N+1）"""
+        return {fp: n for fp, n in self.fingerprints.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """当前请求的 SQL 统计（不在请求上下文中时为 None）"""
+    return _current_stats.get()
+
+
+# ==================== SQLAlchemy 事件 ====================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    stats.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+def instrument_engine(engine: Engine):
+    """在（同步）引擎上注册游标事件，异步引擎传入 engine.sync_engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ==================== ASGI 中间件 ====================
+
+def _route_template(scope) -> str:
+    """把路径参数还原为模板（/api/v1/bookings/123 -> /api/v1/bookings/{booking_id}），便于日志聚合"""
+    params = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    if not params:
+        return scope.get("path", "")
+    segments = scope.get("path", "").split("/")
+    return "/".join(f"{{{params[seg]}}}" if seg in params else seg for seg in segments)
+
+
+class QueryStatsMiddleware:
+    """
+    请求级 SQL 统计中间件（纯 ASGI 实现，不包装响应体）
+
+    在响应头发送前写入 Server-Timing；依赖 yield 的 get_db 在响应发送前提交，
+    因此 COMMIT 也计入统计。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, status_code, stats, (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _log(scope, status_code: int, stats: QueryStats, total_ms: float):
+        route = _route_template(scope)
+        log = logger.bind(
+            method=scope.get("method"),
+            route=route,
+            status=status_code,
+            duration_ms=round(total_ms, 2),
+            db_queries=stats.count,
+            db_ms=round(stats.total_ms, 2),
+        )
+
+        for slow in stats.slow:
+            log.bind(**slow).warning(f"慢查询 {slow['duration_ms']}ms: {slow['fingerprint']}")
+
+        repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        for fp, n in repeated.items():
+            log.bind(fingerprint=fp, repeat=n).warning(f"疑似 N+1 查询（{n} 次）: {route} -> {fp}")
+
+        if stats.count:
+            log.debug(f"{scope.get('method')} {route} {status_code} "
+                      f"{total_ms:.1f}ms, {stats.count} queries / {stats.total_ms:.1f}ms")
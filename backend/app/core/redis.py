@@ -0,0 +1,32 @@
+"""
+Redis 客户端
+"""
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+# 全局 Redis 客户端（首次使用时创建）
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """
+    获取 Redis 客户端单例
+
+    Returns:
+        Redis: 异步 Redis 客户端（decode_responses=True）
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close_redis():
+    """关闭 Redis 连接"""
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
@@ -0,0 +1,135 @@
+"""
+进程内定时任务调度
+
+多个 worker（以及多台机器）都会启动调度器，但只有拿到 PostgreSQL 会话级 advisory lock 的那一个
+（leader）执行任务；leader 进程退出或连接断开时锁自动释放，其他实例在下一轮轮询时接管。
+
+注意：会话级 advisory lock 要求直连数据库（或 PgBouncer session 模式）。
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.database import engine
+
+
+@dataclass
+class Job:
+    """定时任务"""
+    name: str
+    interval: float
+    func: Callable[[], Awaitable[Optional[int]]]
+    next_run: float = 0.0
+
+
+class Scheduler:
+    """基于 advisory lock 选主的定时任务调度器"""
+
+    def __init__(self, lock_key: int):
+        self.lock_key = lock_key
+        self.is_leader = False
+        self._jobs: List[Job] = []
+        self._conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, interval: float, func: Callable[[], Awaitable[Optional[int]]]):
+        """注册任务，interval 为执行间隔（秒），<= 0 表示不启用"""
+        if interval > 0:
+            self._jobs.append(Job(name=name, interval=interval, func=func))
+
+    async def start(self):
+        if not settings.SCHEDULER_ENABLED or not self._jobs or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release()
+
+    async def _try_acquire(self) -> bool:
+        """尝试成为 leader；未拿到锁时归还连接，避免长期占用连接池"""
+        conn = await engine.connect()
+        try:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = (await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            )).scalar()
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._conn = conn
+        logger.info(f"⏰ 当前进程成为定时任务 leader（advisory lock {self.lock_key}）")
+        return True
+
+    async def _heartbeat(self) -> bool:
+        """确认持有锁的连接仍然可用"""
+        try:
+            await self._conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"定时任务 leader 连接失效，放弃 leader: {e}")
+            await self._release()
+            return False
+
+    async def _release(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+        except Exception:
+            pass
+        try:
+            await self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+        self.is_leader = False
+
+    async def _run(self):
+        while True:
+            try:
+                if self.is_leader:
+                    self.is_leader = await self._heartbeat()
+                else:
+                    self.is_leader = await self._try_acquire()
+            except Exception as e:
+                logger.warning(f"定时任务选主失败: {e}")
+                self.is_leader = False
+
+            if self.is_leader:
+                await self._run_due_jobs()
+
+            await asyncio.sleep(settings.SCHEDULER_POLL_SECONDS)
+
+    async def _run_due_jobs(self):
+        for job in self._jobs:
+            now = time.monotonic()
+            if now < job.next_run:
+                continue
+            job.next_run = now + job.interval
+            started = time.perf_counter()
+            try:
+                processed = await job.func()
+            except Exception as e:
+                logger.exception(f"定时任务 {job.name} 执行失败: {e}")
+                continue
+            if processed:
+                logger.info(f"⏰ 定时任务 {job.name} 处理 {processed} 条，耗时 {time.perf_counter() - started:.2f}s")
+
+
+scheduler = Scheduler(lock_key=settings.SCHEDULER_LOCK_KEY)
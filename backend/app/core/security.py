@@ -1,6 +1,8 @@
 """
 安全模块 - JWT 认证、密码加密
 """
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
@@ -41,6 +43,8 @@ def create_access_token(
     
     to_encode = {
         "exp": expire,
+        "iat": time.time(),  # 保留小数：按用户吊销时区分同一秒内先后签发的 Token
+        "jti": uuid.uuid4().hex,  # 用于吊销（登出/封禁）
         "sub": str(subject),
         "type": "access"
     }
@@ -67,6 +71,8 @@ def create_refresh_token(subject: Any) -> str:
     
     to_encode = {
         "exp": expire,
+        "iat": time.time(),
+        "jti": uuid.uuid4().hex,
         "sub": str(subject),
         "type": "refresh"
     }
@@ -84,7 +90,7 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
         token_type: 令牌类型 (access/refresh)
         
     Returns:
-        包含 user_id 和 role 的字典，或 None
+        包含 user_id、role、jti、iat、exp 的字典，或 None
     """
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
@@ -97,7 +103,10 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
             
         return {
             "user_id": user_id,
-            "role": role
+            "role": role,
+            "jti": payload.get("jti"),
+            "iat": payload.get("iat"),
+            "exp": payload.get("exp")
         }
     except JWTError:
         return None
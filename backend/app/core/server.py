@@ -0,0 +1,39 @@
+"""
+生产服务进程配置
+"""
+import os
+
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    """
+    计算 worker 数量
+
+    - 显式配置 WEB_CONCURRENCY 时直接使用
+    - 否则等于 CPU 核数（异步 worker 单进程即可跑满一个核）
+
+    同时写回环境变量，使 fork/spawn 出的 worker 读取到相同的值，
+    据此均分数据库连接池（见 app.core.database.per_worker；gunicorn 的 post_fork 钩子
+    会按实际 worker 数再次写入）。
+    """
+    workers = settings.WEB_CONCURRENCY or os.cpu_count() or 1
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    return workers
+
+
+try:
+    from uvicorn.workers import UvicornWorker as _BaseUvicornWorker
+except ImportError:  # 未安装 gunicorn（开发环境）
+    _BaseUvicornWorker = None
+
+
+if _BaseUvicornWorker is not None:
+    class UvicornWorker(_BaseUvicornWorker):
+        """gunicorn 使用的 uvicorn worker：强制 uvloop + httptools，并启用优雅关闭"""
+
+        CONFIG_KWARGS = {
+            "loop": "uvloop",
+            "http": "httptools",
+            "timeout_graceful_shutdown": settings.GRACEFUL_TIMEOUT,
+        }
@@ -0,0 +1,239 @@
+"""
+Token 吊销（黑名单）
+
+- Redis 保存被吊销的 jti（TTL = Token 剩余有效期），以及按用户的"吊销截止时间"（封禁/全部登出）
+- 每个进程内维护一个布隆过滤器作为前置判断：绝大多数正常 Token 不命中过滤器，
+  鉴权热路径只需 O(1) 的内存计算，无需访问 Redis / 数据库
+- 只有命中过滤器的 jti 才会到 Redis 精确确认（排除误判）
+- 多个 worker 之间通过 Redis Pub/Sub 同步新增的吊销记录，并定期从 Redis 重建过滤器
+"""
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, Iterator, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+
+class BloomFilter:
+    """简单的布隆过滤器（bytearray 位图 + 双重哈希）"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        # m = -n * ln(p) / (ln2)^2, k = m / n * ln2
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class TokenRevocationStore:
+    """Token 吊销存储（Redis 后端 + 进程内布隆过滤器前置）"""
+
+    JTI_KEY_PREFIX = "auth:revoked:jti:"
+    USER_KEY_PREFIX = "auth:revoked:user:"
+    CHANNEL = "auth:revocations"
+
+    def __init__(self):
+        self._bloom = self._new_bloom()
+        # user_id -> 吊销截止时间戳（iat 不晚于该时间的 Token 全部失效）
+        self._user_cutoffs: Dict[int, float] = {}
+        # 无 Redis 时的本地精确记录 jti -> 过期时间戳（仅开发/单进程使用）
+        self._local_revoked: Dict[str, int] = {}
+        self._redis = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _new_bloom() -> BloomFilter:
+        return BloomFilter(
+            settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+            settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+        )
+
+    # ==================== 生命周期 ====================
+
+    async def start(self):
+        """连接 Redis、加载已有吊销记录并订阅变更"""
+        try:
+            redis = get_redis()
+            await redis.ping()
+        except Exception as e:
+            logger.warning(f"Token 吊销存储未连接 Redis，退化为进程内模式: {e}")
+            self._redis = None
+            return
+
+        self._redis = redis
+        await self._reload()
+        self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """停止订阅任务"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _reload(self):
+        """从 Redis 全量重建布隆过滤器和用户截止时间（顺便清除已过期的 jti）"""
+        bloom = self._new_bloom()
+        async for key in self._redis.scan_iter(match=f"{self.JTI_KEY_PREFIX}*", count=1000):
+            bloom.add(key[len(self.JTI_KEY_PREFIX):])
+
+        user_keys = [
+            key async for key in self._redis.scan_iter(match=f"{self.USER_KEY_PREFIX}*", count=1000)
+        ]
+        cutoffs: Dict[int, float] = {}
+        if user_keys:
+            values = await self._redis.mget(user_keys)
+            for key, value in zip(user_keys, values):
+                if value is not None:
+                    cutoffs[int(key[len(self.USER_KEY_PREFIX):])] = float(value)
+
+        self._bloom = bloom
+        self._user_cutoffs = cutoffs
+
+    async def _listen(self):
+        """订阅其他 worker 发布的吊销事件，并定期重建过滤器"""
+        last_reload = time.monotonic()
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                try:
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message:
+                            self._apply_event(message["data"])
+                        if time.monotonic() - last_reload > settings.TOKEN_REVOCATION_REBUILD_SECONDS:
+                            await self._reload()
+                            last_reload = time.monotonic()
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token 吊销订阅中断，5 秒后重试: {e}")
+                await asyncio.sleep(5)
+
+    def _apply_event(self, data: str):
+        """应用一条吊销事件: "jti:<jti>" 或 "user:<user_id>:<cutoff>" """
+        kind, _, value = data.partition(":")
+        if kind == "jti":
+            self._bloom.add(value)
+        elif kind == "user":
+            user_id, _, cutoff = value.partition(":")
+            self._user_cutoffs[int(user_id)] = float(cutoff)
+
+    # ==================== 查询 ====================
+
+    async def is_revoked(
+        self,
+        jti: Optional[str],
+        user_id: Optional[int] = None,
+        issued_at: Optional[float] = None
+    ) -> bool:
+        """
+        检查 Token 是否已被吊销
+
+        Args:
+            jti: Token 唯一 ID
+            user_id: 用户 ID（用于检查封禁/全部登出）
+            issued_at: Token 签发时间戳（可带小数）
+
+        Returns:
+            是否已吊销
+        """
+        if user_id is not None:
+            cutoff = self._user_cutoffs.get(user_id)
+            if cutoff is not None and (issued_at or 0) <= cutoff:
+                return True
+
+        if not jti or jti not in self._bloom:
+            return False
+
+        # 命中过滤器（可能是误判），精确确认
+        if self._redis is None:
+            return self._local_revoked.get(jti, 0) > time.time()
+        try:
+            return bool(await self._redis.exists(f"{self.JTI_KEY_PREFIX}{jti}"))
+        except Exception as e:
+            logger.warning(f"Token 吊销状态查询失败，按已吊销处理: {e}")
+            return True
+
+    # ==================== 吊销 ====================
+
+    async def revoke(self, jti: str, expires_at: int):
+        """
+        吊销单个 Token
+
+        Args:
+            jti: Token 唯一 ID
+            expires_at: Token 过期时间戳（记录保留到此时间）
+        """
+        ttl = max(1, int(expires_at - time.time()))
+        self._bloom.add(jti)
+
+        if self._redis is None:
+            self._local_revoked[jti] = int(expires_at)
+            return
+
+        try:
+            await self._redis.set(f"{self.JTI_KEY_PREFIX}{jti}", 1, ex=ttl)
+            await self._redis.publish(self.CHANNEL, f"jti:{jti}")
+        except Exception as e:
+            # 本进程的过滤器已记录（命中后 Redis 不可用时按已吊销处理）；其他 worker 需等 Redis 恢复
+            logger.warning(f"Token 吊销写入 Redis 失败，仅在当前进程生效: {e}")
+
+    async def revoke_user(self, user_id: int) -> bool:
+        """
+        吊销用户当前所有 Token（停用账号、全部设备登出）
+
+        Args:
+            user_id: 用户 ID
+
+        Returns:
+            是否已写入 Redis 并通知其他 worker（False 表示只在当前进程生效）
+        """
+        # 只吊销此刻之前签发的 Token（iat 带小数），吊销之后同一秒内重新登录签发的 Token 不受影响
+        cutoff = time.time()
+        self._user_cutoffs[user_id] = cutoff
+
+        if self._redis is None:
+            return False
+
+        # 最长的 Token 过期后该记录即无意义
+        ttl = max(
+            settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+        )
+        try:
+            await self._redis.set(f"{self.USER_KEY_PREFIX}{user_id}", cutoff, ex=ttl)
+            await self._redis.publish(self.CHANNEL, f"user:{user_id}:{cutoff}")
+        except Exception as e:
+            logger.warning(f"用户 Token 吊销写入 Redis 失败，仅在当前进程生效: user_id={user_id}, {e}")
+            return False
+        return True
+
+
+# 全局 Token 吊销存储实例
+revocation_store = TokenRevocationStore()
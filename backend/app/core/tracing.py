@@ -0,0 +1,149 @@
+"""
+OpenTelemetry 链路追踪（可选，TRACING_ENABLED=true 时启用）
+
+启用后每个请求生成一条链路：
+
+- FastAPI 路由：服务端 span（名称为 方法 + 路由模板），探针和 /metrics 不采集
+- SQLAlchemy：每条 SQL 语句一个 span（主库和只读副本）
+- httpx：共享 HTTP 客户端的外部调用（Expo / FCM 推送）
+- 业务 span：推送发送、WebSocket 发送等，通过 span() 手动标记
+
+采样使用 ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO))：上游已决定采样的请求跟随上游，
+其余按比例采样。导出器由 TRACING_EXPORTER 选择：
+
+- otlp:    OTLP/HTTP 批量导出到 TRACING_OTLP_ENDPOINT（Jaeger / Tempo / Collector）
+- console: 输出到标准输出（本地调试）
+- memory:  保存在内存中，测试通过 memory_exporter().get_finished_spans() 断言
+
+未启用时不导入 opentelemetry，span() 返回空上下文管理器，对请求路径几乎没有开销。
+"""
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+    from fastapi import FastAPI
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 探针和指标接口不生成链路（逗号分隔的正则）
+EXCLUDED_URLS = "livez,readyz,health,metrics"
+
+_NOOP_SPAN = nullcontext()
+
+_provider = None
+_tracer = None
+_memory_exporter = None
+_instrumented_app: Optional["FastAPI"] = None
+
+
+def _span_processor():
+    """按 TRACING_EXPORTER 创建导出器和对应的处理器"""
+    global _memory_exporter
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+
+    exporter_name = settings.TRACING_EXPORTER
+    if exporter_name == "memory":
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        _memory_exporter = InMemorySpanExporter()
+        return SimpleSpanProcessor(_memory_exporter)
+    if exporter_name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return BatchSpanProcessor(ConsoleSpanExporter())
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT))
+    raise ValueError(f"未知的 TRACING_EXPORTER: {exporter_name}（可选 otlp / console / memory）")
+
+
+def setup_tracing(app: "FastAPI", engines: Iterable[Optional["AsyncEngine"]]):
+    """
+    初始化链路追踪并注册 FastAPI / SQLAlchemy 自动埋点
+
+    需在应用注册完中间件后调用（追踪中间件位于最外层，覆盖其余中间件的耗时）。
+    已启用时不重复初始化；shutdown_tracing 撤销埋点后可再次调用。
+    """
+    global _provider, _tracer, _instrumented_app
+    if not settings.TRACING_ENABLED or _provider is not None:
+        return
+
+    from opentelemetry import trace
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    _provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": settings.TRACING_SERVICE_NAME,
+            "service.version": settings.APP_VERSION,
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    _provider.add_span_processor(_span_processor())
+    trace.set_tracer_provider(_provider)
+    _tracer = _provider.get_tracer("landa")
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=_provider, excluded_urls=EXCLUDED_URLS)
+    SQLAlchemyInstrumentor().instrument(
+        engines=[engine.sync_engine for engine in engines if engine is not None],
+        tracer_provider=_provider,
+    )
+    _instrumented_app = app
+    logger.info(
+        f"链路追踪已启用: exporter={settings.TRACING_EXPORTER}, "
+        f"sample_ratio={settings.TRACING_SAMPLE_RATIO}"
+    )
+
+
+def instrument_http_client(client: "httpx.AsyncClient"):
+    """为共享 HTTP 客户端注册 httpx 埋点（未启用追踪时不处理）"""
+    if _provider is None:
+        return
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+    HTTPXClientInstrumentor.instrument_client(client, tracer_provider=_provider)
+
+
+def span(name: str, **attributes: Any):
+    """
+    业务 span（作为当前 span 的子 span）
+
+        with span("push.expo.send", tokens=len(tokens)):
+            ...
+
+    未启用追踪时返回空上下文管理器。
+    """
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def memory_exporter():
+    """内存导出器（仅 TRACING_EXPORTER=memory 时可用，供测试读取已结束的 span）"""
+    return _memory_exporter
+
+
+def shutdown_tracing():
+    """撤销 setup_tracing 注册的 FastAPI / SQLAlchemy 埋点，导出剩余的 span 并关闭（应用关闭时调用）"""
+    global _provider, _tracer, _instrumented_app
+    if _provider is None:
+        return
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    if _instrumented_app is not None:
+        FastAPIInstrumentor.uninstrument_app(_instrumented_app)
+    SQLAlchemyInstrumentor().uninstrument()
+    _provider.shutdown()
+    _provider = None
+    _tracer = None
+    _instrumented_app = None
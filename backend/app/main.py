@@ -2,31 +2,70 @@
 Landa API 主入口
 """
 import os
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from app.core.config import settings
-from app.core.database import init_db, close_db
-from app.api.v1 import api_router
+from app.core.log import setup_logging
+from app.core.database import close_db, engine, read_engine
+from app.core.health import check_schema_revision, readiness
+from app.core.metrics import MetricsMiddleware, render as render_metrics
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.pool_stats import pool_metrics
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.http_client import close_http_client
+from app.core.redis import close_redis
+from app.core.token_revocation import revocation_store
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.core.scheduler import scheduler
+from app.services.scheduled_jobs import register_jobs
+from app.api.v1 import include_api_routes
+
+# 日志配置（替换 loguru 默认 sink，接管标准库 logging）
+setup_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    # 启动时
+    # 启动时（记录各步骤耗时，便于排查冷启动变慢）
     logger.info("Starting Landa API...")
-    await init_db()
-    logger.info("Database initialized")
+    started = time.perf_counter()
+    steps = {}
+    
+    await check_schema_revision()
+    steps["schema_check"] = time.perf_counter()
+    await revocation_store.start()
+    steps["revocation_store"] = time.perf_counter()
+    register_jobs(scheduler)
+    await scheduler.start()
+    steps["scheduler"] = time.perf_counter()
+    
+    previous = started
+    timings = []
+    for name, moment in steps.items():
+        timings.append(f"{name}={(moment - previous) * 1000:.0f}ms")
+        previous = moment
+    logger.info(f"Startup completed in {(previous - started) * 1000:.0f}ms ({', '.join(timings)})")
     
     yield
     
     # 关闭时
     logger.info("Shutting down Landa API...")
+    await scheduler.stop()
+    await revocation_store.stop()
+    await close_redis()
+    await close_http_client()
     await close_db()
     logger.info("Database connection closed")
+    shutdown_tracing()
+    await logger.complete()
 
 
 # 创建 FastAPI 应用
@@ -47,6 +86,7 @@ app = FastAPI(
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
     openapi_url="/openapi.json" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -57,10 +97,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Prometheus 请求指标中间件（注册在 SQL 统计中间件内层，以便读取请求的 SQL 统计）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# SQL 统计中间件（Server-Timing + 慢查询/N+1 日志）
+if settings.SQL_QUERY_STATS:
+    app.add_middleware(QueryStatsMiddleware)
+
 # 注册 API 路由
-app.include_router(api_router, prefix=settings.API_V1_PREFIX)
+include_api_routes(app, settings.API_V1_PREFIX)
+
+# 链路追踪（可选，最后注册使追踪中间件位于最外层）
+setup_tracing(app, [engine, read_engine])
+
+
+# 连接池耗尽
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """连接池耗尽且等待超时：返回 503，提示客户端稍后重试"""
+    logger.warning(f"数据库连接池获取超时: {request.method} {request.url.path}")
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "服务繁忙，请稍后重试"},
+        headers={"Retry-After": "1"},
+    )
+
 
 # 挂载静态文件目录（用于访问上传的图片）
 uploads_dir = os.path.join(os.getcwd(), "uploads")
@@ -79,6 +144,33 @@ async def health_check():
     }
 
 
+@app.get("/livez", tags=["系统"])
+async def livez():
+    """存活探针（不检查依赖，进程能处理请求即返回 200）"""
+    return {"status": "alive"}
+
+
+@app.get("/readyz", tags=["系统"])
+async def readyz():
+    """就绪探针（检查数据库和 Redis 连通性，未就绪返回 503）"""
+    result = await readiness.check()
+    return ORJSONResponse(result, status_code=200 if result["status"] == "ready" else 503)
+
+
+@app.get("/health/pool", tags=["系统"])
+async def pool_health():
+    """当前 worker 的数据库连接池指标（占用、利用率、获取连接等待耗时）"""
+    return pool_metrics()
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", tags=["系统"], include_in_schema=False)
+    def metrics():
+        """Prometheus 指标（多进程模式下汇总所有 worker 的指标文件，在线程池中执行）"""
+        body, content_type = render_metrics()
+        return Response(body, headers={"Content-Type": content_type})
+
+
 @app.get("/", tags=["系统"])
 async def root():
     """根路径"""
@@ -91,10 +183,20 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.DEBUG
-    )
+    from app.core.server import worker_count
+    
+    if settings.DEBUG:
+        # 开发模式：单进程 + 自动重载
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # 生产模式：多 worker（推荐使用 gunicorn -c gunicorn.conf.py app.main:app）
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=worker_count(),
+            loop="uvloop",
+            http="httptools",
+            timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+        )
 
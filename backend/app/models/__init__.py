@@ -2,11 +2,11 @@
 数据库模型导出
 """
 from app.models.user import User, Address, Favorite, UserRole, MemberLevel
-from app.models.therapist import Therapist, TherapistSchedule, TherapistTimeSlot
+from app.models.therapist import Therapist, TherapistSchedule, TherapistTimeSlot, TherapistRank
 from app.models.service import Service, ServiceCategory, TherapistService
 from app.models.booking import Booking, BookingStatus
 from app.models.order import Order, PaymentMethod, PaymentStatus
-from app.models.review import Review
+from app.models.review import Review, RatingAggregate, RatingSubject
 from app.models.therapist_customer_review import TherapistCustomerReview
 from app.models.coupon import CouponTemplate, UserCoupon, PointsHistory, CouponType, CouponStatus
 from app.models.notification import Notification, PushToken, TherapistNotificationSettings, NotificationType, NotificationPriority, NotificationStatus
@@ -23,6 +23,7 @@ __all__ = [
     "Therapist",
     "TherapistSchedule",
     "TherapistTimeSlot",
+    "TherapistRank",
     # Service
     "Service",
     "ServiceCategory",
@@ -36,6 +37,8 @@ __all__ = [
     "PaymentStatus",
     # Review
     "Review",
+    "RatingAggregate",
+    "RatingSubject",
     "TherapistCustomerReview",
     # Coupon
     "CouponTemplate",
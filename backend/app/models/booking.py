@@ -3,8 +3,14 @@
 """
 from datetime import datetime, date, time
 from typing import Optional
-from sqlalchemy import String, Boolean, DateTime, Text, Integer, Float, Date, Time, Enum as SQLEnum, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    String, Boolean, DateTime, Text, Integer, Float, Date, Time, Enum as SQLEnum, ForeignKey, Index,
+    Computed, DDL, event, text,
+)
+from sqlalchemy.dialects.postgresql import TSRANGE, ExcludeConstraint, Range
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.orm import Mapped, mapped_column, relationship, deferred
 import enum
 
 from app.core.database import Base
@@ -24,6 +30,22 @@ class BookingStatus(str, enum.Enum):
 class Booking(Base):
     """预约表"""
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_therapist_id_booking_date", "therapist_id", "booking_date"),
+        # 定时任务按状态 + 开始时间批量扫描（超时取消、服务提醒）
+        Index("ix_bookings_status_booking_date_start_time", "status", "booking_date", "start_time"),
+        # 同一技师未取消的预约时间区间不能重叠（需要 btree_gist 扩展；仅 PostgreSQL 建立，
+        # 其他数据库如测试用 SQLite 由 slot_engine.has_booking_overlap 预检查）
+        ExcludeConstraint(
+            ("therapist_id", "="),
+            ("during", "&&"),
+            name="ex_bookings_therapist_during",
+            using="gist",
+            where=text("status NOT IN ('CANCELLED', 'REFUNDED')"),
+        ).ddl_if(dialect="postgresql"),
+    )
+    # 不在 INSERT/UPDATE 时用 RETURNING 取回数据库生成的 during（只用于排除约束，应用不读取）
+    __mapper_args__ = {"eager_defaults": False}
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     booking_no: Mapped[str] = mapped_column(String(50), unique=True, index=True)
@@ -37,6 +59,13 @@ class Booking(Base):
     start_time: Mapped[time] = mapped_column(Time)
     end_time: Mapped[time] = mapped_column(Time)
     duration: Mapped[int] = mapped_column(Integer)
+    # 占用区间 [开始, 开始 + 服务时长)，由数据库生成（仅 PostgreSQL，见 _skip_postgresql_only_column）
+    during: Mapped[Optional[Range]] = deferred(mapped_column(
+        TSRANGE,
+        Computed("tsrange(booking_date + start_time, booking_date + start_time + duration * interval '1 minute', '[)')"),
+        nullable=True,
+        info={"postgresql_only": True},
+    ))
     
     service_price: Mapped[float] = mapped_column(Float)
     discount_amount: Mapped[float] = mapped_column(Float, default=0)
@@ -61,6 +90,7 @@ class Booking(Base):
     therapist_arrived_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     service_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     service_completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    reminder_sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
@@ -85,6 +115,28 @@ class Booking(Base):
     )
 
 
+def is_booking_overlap(error: Exception) -> bool:
+    """IntegrityError 是否由预约区间排除约束触发（SQLSTATE 23P01）"""
+    orig = getattr(error, "orig", None)
+    return getattr(orig, "sqlstate", None) == "23P01" or "ex_bookings_therapist_during" in str(orig)
+
+
+@compiles(CreateColumn, "sqlite")
+def _skip_postgresql_only_column(element, compiler, **kw):
+    """SQLite 建表时跳过只能在 PostgreSQL 上生成的列（during）"""
+    if element.element.info.get("postgresql_only"):
+        return None
+    return compiler.visit_create_column(element, **kw)
+
+
+# 排除约束依赖 btree_gist（整数列的 = 运算符）
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+
 # 避免循环导入
 from app.models.therapist import Therapist
 from app.models.order import Order
@@ -2,8 +2,9 @@
 财务相关模型
 """
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
-from sqlalchemy import String, Float, DateTime, ForeignKey, Enum as SQLEnum, Integer, Text
+from sqlalchemy import String, Numeric, DateTime, ForeignKey, Enum as SQLEnum, Integer, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -30,10 +31,10 @@ class TherapistBalance(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"), unique=True, index=True)
     
-    # 金额字段 (使用 Float 保持与现有项目一致，虽然金融计算推荐 Decimal)
-    balance: Mapped[float] = mapped_column(Float, default=0.0)      # 可用余额
-    total_income: Mapped[float] = mapped_column(Float, default=0.0) # 累计总收入
-    frozen_amount: Mapped[float] = mapped_column(Float, default=0.0) # 冻结金额 (提现中)
+    # 金额字段 (Numeric 精确到分，只通过 app.services.ledger 原子更新)
+    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal("0"))      # 可用余额
+    total_income: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal("0")) # 累计总收入
+    frozen_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal("0")) # 冻结金额 (提现中)
 
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, 
@@ -50,9 +51,9 @@ class Withdrawal(Base):
     __tablename__ = "withdrawals"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"), index=True)
+    therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"))
     
-    amount: Mapped[float] = mapped_column(Float) # 提现金额
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2)) # 提现金额
     status: Mapped[WithdrawalStatus] = mapped_column(
         SQLEnum(WithdrawalStatus),
         default=WithdrawalStatus.PENDING
@@ -76,21 +77,38 @@ class Withdrawal(Base):
 
 
 class Transaction(Base):
-    """资金流水表"""
+    """资金流水表（只追加，不修改）"""
     __tablename__ = "transactions"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"), index=True)
+    therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"))
     
     type: Mapped[TransactionType] = mapped_column(SQLEnum(TransactionType))
-    amount: Mapped[float] = mapped_column(Float) # 变动金额 (正数增加，负数减少)
-    balance_after: Mapped[float] = mapped_column(Float) # 变动后余额
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2)) # 变动金额 (正数增加，负数减少)
+    balance_after: Mapped[Decimal] = mapped_column(Numeric(12, 2)) # 变动后余额
     
     description: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     reference_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True) # 关联ID (如 order_no 或 withdrawal_id)
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, unique=True) # 幂等键，防止重复记账
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
     # 关系
     therapist: Mapped["Therapist"] = relationship("Therapist")
 
+
+# 按技师倒序分页（游标分页 + 时间范围过滤），同时覆盖原 therapist_id 单列索引；
+# 提现状态过滤在此索引上逐行判断（每个技师的提现记录很少）
+Index(
+    "ix_withdrawals_therapist_id_created_at_id",
+    Withdrawal.therapist_id, Withdrawal.created_at.desc(), Withdrawal.id.desc(),
+)
+Index(
+    "ix_transactions_therapist_id_created_at_id",
+    Transaction.therapist_id, Transaction.created_at.desc(), Transaction.id.desc(),
+)
+# 按流水类型过滤时的倒序分页
+Index(
+    "ix_transactions_therapist_id_type_created_at_id",
+    Transaction.therapist_id, Transaction.type, Transaction.created_at.desc(), Transaction.id.desc(),
+)
@@ -17,6 +17,7 @@ class NotificationType(str, enum.Enum):
     ORDER_COMPLETED = "order_completed"  # 订单完成
     SYSTEM_MESSAGE = "system_message"    # 系统消息
     PAYMENT_SUCCESS = "payment_success"  # 支付成功
+    BOOKING_REMINDER = "booking_reminder"  # 服务开始提醒
 
 
 class NotificationStatus(str, enum.Enum):
@@ -1,9 +1,10 @@
 """
 评价模型
 """
+import enum
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import String, Boolean, DateTime, Text, Integer, Float, JSON, ForeignKey
+from sqlalchemy import String, Boolean, DateTime, Text, Integer, Float, JSON, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -16,7 +17,7 @@ class Review(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
-    therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"), index=True)
+    therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"))
     booking_id: Mapped[int] = mapped_column(ForeignKey("bookings.id"), index=True, unique=True)
     service_id: Mapped[int] = mapped_column(ForeignKey("services.id"), index=True)
     
@@ -48,6 +49,44 @@ class Review(Base):
     booking: Mapped["Booking"] = relationship("Booking", back_populates="review")
 
 
+# 技师主页评价列表：按技师 + 可见性过滤，(created_at, id) 倒序游标分页，同时覆盖原 therapist_id 单列索引
+Index(
+    "ix_reviews_therapist_id_is_visible_created_at_id",
+    Review.therapist_id, Review.is_visible, Review.created_at.desc(), Review.id.desc(),
+)
+
+
+class RatingSubject(str, enum.Enum):
+    """评分聚合对象"""
+    THERAPIST = "therapist"
+    SERVICE = "service"
+
+
+class RatingAggregate(Base):
+    """
+    评分聚合表（每个技师/服务一行，按星级计数，只统计可见评价）
+
+    与评价的新增、显示/隐藏、删除在同一事务内增量更新（见 app.services.ratings），
+    评分分布和平均分通过一次主键查询获得。
+    """
+    __tablename__ = "rating_aggregates"
+
+    subject_type: Mapped[RatingSubject] = mapped_column(SQLEnum(RatingSubject), primary_key=True)
+    subject_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    star_1: Mapped[int] = mapped_column(Integer, default=0)
+    star_2: Mapped[int] = mapped_column(Integer, default=0)
+    star_3: Mapped[int] = mapped_column(Integer, default=0)
+    star_4: Mapped[int] = mapped_column(Integer, default=0)
+    star_5: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    @property
+    def review_count(self) -> int:
+        return self.star_1 + self.star_2 + self.star_3 + self.star_4 + self.star_5
+
+
 # 避免循环导入
 from app.models.user import User
 from app.models.therapist import Therapist
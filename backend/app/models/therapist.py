@@ -4,7 +4,11 @@
 import enum
 from datetime import datetime, date, time
 from typing import Optional, List
-from sqlalchemy import String, Boolean, DateTime, Text, Integer, Float, JSON, Date, Time, ForeignKey, Enum
+from sqlalchemy import (
+    String, Boolean, DateTime, Text, Integer, SmallInteger, Float, JSON, Date, Time, ForeignKey, Enum,
+    UniqueConstraint, CheckConstraint, Index,
+)
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -99,13 +103,28 @@ class Therapist(Base):
 
 
 class TherapistSchedule(Base):
-    """治疗师排班表"""
+    """
+    治疗师排班表
+    
+    - 每周规则：weekday（0=周一 ... 6=周日）非空，date 为空
+    - 指定日期例外：date 非空，weekday 为空；is_available=True 表示当天改用这些时间段，
+      is_available=False 表示当天这些时间段不可预约（请假/休息）
+    
+    可用时段由 app.services.slot_engine 根据规则实时计算。
+    """
     __tablename__ = "therapist_schedules"
+    __table_args__ = (
+        CheckConstraint(
+            "(weekday IS NULL) <> (date IS NULL)",
+            name="ck_therapist_schedules_weekday_or_date",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"), index=True)
     
-    date: Mapped[date] = mapped_column(Date, index=True)
+    weekday: Mapped[Optional[int]] = mapped_column(SmallInteger, nullable=True)
+    date: Mapped[Optional[date]] = mapped_column(Date, nullable=True, index=True)
     start_time: Mapped[time] = mapped_column(Time)
     end_time: Mapped[time] = mapped_column(Time)
     is_available: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -119,8 +138,16 @@ class TherapistSchedule(Base):
 
 
 class TherapistTimeSlot(Base):
-    """治疗师时段表"""
+    """
+    治疗师时段表
+    
+    有排班规则的技师：由后台任务按规则滚动生成未来窗口的时段（用于预约时锁定），
+    is_available=False 的行作为单个时段的例外覆盖；没有排班规则的技师沿用预生成的时段。
+    """
     __tablename__ = "therapist_time_slots"
+    __table_args__ = (
+        UniqueConstraint("therapist_id", "date", "start_time", name="uq_therapist_time_slots_therapist_date_start"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id"), index=True)
@@ -141,6 +168,49 @@ class TherapistTimeSlot(Base):
     )
 
 
+class TherapistRank(Base):
+    """
+    技师排序分（预计算）
+
+    技师通过认证时写入默认分（见 _rank_new_therapist / _rank_verified_therapist），由定时任务 refresh_therapist_ranks
+    周期重算并补齐缺失的行（见 app.services.therapist_rank），列表接口 INNER JOIN 本表、
+    按 (score DESC, therapist_id DESC) 游标分页，不在请求中做聚合。
+    """
+    __tablename__ = "therapist_ranks"
+    __table_args__ = (
+        # 倒序翻页走索引反向扫描
+        Index("ix_therapist_ranks_score_therapist_id", "score", "therapist_id"),
+    )
+
+    therapist_id: Mapped[int] = mapped_column(ForeignKey("therapists.id", ondelete="CASCADE"), primary_key=True)
+    score: Mapped[float] = mapped_column(Float)
+
+    # 计算分数时的各项指标（便于排查排序结果）
+    rating: Mapped[float] = mapped_column(Float)
+    review_count: Mapped[int] = mapped_column(Integer)
+    completed_count: Mapped[int] = mapped_column(Integer)
+    acceptance_rate: Mapped[float] = mapped_column(Float)
+    open_slots: Mapped[int] = mapped_column(Integer)
+
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+@event.listens_for(Therapist, "after_insert")
+def _rank_new_therapist(mapper, connection, target):
+    """新建即已认证的技师，在同一事务内写入默认排序分"""
+    if target.is_verified:
+        from app.services.therapist_rank import insert_default_rank
+        insert_default_rank(connection, target)
+
+
+@event.listens_for(Therapist, "after_update")
+def _rank_verified_therapist(mapper, connection, target):
+    """is_verified 改为 True 时，在同一事务内写入默认排序分（已有排序分时不覆盖）"""
+    if target.is_verified and inspect(target).attrs.is_verified.history.has_changes():
+        from app.services.therapist_rank import insert_default_rank
+        insert_default_rank(connection, target)
+
+
 # 避免循环导入
 from app.models.service import TherapistService
 from app.models.booking import Booking
@@ -6,6 +6,7 @@ from typing import Optional, List
 from pydantic import BaseModel, Field
 
 from app.models.booking import BookingStatus
+from app.models.coupon import CouponType
 from app.models.order import PaymentMethod, PaymentStatus
 
 
@@ -28,16 +29,31 @@ class BookingPricePreview(BaseModel):
     therapist_id: int
     service_id: int
     coupon_id: Optional[int] = None
+    auto_coupon: bool = False  # 未指定 coupon_id 时自动使用抵扣最多的优惠券
     points_to_use: int = Field(default=0, ge=0)
 
 
+class CouponQuote(BaseModel):
+    """可用于本次预约的优惠券及其抵扣金额"""
+    id: int
+    code: str
+    coupon_type: CouponType
+    value: float
+    deduction: float
+    valid_end: datetime
+
+
 class BookingPriceResponse(BaseModel):
     """预约价格响应"""
     service_price: float
     discount_amount: float = 0
+    coupon_id: Optional[int] = None  # 实际使用的优惠券
     coupon_deduction: float = 0
+    points_used: int = 0  # 实际扣除的积分
     points_deduction: float = 0
     total_price: float
+    coupons: List[CouponQuote] = []  # 可用优惠券，按抵扣金额从高到低
+    rules_version: int = 0  # 计算所用的优惠券规则集版本
 
 
 class BookingListResponse(BaseModel):
@@ -142,7 +158,7 @@ class ReviewCreate(BaseModel):
     skill_rating: Optional[int] = Field(None, ge=1, le=5)
     attitude_rating: Optional[int] = Field(None, ge=1, le=5)
     punctuality_rating: Optional[int] = Field(None, ge=1, le=5)
-    tip_amount: float = Field(default=0, ge=0)
+    tip_amount: float = Field(default=0, ge=0, le=1000)  # 仅记录，不入账
     is_anonymous: bool = False
 
 
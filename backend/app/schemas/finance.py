@@ -1,4 +1,5 @@
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional, List
 from pydantic import BaseModel, Field, validator
 from app.models.finance import WithdrawalStatus, TransactionType
@@ -17,7 +18,7 @@ class TherapistBalanceResponse(BaseModel):
 # --- 提现相关 Schema ---
 
 class WithdrawalCreateRequest(BaseModel):
-    amount: float = Field(..., gt=0, description="提现金额")
+    amount: Decimal = Field(..., gt=0, max_digits=12, decimal_places=2, description="提现金额")
     account_type: str = Field(..., description="账户类型: alipay, wechat, bank")
     account_name: str = Field(..., description="账户姓名")
     account_no: str = Field(..., description="账号")
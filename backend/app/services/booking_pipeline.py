@@ -0,0 +1,256 @@
+"""
+创建预约流水线
+
+原流程依次查询技师、技师服务、地址、时段，再调用价格预览重复查询技师服务和优惠券，
+写入后又 refresh 一次预约，创建一个预约需要 10 次以上数据库往返。这里合并为：
+
+1. 校验查询（一次）：技师（已认证）LEFT JOIN 技师服务 + 服务、地址、优惠券、当天候选时段，
+   同时取回价格计算和响应所需的全部字段
+2. 价格计算：app.services.pricing 用第 1 步取回的服务价格和优惠券及缓存的规则集计算，不再查询
+3. 写入（同一事务）：一次 flush 写入 Booking 和 Order，锁定时段、核销优惠券、扣减积分各一条 UPDATE，
+   最后提交；响应直接由已知字段构建，不再 refresh
+
+常见情况（不用优惠券和积分、规则集命中缓存）下共 5 次往返：校验查询、INSERT booking、INSERT order、
+UPDATE 时段、COMMIT。
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.booking import Booking, BookingStatus, is_booking_overlap
+from app.models.coupon import CouponStatus, UserCoupon
+from app.models.order import Order, PaymentStatus
+from app.models.service import Service, TherapistService
+from app.models.therapist import Therapist, TherapistTimeSlot
+from app.models.user import Address, User
+from app.schemas.booking import BookingCreate, BookingDetailResponse
+from app.services import pricing, slot_engine
+
+
+def generate_booking_no() -> str:
+    """生成预约编号"""
+    return f"BK{datetime.now().strftime('%Y%m%d%H%M%S')}{uuid.uuid4().hex[:6].upper()}"
+
+
+def generate_order_no() -> str:
+    """生成订单编号"""
+    return f"OD{datetime.now().strftime('%Y%m%d%H%M%S')}{uuid.uuid4().hex[:6].upper()}"
+
+
+# ==================== 校验查询 ====================
+
+# 校验查询取回的字段（价格计算和响应所需）
+_INPUT_COLUMNS = (
+    Therapist.id.label("therapist_id"),
+    Therapist.name.label("therapist_name"),
+    Therapist.avatar.label("therapist_avatar"),
+    Service.id.label("service_id"),
+    Service.name.label("service_name"),
+    Service.image.label("service_image"),
+    Service.duration.label("duration"),
+    Service.base_price.label("base_price"),
+    TherapistService.price.label("therapist_price"),
+    Address.id.label("address_id"),
+    Address.province.label("province"),
+    Address.city.label("city"),
+    Address.district.label("district"),
+    Address.street.label("street"),
+    Address.contact_name.label("contact_name"),
+    Address.contact_phone.label("contact_phone"),
+)
+
+
+@dataclass
+class BookingInputs:
+    """校验查询结果：字段行（技师不存在时为 None）、优惠券和当天候选时段"""
+    row: Optional[Row] = None
+    coupon: Optional[UserCoupon] = None
+    slots: List[TherapistTimeSlot] = field(default_factory=list)
+
+
+async def load_inputs(
+    db: AsyncSession, user: User, data: BookingCreate, start_time: time, now: datetime
+) -> BookingInputs:
+    """
+    一次查询取回技师、技师服务、地址、优惠券和当天候选时段
+
+    以技师为主表 LEFT JOIN 其余各项，缺失项为 NULL；候选时段每个一行，其余列在各行中相同。
+    """
+    stmt = (
+        select(*_INPUT_COLUMNS, TherapistTimeSlot)
+        .select_from(Therapist)
+        .outerjoin(TherapistService, and_(
+            TherapistService.therapist_id == Therapist.id,
+            TherapistService.service_id == data.service_id,
+            TherapistService.is_active == True,
+        ))
+        .outerjoin(Service, Service.id == TherapistService.service_id)
+        .outerjoin(Address, and_(
+            Address.id == data.address_id,
+            Address.user_id == user.id,
+            Address.is_deleted == False,
+        ))
+        .outerjoin(TherapistTimeSlot, slot_engine.candidate_slots_clause(
+            Therapist.id, data.booking_date, start_time,
+        ))
+        .where(Therapist.id == data.therapist_id)
+        .where(Therapist.is_verified == True)
+        .order_by(TherapistTimeSlot.start_time)
+    )
+    if data.coupon_id is not None:
+        stmt = pricing.with_coupons(stmt, user.id, now, data.coupon_id)
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        return BookingInputs()
+
+    inputs = BookingInputs(row=rows[0], coupon=rows[0].UserCoupon if data.coupon_id is not None else None)
+    seen = set()
+    for row in rows:
+        slot = row.TherapistTimeSlot
+        if slot is not None and slot.id not in seen:
+            seen.add(slot.id)
+            inputs.slots.append(slot)
+    return inputs
+
+
+# ==================== 创建 ====================
+
+async def create_booking(db: AsyncSession, user: User, data: BookingCreate) -> BookingDetailResponse:
+    """校验、计价、写入预约和订单（调用方负责提交）"""
+    start_time = datetime.strptime(data.start_time, "%H:%M").time()
+    now = datetime.utcnow()
+    ruleset = await pricing.ruleset_cache.get(db)
+    inputs = await load_inputs(db, user, data, start_time, now)
+
+    row = inputs.row
+    if row is None:
+        raise HTTPException(status_code=400, detail="治疗师不存在")
+    if row.service_id is None:
+        raise HTTPException(status_code=400, detail="该治疗师不提供此服务")
+    if row.address_id is None:
+        raise HTTPException(status_code=400, detail="地址不存在")
+
+    end_time = (datetime.combine(date.today(), start_time) + timedelta(minutes=row.duration)).time()
+
+    # 检查预约区间覆盖的所有时段是否可用（长时长服务会覆盖多个时段）
+    interval = slot_engine.booking_interval(start_time, row.duration)
+    covered_slots = await slot_engine.find_covering_slots(
+        db, row.therapist_id, data.booking_date, interval, candidates=inputs.slots,
+    )
+    if not covered_slots:
+        raise HTTPException(status_code=400, detail="该时段不可预约")
+
+    # 没有排除约束的数据库（如测试用 SQLite）用 Python 区间索引预检查
+    if db.bind.dialect.name != "postgresql" and await slot_engine.has_booking_overlap(
+        db, row.therapist_id, data.booking_date, interval
+    ):
+        raise HTTPException(status_code=400, detail="该时段已被预约")
+
+    # 计算价格（复用校验查询取回的价格和优惠券；不适用的优惠券不计入也不核销）
+    price = pricing.quote(
+        ruleset,
+        pricing.service_price(row.therapist_price, row.base_price),
+        row.therapist_id,
+        row.service_id,
+        [inputs.coupon] if inputs.coupon is not None else [],
+        data.points_to_use,
+        user.points,
+        coupon_id=data.coupon_id,
+    )
+
+    booking = Booking(
+        booking_no=generate_booking_no(),
+        user_id=user.id,
+        therapist_id=row.therapist_id,
+        service_id=row.service_id,
+        address_id=row.address_id,
+        booking_date=data.booking_date,
+        start_time=start_time,
+        end_time=end_time,
+        duration=row.duration,
+        service_price=price.service_price,
+        discount_amount=price.discount_amount,
+        coupon_id=price.coupon_id,
+        coupon_deduction=price.coupon_deduction,
+        points_used=price.points_used,
+        points_deduction=price.points_deduction,
+        total_price=price.total_price,
+        user_note=data.user_note,
+        status=BookingStatus.PENDING,
+    )
+    order = Order(
+        order_no=generate_order_no(),
+        user_id=user.id,
+        total_amount=price.total_price,
+        payment_status=PaymentStatus.PENDING,
+    )
+    order.booking = booking
+    db.add(booking)
+
+    # 一次 flush 写入预约和订单（orders.booking_id 有外键约束，按依赖顺序插入）；
+    # 与已有预约的区间重叠由排除约束原子地拒绝（抛出异常后 get_db 回滚整个事务）
+    try:
+        await db.flush()
+    except IntegrityError as e:
+        if is_booking_overlap(e):
+            raise HTTPException(status_code=400, detail="该时段已被预约")
+        raise
+
+    # 锁定覆盖的所有时段
+    await slot_engine.reserve_slots(db, covered_slots, booking.id)
+
+    # 核销优惠券（条件 UPDATE，并发使用同一张券时只有一个成功）
+    if price.coupon_id is not None:
+        claimed = await db.execute(
+            update(UserCoupon)
+            .where(pricing.usable_coupons_clause(user.id, now, price.coupon_id))
+            .values(status=CouponStatus.USED, used_at=now, used_order_id=order.id)
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount != 1:
+            raise HTTPException(status_code=400, detail="优惠券不可用")
+
+    # 扣除积分（条件 UPDATE，余额不足时拒绝）
+    if price.points_used > 0:
+        deducted = await db.execute(
+            update(User)
+            .where(User.id == user.id, User.points >= price.points_used)
+            .values(points=User.points - price.points_used)
+            .execution_options(synchronize_session=False)
+        )
+        if deducted.rowcount != 1:
+            raise HTTPException(status_code=400, detail="积分不足")
+
+    return BookingDetailResponse(
+        id=booking.id,
+        booking_no=booking.booking_no,
+        service_name=row.service_name,
+        service_duration=row.duration,
+        service_id=row.service_id,
+        service_image=row.service_image,
+        therapist_id=row.therapist_id,
+        therapist_name=row.therapist_name,
+        therapist_avatar=row.therapist_avatar,
+        booking_date=booking.booking_date,
+        start_time=booking.start_time,
+        end_time=booking.end_time,
+        status=booking.status,
+        total_price=booking.total_price,
+        service_price=booking.service_price,
+        discount_amount=booking.discount_amount,
+        coupon_deduction=booking.coupon_deduction,
+        points_deduction=booking.points_deduction,
+        address_id=row.address_id,
+        address_detail=f"{row.province}{row.city}{row.district}{row.street}",
+        address_contact=row.contact_name,
+        address_phone=row.contact_phone,
+        user_note=booking.user_note,
+        created_at=booking.created_at,
+    )
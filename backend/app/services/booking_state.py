@@ -0,0 +1,202 @@
+"""
+预约状态机
+
+所有预约状态变更都通过一条带条件的 UPDATE 完成：
+
+    UPDATE bookings SET status = :target, ... WHERE id = :id AND status IN (:sources) RETURNING ...
+
+状态检查和写入在同一条语句中原子完成，不需要先查询再修改，也不会出现并发请求互相覆盖（丢失更新）。
+只有更新失败时才额外查询一次当前状态，用于返回准确的错误信息。
+
+批量接口（超时自动取消、技师停用时取消全部预约等）同样是一条语句。
+
+接单、完成、取消计入预约漏斗指标（booking_events_total），事务提交后才计数，回滚的变更不计入。
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.models.booking import Booking, BookingStatus
+from app.models.therapist import Therapist
+from app.services import slot_engine
+
+# 目标状态 -> 允许的来源状态
+TRANSITIONS: Dict[BookingStatus, FrozenSet[BookingStatus]] = {
+    BookingStatus.CONFIRMED: frozenset({BookingStatus.PENDING}),
+    BookingStatus.EN_ROUTE: frozenset({BookingStatus.CONFIRMED}),
+    BookingStatus.IN_PROGRESS: frozenset({BookingStatus.CONFIRMED, BookingStatus.EN_ROUTE}),
+    BookingStatus.COMPLETED: frozenset({BookingStatus.IN_PROGRESS}),
+    BookingStatus.CANCELLED: frozenset({BookingStatus.PENDING, BookingStatus.CONFIRMED}),
+    BookingStatus.REFUNDED: frozenset({BookingStatus.CANCELLED, BookingStatus.COMPLETED}),
+}
+
+# 进入目标状态时自动写入的时间戳字段
+_TIMESTAMP_FIELDS = {
+    BookingStatus.IN_PROGRESS: "service_started_at",
+    BookingStatus.COMPLETED: "service_completed_at",
+    BookingStatus.CANCELLED: "cancelled_at",
+}
+
+# 目标状态 -> 预约漏斗事件
+_FUNNEL_EVENTS = {
+    BookingStatus.CONFIRMED: "accepted",
+    BookingStatus.COMPLETED: "completed",
+    BookingStatus.CANCELLED: "cancelled",
+}
+
+# RETURNING 返回的字段（调用方构建响应和后续处理所需）
+_RETURNING = (
+    Booking.id,
+    Booking.booking_no,
+    Booking.status,
+    Booking.user_id,
+    Booking.therapist_id,
+    Booking.total_price,
+)
+
+
+class BookingStateMachine:
+    """预约状态变更"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def transition(
+        self,
+        booking_id: int,
+        target: BookingStatus,
+        *,
+        therapist_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        sources: Optional[Iterable[BookingStatus]] = None,
+        values: Optional[Dict[str, Any]] = None,
+        action: str = "变更状态",
+        not_found: str = "订单不存在或无权访问",
+        invalid: Optional[str] = None,
+    ) -> Row:
+        """
+        变更单个预约的状态
+
+        Args:
+            booking_id: 预约ID
+            target: 目标状态
+            therapist_id / user_id: 限定预约归属（越权访问视为不存在）
+            sources: 允许的来源状态，默认取 TRANSITIONS[target]
+            values: 同时写入的其他字段
+            action: 错误提示中的操作名称，如 "接单"
+            not_found: 预约不存在时的错误提示
+            invalid: 状态不允许时的错误提示，默认 "订单当前状态为 xxx，无法{action}"
+
+        Returns:
+            RETURNING 行（id, booking_no, status, user_id, therapist_id, total_price）
+        """
+        conditions = [Booking.id == booking_id]
+        if therapist_id is not None:
+            conditions.append(Booking.therapist_id == therapist_id)
+        if user_id is not None:
+            conditions.append(Booking.user_id == user_id)
+
+        rows = await self._update(target, conditions, sources, values)
+        if rows:
+            return rows[0]
+
+        # 更新失败：查询当前状态以区分 404 / 400
+        current = (await self.db.execute(select(Booking.status).where(*conditions))).scalar_one_or_none()
+        if current is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=invalid or f"订单当前状态为 {current.value}，无法{action}",
+        )
+
+    async def bulk_transition(
+        self,
+        target: BookingStatus,
+        *conditions,
+        sources: Optional[Iterable[BookingStatus]] = None,
+        values: Optional[Dict[str, Any]] = None,
+    ) -> List[Row]:
+        """批量变更满足条件的预约状态（一条 UPDATE），返回实际变更的行"""
+        return await self._update(target, list(conditions), sources, values)
+
+    async def expire_pending(self, created_before: datetime, reason: str = "超时未接单") -> List[Row]:
+        """取消创建时间早于 created_before 仍未接单的预约"""
+        return await self.bulk_transition(
+            BookingStatus.CANCELLED,
+            Booking.created_at < created_before,
+            sources=[BookingStatus.PENDING],
+            values={"cancel_reason": reason, "cancelled_by": "system"},
+        )
+
+    async def cancel_for_therapist(
+        self, therapist_id: int, reason: str, cancelled_by: str = "system"
+    ) -> List[Row]:
+        """取消技师所有未开始的预约（如技师被停用）"""
+        return await self.bulk_transition(
+            BookingStatus.CANCELLED,
+            Booking.therapist_id == therapist_id,
+            values={"cancel_reason": reason, "cancelled_by": cancelled_by},
+        )
+
+    async def _update(
+        self,
+        target: BookingStatus,
+        conditions: list,
+        sources: Optional[Iterable[BookingStatus]],
+        values: Optional[Dict[str, Any]],
+    ) -> List[Row]:
+        now = datetime.utcnow()
+        new_values: Dict[str, Any] = {"status": target, "updated_at": now}
+        if target in _TIMESTAMP_FIELDS:
+            new_values[_TIMESTAMP_FIELDS[target]] = now
+        new_values.update(values or {})
+
+        allowed = list(sources if sources is not None else TRANSITIONS[target])
+        result = await self.db.execute(
+            update(Booking)
+            .where(*conditions, Booking.status.in_(allowed))
+            .values(**new_values)
+            .returning(*_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        if rows:
+            await self._after(target, rows)
+            if target in _FUNNEL_EVENTS:
+                self.db.info.setdefault("booking_events", Counter())[_FUNNEL_EVENTS[target]] += len(rows)
+        return rows
+
+    async def _after(self, target: BookingStatus, rows: List[Row]):
+        """状态变更的附带操作"""
+        if target in (BookingStatus.CANCELLED, BookingStatus.REFUNDED):
+            # 释放占用的时段
+            await slot_engine.release_slots(self.db, [row.id for row in rows])
+        elif target == BookingStatus.COMPLETED:
+            # 更新技师完成订单数
+            for therapist_id, count in Counter(row.therapist_id for row in rows).items():
+                await self.db.execute(
+                    update(Therapist)
+                    .where(Therapist.id == therapist_id)
+                    .values(completed_count=Therapist.completed_count + count)
+                    .execution_options(synchronize_session=False)
+                )
+
+
+# ==================== 漏斗指标 ====================
+
+@event.listens_for(Session, "after_commit")
+def _record_booking_events(session: Session):
+    for name, count in session.info.pop("booking_events", {}).items():
+        metrics.record_booking_event(name, count)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_booking_events(session: Session):
+    session.info.pop("booking_events", None)
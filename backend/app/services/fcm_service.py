@@ -1,13 +1,17 @@
 """
 Firebase Cloud Messaging (FCM) 推送服务 - V1 API
+
+google-auth 和服务账户凭证在首次发送时才加载，不计入服务启动耗时。
 """
-import httpx
+import asyncio
 import logging
-import json
+import orjson
 from typing import Dict, Any, Optional, List
 from pathlib import Path
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+
+from app.core import metrics
+from app.core.http_client import get_http_client
+from app.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -17,42 +21,52 @@ class FCMService:
     
     FCM_V1_URL = "https://fcm.googleapis.com/v1/projects/{project_id}/messages:send"
     SCOPES = ['https://www.googleapis.com/auth/firebase.messaging']
+    SERVICE_ACCOUNT_PATH = Path(__file__).parent.parent / "firebase-service-account.json"
     
     def __init__(self):
-        # 加载服务账户凭证
-        service_account_path = Path(__file__).parent.parent / "firebase-service-account.json"
+        self.credentials = None
+        self.project_id = None
+        self._loaded = False
+    
+    def _load_credentials(self):
+        """加载服务账户凭证（仅首次调用时执行）"""
+        if self._loaded:
+            return
+        self._loaded = True
         
-        if service_account_path.exists():
-            try:
-                with open(service_account_path, 'r') as f:
-                    service_account_info = json.load(f)
-                
-                self.credentials = service_account.Credentials.from_service_account_info(
-                    service_account_info,
-                    scopes=self.SCOPES
-                )
-                self.project_id = service_account_info.get('project_id')
-                logger.info(f"✅ FCM V1 API 已初始化，项目: {self.project_id}")
-            except Exception as e:
-                logger.error(f"❌ 加载 Firebase 服务账户失败: {e}")
-                self.credentials = None
-                self.project_id = None
-        else:
-            logger.warning(f"⚠️ Firebase 服务账户文件不存在: {service_account_path}")
+        if not self.SERVICE_ACCOUNT_PATH.exists():
+            logger.warning("⚠️ Firebase 服务账户文件不存在: %s", self.SERVICE_ACCOUNT_PATH)
+            return
+        
+        try:
+            from google.oauth2 import service_account
+            
+            service_account_info = orjson.loads(self.SERVICE_ACCOUNT_PATH.read_bytes())
+            
+            self.credentials = service_account.Credentials.from_service_account_info(
+                service_account_info,
+                scopes=self.SCOPES
+            )
+            self.project_id = service_account_info.get('project_id')
+            logger.info("✅ FCM V1 API 已初始化，项目: %s", self.project_id)
+        except Exception as e:
+            logger.error("❌ 加载 Firebase 服务账户失败: %s", e)
             self.credentials = None
             self.project_id = None
     
     def _get_access_token(self) -> Optional[str]:
-        """获取访问令牌"""
+        """获取访问令牌（过期时同步刷新，需在线程中调用）"""
         if not self.credentials:
             return None
         
         try:
             if not self.credentials.valid:
+                from google.auth.transport.requests import Request
+                
                 self.credentials.refresh(Request())
             return self.credentials.token
         except Exception as e:
-            logger.error(f"❌ 获取访问令牌失败: {e}")
+            logger.error("❌ 获取访问令牌失败: %s", e)
             return None
     
     async def send_notification(
@@ -76,12 +90,16 @@ class FCMService:
         Returns:
             是否发送成功
         """
+        self._load_credentials()
         if not self.credentials or not self.project_id:
             logger.warning("FCM 未正确配置，跳过推送")
             return False
         
-        access_token = self._get_access_token()
+        # 刷新令牌是同步网络请求，放到线程中执行，避免阻塞事件循环
+        with span("push.fcm.access_token"):
+            access_token = await asyncio.to_thread(self._get_access_token)
         if not access_token:
+            metrics.record_push("fcm", False)
             logger.error("无法获取访问令牌")
             return False
         
@@ -112,23 +130,26 @@ class FCMService:
             
             url = self.FCM_V1_URL.format(project_id=self.project_id)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            with span("push.fcm.send"):
+                response = await get_http_client().post(
                     url,
-                    json=message,
+                    content=orjson.dumps(message),
                     headers=headers,
                     timeout=10.0
                 )
-                
-                if response.status_code == 200:
-                    logger.info(f"✅ FCM 推送成功: {title}")
-                    return True
-                else:
-                    logger.error(f"❌ FCM 推送失败: {response.status_code} - {response.text}")
-                    return False
+            
+            if response.status_code == 200:
+                metrics.record_push("fcm", True)
+                logger.debug("FCM 推送成功: %s", title)
+                return True
+            else:
+                metrics.record_push("fcm", False)
+                logger.error("❌ FCM 推送失败: %s - %s", response.status_code, response.text)
+                return False
         
         except Exception as e:
-            logger.error(f"❌ FCM 推送异常: {e}")
+            metrics.record_push("fcm", False)
+            logger.error("❌ FCM 推送异常: %s", e)
             return False
     
     async def send_multicast(
@@ -162,7 +183,7 @@ class FCMService:
             else:
                 failure_count += 1
         
-        logger.info(f"✅ FCM 批量推送完成: 成功 {success_count}, 失败 {failure_count}")
+        logger.info("✅ FCM 批量推送完成: 成功 %d, 失败 %d", success_count, failure_count)
         
         return {
             "success": success_count,
@@ -0,0 +1,251 @@
+"""
+技师资金账本
+
+余额变动和流水写入在一条语句中完成（UPDATE ... RETURNING 作为 CTE，INSERT 流水引用更新后的余额）：
+
+    WITH balance_update AS (
+        UPDATE therapist_balances SET balance = balance + :amount, ...
+        WHERE therapist_id = :id AND balance + :amount >= 0
+          AND NOT EXISTS (SELECT 1 FROM transactions WHERE idempotency_key = :key)
+        RETURNING balance
+    )
+    INSERT INTO transactions (...) SELECT ..., balance_update.balance FROM balance_update RETURNING ...
+
+- 行锁由 UPDATE 隐式获得，并发的收入/提现不会丢失更新，余额不会被扣成负数
+- 流水只追加不修改，balance_after 与余额在同一语句内确定
+- 带幂等键的操作重复提交时返回第一次的流水，不会重复记账；并发重复提交由唯一约束兜底
+- 不提交事务，由调用方与业务数据（提现申请、订单状态等）一起提交
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Union
+
+from sqlalchemy import exists, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.finance import TherapistBalance, Transaction, TransactionType
+
+CENT = Decimal("0.01")
+
+# 技师分成比例（平台抽成 30%）
+THERAPIST_SHARE = Decimal("0.70")
+
+_balances = TherapistBalance.__table__
+_transactions = Transaction.__table__
+
+
+class LedgerError(Exception):
+    """账本操作失败"""
+
+
+class InsufficientBalance(LedgerError):
+    """余额不足"""
+
+
+class DuplicateOperation(LedgerError):
+    """相同幂等键的操作正在并发执行"""
+
+
+@dataclass
+class LedgerEntry:
+    """一次记账的结果"""
+    transaction_id: int
+    amount: Decimal
+    balance_after: Decimal
+    reference_id: Optional[str]
+    replayed: bool = False  # True 表示幂等键重复，返回的是已有流水
+
+
+def to_money(value: Union[Decimal, float, int, str]) -> Decimal:
+    """转换为两位小数的金额（四舍五入）"""
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def client_idempotency_key(scope: str, therapist_id: int, key: str) -> str:
+    """
+    客户端提交的幂等键 -> 流水幂等键
+
+    客户端的键取摘要，长度固定，不受技师ID位数和请求头长度影响（流水表 idempotency_key 为 String(64)）。
+    """
+    digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+    return f"{scope}:{therapist_id}:{digest}"
+
+
+class Ledger:
+    """技师资金账本"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def credit_income(
+        self,
+        therapist_id: int,
+        amount: Union[Decimal, float],
+        *,
+        description: str,
+        reference_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> LedgerEntry:
+        """记录收入：可用余额和累计收入同时增加"""
+        amount = to_money(amount)
+        return await self.apply(
+            therapist_id,
+            TransactionType.INCOME,
+            amount,
+            income=amount,
+            description=description,
+            reference_id=reference_id,
+            idempotency_key=idempotency_key,
+        )
+
+    async def freeze_for_withdrawal(
+        self,
+        therapist_id: int,
+        amount: Union[Decimal, float],
+        *,
+        description: str,
+        reference_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> LedgerEntry:
+        """申请提现：可用余额转入冻结金额，余额不足时抛出 InsufficientBalance"""
+        amount = to_money(amount)
+        return await self.apply(
+            therapist_id,
+            TransactionType.WITHDRAWAL,
+            -amount,
+            frozen=amount,
+            description=description,
+            reference_id=reference_id,
+            idempotency_key=idempotency_key,
+        )
+
+    async def apply(
+        self,
+        therapist_id: int,
+        type: TransactionType,
+        amount: Decimal,
+        *,
+        income: Decimal = Decimal("0"),
+        frozen: Decimal = Decimal("0"),
+        description: Optional[str] = None,
+        reference_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        allow_negative: bool = False,
+    ) -> LedgerEntry:
+        """
+        原子地变更余额并追加一条流水
+
+        Args:
+            amount: 可用余额变动（正数增加，负数减少），同时作为流水金额
+            income: 累计收入变动
+            frozen: 冻结金额变动
+            allow_negative: 是否允许可用余额变为负数（如系统调整）
+        """
+        entry = await self._apply_once(
+            therapist_id, type, amount, income, frozen, description, reference_id, idempotency_key, allow_negative
+        )
+        if entry is not None:
+            return entry
+
+        # 没有更新任何行：幂等重放 / 余额记录不存在 / 余额不足
+        if idempotency_key:
+            existing = await self._find_by_key(idempotency_key)
+            if existing is not None:
+                return existing
+
+        created = (await self.db.execute(
+            pg_insert(_balances)
+            .values(
+                therapist_id=therapist_id,
+                balance=Decimal("0"),
+                total_income=Decimal("0"),
+                frozen_amount=Decimal("0"),
+                updated_at=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing(index_elements=[_balances.c.therapist_id])
+            .returning(_balances.c.id)
+        )).first()
+        if created is not None:
+            entry = await self._apply_once(
+                therapist_id, type, amount, income, frozen, description, reference_id, idempotency_key, allow_negative
+            )
+            if entry is not None:
+                return entry
+
+        raise InsufficientBalance("余额不足")
+
+    async def _apply_once(
+        self, therapist_id, type, amount, income, frozen, description, reference_id, idempotency_key, allow_negative
+    ) -> Optional[LedgerEntry]:
+        now = datetime.utcnow()
+        balance_update = (
+            update(_balances)
+            .where(_balances.c.therapist_id == therapist_id)
+            .values(
+                balance=_balances.c.balance + amount,
+                total_income=_balances.c.total_income + income,
+                frozen_amount=_balances.c.frozen_amount + frozen,
+                updated_at=now,
+            )
+            .returning(_balances.c.balance)
+        )
+        if not allow_negative:
+            balance_update = balance_update.where(_balances.c.balance + amount >= 0)
+        if idempotency_key:
+            balance_update = balance_update.where(
+                ~exists().where(_transactions.c.idempotency_key == idempotency_key)
+            )
+        updated = balance_update.cte("balance_update")
+
+        columns = _transactions.c
+        stmt = (
+            insert(_transactions)
+            .from_select(
+                ["therapist_id", "type", "amount", "balance_after", "description",
+                 "reference_id", "idempotency_key", "created_at"],
+                select(
+                    literal(therapist_id, columns.therapist_id.type),
+                    literal(type, columns.type.type),
+                    literal(amount, columns.amount.type),
+                    updated.c.balance,
+                    literal(description, columns.description.type),
+                    literal(reference_id, columns.reference_id.type),
+                    literal(idempotency_key, columns.idempotency_key.type),
+                    literal(now, columns.created_at.type),
+                ),
+            )
+            .returning(columns.id, columns.amount, columns.balance_after, columns.reference_id)
+        )
+        try:
+            row = (await self.db.execute(stmt)).first()
+        except IntegrityError as e:
+            if idempotency_key and "idempotency_key" in str(e.orig):
+                raise DuplicateOperation("重复请求，请稍后查询结果") from e
+            raise
+        if row is None:
+            return None
+        return LedgerEntry(
+            transaction_id=row.id,
+            amount=row.amount,
+            balance_after=row.balance_after,
+            reference_id=row.reference_id,
+        )
+
+    async def _find_by_key(self, idempotency_key: str) -> Optional[LedgerEntry]:
+        row = (await self.db.execute(
+            select(_transactions.c.id, _transactions.c.amount, _transactions.c.balance_after, _transactions.c.reference_id)
+            .where(_transactions.c.idempotency_key == idempotency_key)
+        )).first()
+        if row is None:
+            return None
+        return LedgerEntry(
+            transaction_id=row.id,
+            amount=row.amount,
+            balance_after=row.balance_after,
+            reference_id=row.reference_id,
+            replayed=True,
+        )
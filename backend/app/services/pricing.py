@@ -0,0 +1,254 @@
+"""
+价格计算引擎
+
+预约价格 = 服务价格 - 优惠券抵扣 - 积分抵扣（不低于 0）：
+
+- 优惠券：面额、类型、门槛、封顶复制在 UserCoupon 上；适用服务、适用技师和启用状态以 CouponTemplate 为准
+  （没有对应模板的券，如人工补发的券，不限范围）。一个预约最多使用一张
+- 积分：POINTS_PER_YUAN 积分抵扣 1 元，最多抵扣服务价格的 POINTS_MAX_DEDUCTION_RATIO，
+  且不超过优惠券抵扣后的剩余金额（不会扣掉不产生抵扣的积分）
+
+一次计价会评估用户名下全部可用优惠券，返回每张券的抵扣金额，并按指定的券或（auto_coupon）抵扣最多的券
+组合积分计算总价，App 切换优惠券和积分时不必逐个试算。
+
+CouponTemplate 规则在每个进程内缓存为带版本号的规则集（ruleset_cache）。缓存超过 PRICING_RULES_TTL_SECONDS
+后由下一次计价请求重新加载，内容有变化时版本号加一；修改模板后可调用 ruleset_cache.invalidate() 立即生效。
+规则集命中缓存时，价格预览只有一次查询：技师服务价格 LEFT JOIN 用户全部可用优惠券。
+"""
+import asyncio
+import math
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from fastapi import HTTPException
+from loguru import logger
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.coupon import CouponStatus, CouponTemplate, CouponType, UserCoupon
+from app.models.service import Service, TherapistService
+from app.models.user import User
+from app.schemas.booking import BookingPricePreview, BookingPriceResponse, CouponQuote
+
+
+# ==================== 规则集 ====================
+
+def _parse_ids(value: Optional[str]) -> Optional[FrozenSet[int]]:
+    """解析逗号分隔的 ID 列表，留空表示不限"""
+    if not value or not value.strip():
+        return None
+    return frozenset(int(item) for item in value.split(",") if item.strip().isdigit())
+
+
+@dataclass(frozen=True)
+class CouponRule:
+    """优惠券模板上的使用规则"""
+    template_id: int
+    is_active: bool
+    services: Optional[FrozenSet[int]] = None  # 适用服务，None 表示不限
+    therapists: Optional[FrozenSet[int]] = None  # 适用技师，None 表示不限
+
+    def allows(self, therapist_id: int, service_id: int) -> bool:
+        return (
+            self.is_active
+            and (self.services is None or service_id in self.services)
+            and (self.therapists is None or therapist_id in self.therapists)
+        )
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    """某一版本的优惠券规则（模板ID -> 规则）"""
+    version: int
+    loaded_at: float  # time.monotonic()
+    rules: Dict[int, CouponRule]
+
+    def allows(self, coupon: UserCoupon, therapist_id: int, service_id: int) -> bool:
+        rule = self.rules.get(coupon.template_id)
+        return rule is None or rule.allows(therapist_id, service_id)
+
+
+class RulesetCache:
+    """进程内缓存的优惠券规则集"""
+
+    def __init__(self):
+        self._ruleset: Optional[Ruleset] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self, ruleset: Optional[Ruleset]) -> bool:
+        return ruleset is not None and time.monotonic() - ruleset.loaded_at < settings.PRICING_RULES_TTL_SECONDS
+
+    async def get(self, db: AsyncSession) -> Ruleset:
+        """返回当前规则集，过期时用调用方的会话重新加载"""
+        ruleset = self._ruleset
+        if self._fresh(ruleset):
+            return ruleset
+        if ruleset is not None and self._lock.locked():
+            # 其他请求正在重新加载，先使用旧版本
+            return ruleset
+        async with self._lock:
+            if self._fresh(self._ruleset):
+                return self._ruleset
+            return await self._load(db)
+
+    async def _load(self, db: AsyncSession) -> Ruleset:
+        result = await db.execute(select(
+            CouponTemplate.id,
+            CouponTemplate.is_active,
+            CouponTemplate.applicable_services,
+            CouponTemplate.applicable_therapists,
+        ))
+        rules = {
+            row.id: CouponRule(
+                template_id=row.id,
+                is_active=row.is_active,
+                services=_parse_ids(row.applicable_services),
+                therapists=_parse_ids(row.applicable_therapists),
+            )
+            for row in result
+        }
+        if self._ruleset is None or self._ruleset.rules != rules:
+            self._version += 1
+            logger.info("优惠券规则集已加载: version={}, templates={}", self._version, len(rules))
+        self._ruleset = Ruleset(version=self._version, loaded_at=time.monotonic(), rules=rules)
+        return self._ruleset
+
+    def invalidate(self):
+        """标记缓存过期（修改优惠券模板后调用，下一次计价重新加载）"""
+        if self._ruleset is not None:
+            self._ruleset = replace(self._ruleset, loaded_at=float("-inf"))
+
+
+# 全局规则集缓存实例
+ruleset_cache = RulesetCache()
+
+
+# ==================== 查询 ====================
+
+def usable_coupons_clause(user_id: int, now: datetime, coupon_id: Optional[int] = None):
+    """用户名下可用（未使用且在有效期内）的优惠券，指定 coupon_id 时只取这一张"""
+    clause = and_(
+        UserCoupon.user_id == user_id,
+        UserCoupon.status == CouponStatus.ACTIVE,
+        UserCoupon.valid_start <= now,
+        UserCoupon.valid_end > now,
+    )
+    if coupon_id is not None:
+        clause = and_(UserCoupon.id == coupon_id, clause)
+    return clause
+
+
+def with_coupons(stmt, user_id: int, now: datetime, coupon_id: Optional[int] = None):
+    """追加 LEFT JOIN 用户可用优惠券（取回 UserCoupon 实体，没有可用券时为 None）"""
+    return stmt.add_columns(UserCoupon).outerjoin(UserCoupon, usable_coupons_clause(user_id, now, coupon_id))
+
+
+def service_price(therapist_price: Optional[float], base_price: float) -> float:
+    """技师自定义价格优先，否则使用服务基础价"""
+    return therapist_price if therapist_price is not None else base_price
+
+
+# ==================== 计算 ====================
+
+def coupon_deduction(
+    ruleset: Ruleset, coupon: UserCoupon, price: float, therapist_id: int, service_id: int
+) -> float:
+    """单张优惠券对本次预约的抵扣金额，不适用时为 0"""
+    if not ruleset.allows(coupon, therapist_id, service_id) or price < coupon.min_order_amount:
+        return 0
+    if coupon.coupon_type == CouponType.PERCENTAGE:
+        deduction = price * coupon.value / 100
+        if coupon.max_discount:
+            deduction = min(deduction, coupon.max_discount)
+    else:
+        deduction = coupon.value
+    return min(deduction, price)
+
+
+def quote(
+    ruleset: Ruleset,
+    price: float,
+    therapist_id: int,
+    service_id: int,
+    coupons: Iterable[UserCoupon],
+    points_to_use: int,
+    user_points: int,
+    coupon_id: Optional[int] = None,
+    auto_coupon: bool = False,
+) -> BookingPriceResponse:
+    """
+    根据已加载的服务价格、优惠券和用户积分计算价格（不查询数据库）
+
+    coupon_id 不可用（不存在、已使用、不适用或不满足门槛）时按不使用优惠券计算。
+    """
+    options: List[CouponQuote] = []
+    for coupon in coupons:
+        deduction = coupon_deduction(ruleset, coupon, price, therapist_id, service_id)
+        if deduction > 0:
+            options.append(CouponQuote(
+                id=coupon.id,
+                code=coupon.code,
+                coupon_type=coupon.coupon_type,
+                value=coupon.value,
+                deduction=round(deduction, 2),
+                valid_end=coupon.valid_end,
+            ))
+    # 抵扣多的在前，相同时优先快过期的
+    options.sort(key=lambda option: (-option.deduction, option.valid_end, option.id))
+
+    chosen = None
+    if coupon_id is not None:
+        chosen = next((option for option in options if option.id == coupon_id), None)
+    elif auto_coupon and options:
+        chosen = options[0]
+    coupon_amount = chosen.deduction if chosen else 0
+
+    # 积分按整数扣除，抵扣不超过比例上限和优惠券抵扣后的剩余金额
+    points_used = 0
+    if points_to_use > 0:
+        cap = min(price * settings.POINTS_MAX_DEDUCTION_RATIO, price - coupon_amount)
+        points_used = max(0, min(points_to_use, user_points, math.floor(cap * settings.POINTS_PER_YUAN + 1e-9)))
+    points_deduction = points_used / settings.POINTS_PER_YUAN
+
+    return BookingPriceResponse(
+        service_price=price,
+        discount_amount=0,
+        coupon_id=chosen.id if chosen else None,
+        coupon_deduction=coupon_amount,
+        points_used=points_used,
+        points_deduction=round(points_deduction, 2),
+        total_price=round(max(0, price - coupon_amount - points_deduction), 2),
+        coupons=options,
+        rules_version=ruleset.version,
+    )
+
+
+async def preview(db: AsyncSession, user: User, data: BookingPricePreview) -> BookingPriceResponse:
+    """价格预览：技师服务价格和用户全部可用优惠券一次查询"""
+    ruleset = await ruleset_cache.get(db)
+    stmt = (
+        select(TherapistService.price, Service.base_price)
+        .join(Service, TherapistService.service_id == Service.id)
+        .where(TherapistService.therapist_id == data.therapist_id)
+        .where(TherapistService.service_id == data.service_id)
+        .where(TherapistService.is_active == True)
+    )
+    rows = (await db.execute(with_coupons(stmt, user.id, datetime.utcnow()))).all()
+    if not rows:
+        raise HTTPException(status_code=400, detail="该治疗师不提供此服务")
+
+    return quote(
+        ruleset,
+        service_price(rows[0].price, rows[0].base_price),
+        data.therapist_id,
+        data.service_id,
+        {row.UserCoupon.id: row.UserCoupon for row in rows if row.UserCoupon is not None}.values(),
+        data.points_to_use,
+        user.points,
+        coupon_id=data.coupon_id,
+        auto_coupon=data.auto_coupon,
+    )
@@ -1,13 +1,16 @@
 """
 Expo 推送通知服务
 """
-import httpx
+import orjson
 from typing import List, Dict, Any, Optional
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
 from loguru import logger
 
+from app.core import metrics
+from app.core.database import AsyncSessionLocal, unit_of_work
+from app.core.http_client import get_http_client
+from app.core.tracing import span
 from app.models.notification import (
     PushToken,
     Notification,
@@ -18,6 +21,9 @@ from app.models.notification import (
 )
 from app.services.websocket_manager import ws_manager
 
+# 推送失败的日志限流（Expo 故障时每条通知都会失败）
+_push_failed_log = logger.bind(throttle="push.expo_failed")
+
 
 class ExpoPushService:
     """Expo 推送通知服务"""
@@ -57,45 +63,38 @@ class ExpoPushService:
             messages.append(message)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            with span("push.expo.send", messages=len(messages)):
+                response = await get_http_client().post(
                     ExpoPushService.EXPO_PUSH_URL,
-                    json=messages,
+                    content=orjson.dumps(messages),
                     headers={
                         "Content-Type": "application/json",
                         "Accept": "application/json",
                     },
                     timeout=10.0
                 )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info(f"✅ 推送发送成功: {len(messages)} 条")
-                    return {"success": True, "data": result}
-                else:
-                    logger.error(f"❌ 推送发送失败: {response.status_code} - {response.text}")
-                    return {"success": False, "error": response.text}
+            
+            if response.status_code == 200:
+                result = orjson.loads(response.content)
+                metrics.record_push("expo", True, len(messages))
+                logger.debug("Expo 推送发送成功: {} 条", len(messages))
+                return {"success": True, "data": result}
+            else:
+                metrics.record_push("expo", False, len(messages))
+                _push_failed_log.error("❌ Expo 推送发送失败: {} - {}", response.status_code, response.text)
+                return {"success": False, "error": response.text}
         
         except Exception as e:
-            logger.error(f"❌ 推送发送异常: {e}")
+            metrics.record_push("expo", False, len(messages))
+            _push_failed_log.error("❌ Expo 推送发送异常: {}", e)
             return {"success": False, "error": str(e)}
     
     @staticmethod
-    async def check_notification_settings(
-        therapist_id: int,
-        notification_type: NotificationType,
-        db: AsyncSession
+    def is_type_enabled(
+        settings: Optional[TherapistNotificationSettings],
+        notification_type: NotificationType
     ) -> bool:
-        """检查技师是否启用了该类型的通知"""
-        # 查询通知设置
-        result = await db.execute(
-            select(TherapistNotificationSettings).where(
-                TherapistNotificationSettings.therapist_id == therapist_id
-            )
-        )
-        settings = result.scalar_one_or_none()
-        
-        # 如果没有设置记录，默认全部启用
+        """技师是否启用了该类型的通知（没有设置记录时默认全部启用）"""
         if not settings:
             return True
         
@@ -121,7 +120,6 @@ class ExpoPushService:
         body: str,
         data: Dict[str, Any],
         priority: NotificationPriority = NotificationPriority.NORMAL,
-        db: AsyncSession = None,
         sound: str = "default",
         badge: int = None
     ) -> Dict[str, Any]:
@@ -132,22 +130,34 @@ class ExpoPushService:
         1. App 在前台 → 优先使用 WebSocket
         2. App 在后台/关闭 → 使用 Push
         3. 同时记录通知到数据库
+        
+        数据库访问使用独立的短会话：发送前读取设置和 Push Token、发送后写入通知记录，
+        WebSocket / Expo 网络调用期间不占用数据库连接。调用方应在自己的事务提交后再调用。
         """
-        # 1. 检查通知设置
-        if db:
-            is_enabled = await ExpoPushService.check_notification_settings(
-                therapist_id, notification_type, db
-            )
-            if not is_enabled:
-                logger.info(f"⏭️ 技师 {therapist_id} 已关闭 {notification_type} 通知")
-                return {"success": False, "reason": "disabled_by_user"}
+        # 1. 读取通知设置和 Push Token（读完即归还连接）
+        async with AsyncSessionLocal() as db:
+            settings = (await db.execute(
+                select(TherapistNotificationSettings).where(
+                    TherapistNotificationSettings.therapist_id == therapist_id
+                )
+            )).scalar_one_or_none()
+            push_token = (await db.execute(
+                select(PushToken.expo_push_token).where(
+                    PushToken.therapist_id == therapist_id,
+                    PushToken.is_active == True
+                )
+            )).scalar_one_or_none()
+        
+        if not ExpoPushService.is_type_enabled(settings, notification_type):
+            logger.debug("技师 {} 已关闭 {} 通知", therapist_id, notification_type)
+            return {"success": False, "reason": "disabled_by_user"}
         
         sent_via = []
         errors = []
         
         # 2. 尝试通过 WebSocket 发送（如果在线）
         if ws_manager.is_therapist_online(therapist_id):
-            logger.info(f"🌐 技师 {therapist_id} 在线，通过 WebSocket 发送通知")
+            logger.debug("技师 {} 在线，通过 WebSocket 发送通知", therapist_id)
             
             ws_message = {
                 "type": "notification",
@@ -167,67 +177,53 @@ class ExpoPushService:
             else:
                 errors.append("WebSocket 发送失败")
         
-        # 3. 获取 Push Token 并发送推送
-        if db:
-            push_result = await db.execute(
-                select(PushToken).where(
-                    PushToken.therapist_id == therapist_id,
-                    PushToken.is_active == True
-                )
+        # 3. 发送推送
+        if push_token:
+            logger.debug("发送推送通知给技师 {}", therapist_id)
+            
+            # 获取自定义声音（如果是新订单）
+            if notification_type == NotificationType.NEW_ORDER and settings and settings.new_order_sound:
+                sound = settings.new_order_sound
+            
+            push_result = await ExpoPushService.send_push_notification(
+                tokens=[push_token],
+                title=title,
+                body=body,
+                data=data,
+                sound=sound,
+                priority="high" if priority == NotificationPriority.URGENT else "default",
+                channel_id="orders",
+                badge=badge
             )
-            push_token = push_result.scalar_one_or_none()
             
-            if push_token:
-                logger.info(f"📱 发送推送通知给技师 {therapist_id}")
-                
-                # 获取自定义声音（如果是新订单）
-                if notification_type == NotificationType.NEW_ORDER and db:
-                    settings_result = await db.execute(
-                        select(TherapistNotificationSettings).where(
-                            TherapistNotificationSettings.therapist_id == therapist_id
-                        )
-                    )
-                    settings = settings_result.scalar_one_or_none()
-                    if settings and settings.new_order_sound:
-                        sound = settings.new_order_sound
-                
-                push_result = await ExpoPushService.send_push_notification(
-                    tokens=[push_token.expo_push_token],
+            if push_result.get("success"):
+                sent_via.append("push")
+            else:
+                errors.append(f"Push 发送失败: {push_result.get('error')}")
+        else:
+            logger.debug("技师 {} 没有可用的 Push Token", therapist_id)
+            errors.append("没有 Push Token")
+        
+        # 4. 记录通知到数据库
+        async with AsyncSessionLocal() as db:
+            async with unit_of_work(db):
+                notification = Notification(
+                    therapist_id=therapist_id,
+                    type=notification_type,
+                    priority=priority,
                     title=title,
                     body=body,
                     data=data,
-                    sound=sound,
-                    priority="high" if priority == NotificationPriority.URGENT else "default",
-                    channel_id="orders",
-                    badge=badge
+                    status=NotificationStatus.SENT if sent_via else NotificationStatus.FAILED,
+                    sent_via=",".join(sent_via) if sent_via else None,
+                    error_message="; ".join(errors) if errors else None,
+                    sent_at=datetime.utcnow() if sent_via else None
                 )
-                
-                if push_result.get("success"):
-                    sent_via.append("push")
-                else:
-                    errors.append(f"Push 发送失败: {push_result.get('error')}")
-            else:
-                logger.warning(f"⚠️ 技师 {therapist_id} 没有可用的 Push Token")
-                errors.append("没有 Push Token")
+                db.add(notification)
         
-        # 4. 记录通知到数据库
-        if db:
-            notification = Notification(
-                therapist_id=therapist_id,
-                type=notification_type,
-                priority=priority,
-                title=title,
-                body=body,
-                data=data,
-                status=NotificationStatus.SENT if sent_via else NotificationStatus.FAILED,
-                sent_via=",".join(sent_via) if sent_via else None,
-                error_message="; ".join(errors) if errors else None,
-                sent_at=datetime.utcnow() if sent_via else None
-            )
-            db.add(notification)
-            await db.commit()
-            
-            logger.info(f"💾 通知已记录到数据库: ID={notification.id}")
+        logger.bind(
+            therapist_id=therapist_id, notification_id=notification.id, sent_via=sent_via,
+        ).info("通知已发送: {} -> 技师 {} via {}", notification_type.value, therapist_id, sent_via or "none")
         
         # 5. 返回结果
         if sent_via:
@@ -250,8 +246,7 @@ class ExpoPushService:
         order_no: str,
         service_name: str,
         customer_name: str,
-        booking_time: str,
-        db: AsyncSession
+        booking_time: str
     ):
         """发送新订单通知"""
         return await ExpoPushService.send_notification(
@@ -269,7 +264,6 @@ class ExpoPushService:
                 "bookingTime": booking_time
             },
             priority=NotificationPriority.URGENT,
-            db=db,
             sound="default",
             badge=1
         )
@@ -280,8 +274,7 @@ class ExpoPushService:
         order_id: int,
         order_no: str,
         service_name: str,
-        cancel_reason: str,
-        db: AsyncSession
+        cancel_reason: str
     ):
         """发送订单取消通知"""
         return await ExpoPushService.send_notification(
@@ -297,16 +290,37 @@ class ExpoPushService:
                 "serviceName": service_name,
                 "cancelReason": cancel_reason
             },
-            priority=NotificationPriority.HIGH,
-            db=db
+            priority=NotificationPriority.HIGH
+        )
+    
+    @staticmethod
+    async def send_booking_reminder(
+        therapist_id: int,
+        order_id: int,
+        order_no: str,
+        booking_time: str
+    ):
+        """发送服务开始提醒"""
+        return await ExpoPushService.send_notification(
+            therapist_id=therapist_id,
+            notification_type=NotificationType.BOOKING_REMINDER,
+            title="⏰ 服务即将开始",
+            body=f"订单 {order_no} 将于 {booking_time} 开始，请提前出发",
+            data={
+                "type": "booking_reminder",
+                "orderId": order_id,
+                "orderNo": order_no,
+                "screen": "OrderDetails",
+                "bookingTime": booking_time
+            },
+            priority=NotificationPriority.HIGH
         )
     
     @staticmethod
     async def send_system_message(
         therapist_id: int,
         title: str,
-        message: str,
-        db: AsyncSession
+        message: str
     ):
         """发送系统消息"""
         return await ExpoPushService.send_notification(
@@ -318,8 +332,7 @@ class ExpoPushService:
                 "type": "system_message",
                 "screen": "Notifications"
             },
-            priority=NotificationPriority.NORMAL,
-            db=db
+            priority=NotificationPriority.NORMAL
         )
 
 
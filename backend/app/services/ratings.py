@@ -0,0 +1,207 @@
+"""
+评分聚合
+
+rating_aggregates 按技师/服务保存各星级的可见评价数，评价写入时在同一事务内增量更新：
+
+    WITH agg AS (
+        INSERT INTO rating_aggregates (...) VALUES (...)
+        ON CONFLICT (subject_type, subject_id) DO UPDATE SET star_k = rating_aggregates.star_k + :delta
+        RETURNING star_1, ..., star_5
+    )
+    UPDATE therapists SET review_count = <总数>, rating = <加权平均> FROM agg WHERE therapists.id = :id
+
+Therapist/Service 上的 rating、review_count 冗余字段由同一条语句同步，列表和详情页无需再聚合评价表。
+并发写入依赖聚合行的行锁串行化，不会丢失计数。
+
+recompute_rating_aggregates 按 ID 分批从评价表全量重算，用于修复历史数据或手工改库造成的偏差。
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Numeric, case, cast, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.review import RatingAggregate, RatingSubject, Review
+from app.models.service import Service
+from app.models.therapist import Therapist
+
+STARS = (1, 2, 3, 4, 5)
+
+# 没有评价时的默认评分（与模型默认值一致）
+DEFAULT_RATING = 5.0
+
+_aggregates = RatingAggregate.__table__
+
+# 聚合对象 -> (冗余字段所在模型, 评价表外键)
+_SUBJECTS = {
+    RatingSubject.THERAPIST: (Therapist, Review.therapist_id),
+    RatingSubject.SERVICE: (Service, Review.service_id),
+}
+
+
+def _sync_denormalized(model, subject_id, counts) -> update:
+    """由星级计数（CTE 或子查询的列）更新模型的 rating / review_count"""
+    total = sum((counts[star] for star in STARS[1:]), counts[1])
+    weighted = sum((counts[star] * star for star in STARS[1:]), counts[1])
+    return (
+        update(model)
+        .where(model.id == subject_id)
+        .values(
+            review_count=total,
+            rating=case(
+                (total > 0, func.round(cast(weighted, Numeric) / total, 2)),
+                else_=DEFAULT_RATING,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+class RatingAggregates:
+    """评价变动时增量维护评分聚合（不提交事务）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def review_added(self, review: Review):
+        """新增评价（仅可见评价计入）"""
+        if review.is_visible:
+            await self.apply(review.therapist_id, review.service_id, review.rating, 1)
+
+    async def apply(self, therapist_id: int, service_id: int, rating: int, delta: int):
+        """某星级评价数 +delta，同时更新技师和服务的聚合"""
+        await self._apply(RatingSubject.THERAPIST, therapist_id, rating, delta)
+        await self._apply(RatingSubject.SERVICE, service_id, rating, delta)
+
+    async def _apply(self, subject_type: RatingSubject, subject_id: int, rating: int, delta: int):
+        model, _ = _SUBJECTS[subject_type]
+        column = f"star_{rating}"
+        now = datetime.utcnow()
+        upsert = (
+            pg_insert(_aggregates)
+            .values(
+                subject_type=subject_type,
+                subject_id=subject_id,
+                updated_at=now,
+                **{f"star_{star}": max(delta, 0) if star == rating else 0 for star in STARS},
+            )
+            .on_conflict_do_update(
+                index_elements=[_aggregates.c.subject_type, _aggregates.c.subject_id],
+                set_={column: _aggregates.c[column] + delta, "updated_at": now},
+            )
+            .returning(_aggregates.c.subject_id, *(_aggregates.c[f"star_{star}"] for star in STARS))
+            .cte("agg")
+        )
+        counts = {star: upsert.c[f"star_{star}"] for star in STARS}
+        await self.db.execute(_sync_denormalized(model, upsert.c.subject_id, counts))
+
+
+async def get_aggregate(
+    db: AsyncSession, subject_type: RatingSubject, subject_id: int
+) -> Optional[RatingAggregate]:
+    """按主键读取评分聚合"""
+    return await db.get(RatingAggregate, (subject_type, subject_id))
+
+
+async def set_review_visibility(db: AsyncSession, review_id: int, visible: bool) -> Optional[Row]:
+    """
+    显示/隐藏评价并同步聚合
+
+    条件 UPDATE（is_visible 与目标不同才更新），重复调用不会重复计数。
+    返回被更新的评价 (therapist_id, service_id, rating)，状态未变化或评价不存在时返回 None
+    """
+    row = (await db.execute(
+        update(Review)
+        .where(Review.id == review_id, Review.is_visible != visible)
+        .values(is_visible=visible, updated_at=datetime.utcnow())
+        .returning(Review.therapist_id, Review.service_id, Review.rating)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if row is not None:
+        await RatingAggregates(db).apply(row.therapist_id, row.service_id, row.rating, 1 if visible else -1)
+    return row
+
+
+async def delete_review(db: AsyncSession, review_id: int) -> bool:
+    """删除评价并同步聚合，评价不存在时返回 False"""
+    row = (await db.execute(
+        delete(Review)
+        .where(Review.id == review_id)
+        .returning(Review.therapist_id, Review.service_id, Review.rating, Review.is_visible)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if row is None:
+        return False
+    if row.is_visible:
+        await RatingAggregates(db).apply(row.therapist_id, row.service_id, row.rating, -1)
+    return True
+
+
+async def _recompute_range(db: AsyncSession, subject_type: RatingSubject, after_id: int, upto_id: int):
+    """从评价表重算 (after_id, upto_id] 范围内对象的聚合和冗余字段"""
+    model, foreign_key = _SUBJECTS[subject_type]
+    counts = (
+        select(
+            literal(subject_type, _aggregates.c.subject_type.type).label("subject_type"),
+            model.id.label("subject_id"),
+            *(
+                func.count(Review.id).filter(Review.rating == star).label(f"star_{star}")
+                for star in STARS
+            ),
+            literal(datetime.utcnow(), _aggregates.c.updated_at.type).label("updated_at"),
+        )
+        .select_from(model)
+        .outerjoin(Review, (foreign_key == model.id) & Review.is_visible.is_(True))
+        .where(model.id > after_id, model.id <= upto_id)
+        .group_by(model.id)
+    )
+    upsert = pg_insert(_aggregates).from_select(
+        ["subject_type", "subject_id", *(f"star_{star}" for star in STARS), "updated_at"], counts
+    )
+    await db.execute(upsert.on_conflict_do_update(
+        index_elements=[_aggregates.c.subject_type, _aggregates.c.subject_id],
+        set_={
+            **{f"star_{star}": upsert.excluded[f"star_{star}"] for star in STARS},
+            "updated_at": upsert.excluded.updated_at,
+        },
+    ))
+
+    aggregate = (
+        select(_aggregates)
+        .where(_aggregates.c.subject_type == subject_type)
+        .where(_aggregates.c.subject_id > after_id, _aggregates.c.subject_id <= upto_id)
+        .subquery("agg")
+    )
+    counts = {star: aggregate.c[f"star_{star}"] for star in STARS}
+    stmt = _sync_denormalized(model, aggregate.c.subject_id, counts)
+    await db.execute(stmt.where(model.id > after_id, model.id <= upto_id))
+
+
+async def recompute_rating_aggregates(batch_size: Optional[int] = None) -> int:
+    """
+    按 ID 分批全量重算技师和服务的评分聚合（每批单独提交），返回处理的对象数
+
+    与评价写入并发时，单个对象可能短暂偏差，在下一轮重算时修正。
+    """
+    batch_size = batch_size or settings.SCHEDULER_BATCH_SIZE
+    total = 0
+    for subject_type, (model, _) in _SUBJECTS.items():
+        after_id = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                ids = (await db.execute(
+                    select(model.id).where(model.id > after_id).order_by(model.id).limit(batch_size)
+                )).scalars().all()
+                if not ids:
+                    break
+                await _recompute_range(db, subject_type, after_id, ids[-1])
+                await db.commit()
+            total += len(ids)
+            after_id = ids[-1]
+            if len(ids) < batch_size:
+                break
+    return total
@@ -0,0 +1,119 @@
+"""
+定时任务
+
+由 app.core.scheduler 在 leader 进程中周期执行。预约相关任务按 (status, booking_date, start_time) 索引
+分批扫描，每批一条 UPDATE ... WHERE id IN (SELECT ... LIMIT n FOR UPDATE SKIP LOCKED) RETURNING，
+单批单独提交，批大小由 SCHEDULER_BATCH_SIZE 控制。评分聚合重算、技师排序分见 app.services.ratings / therapist_rank。
+"""
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.scheduler import Scheduler
+from app.models.booking import Booking, BookingStatus
+from app.services import slot_engine
+from app.services.ratings import recompute_rating_aggregates
+from app.services.therapist_rank import refresh_therapist_ranks
+from app.services.booking_state import BookingStateMachine
+from app.services.push_notification import push_service
+
+
+def local_now() -> datetime:
+    """预约时区的当前时间（booking_date/start_time 按该时区存储，不带时区信息）"""
+    return datetime.now(ZoneInfo(settings.BOOKING_TIMEZONE)).replace(tzinfo=None)
+
+
+def _starts_before(booking, moment: datetime):
+    return tuple_(booking.booking_date, booking.start_time) < (moment.date(), moment.time())
+
+
+async def expire_unaccepted_bookings() -> int:
+    """取消临近开始（BOOKING_ACCEPT_DEADLINE_MINUTES 内）仍未接单的预约，并释放时段"""
+    deadline = local_now() + timedelta(minutes=settings.BOOKING_ACCEPT_DEADLINE_MINUTES)
+    batch_size = settings.SCHEDULER_BATCH_SIZE
+    total = 0
+    while True:
+        candidate = aliased(Booking)
+        batch = (
+            select(candidate.id)
+            .where(candidate.status == BookingStatus.PENDING)
+            .where(_starts_before(candidate, deadline))
+            .order_by(candidate.booking_date, candidate.start_time)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = await BookingStateMachine(db).bulk_transition(
+                BookingStatus.CANCELLED,
+                Booking.id.in_(batch),
+                sources=[BookingStatus.PENDING],
+                values={"cancel_reason": "技师超时未接单，系统自动取消", "cancelled_by": "system"},
+            )
+            await db.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+async def send_booking_reminders() -> int:
+    """提醒技师即将开始（BOOKING_REMINDER_MINUTES 内）的已接单预约，每个预约只提醒一次"""
+    now = local_now()
+    until = now + timedelta(minutes=settings.BOOKING_REMINDER_MINUTES)
+    batch_size = settings.SCHEDULER_BATCH_SIZE
+    total = 0
+    while True:
+        candidate = aliased(Booking)
+        batch = (
+            select(candidate.id)
+            .where(candidate.status == BookingStatus.CONFIRMED)
+            .where(candidate.reminder_sent_at.is_(None))
+            .where(~_starts_before(candidate, now))
+            .where(_starts_before(candidate, until))
+            .order_by(candidate.booking_date, candidate.start_time)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            # 先标记再发送（至多一次）：发送失败不会重复打扰，也不会阻塞下一批
+            result = await db.execute(
+                update(Booking)
+                .where(Booking.id.in_(batch))
+                .values(reminder_sent_at=datetime.utcnow())
+                .returning(Booking.id, Booking.booking_no, Booking.therapist_id, Booking.start_time)
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            await db.commit()
+
+        # 会话关闭（连接已归还）后再发送，推送耗时不占用数据库连接
+        for row in rows:
+            await push_service.send_booking_reminder(
+                therapist_id=row.therapist_id,
+                order_id=row.id,
+                order_no=row.booking_no,
+                booking_time=row.start_time.strftime("%H:%M"),
+            )
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+async def materialize_upcoming_slots() -> int:
+    """按排班规则滚动生成未来窗口的时段"""
+    async with AsyncSessionLocal() as db:
+        inserted = await slot_engine.materialize_slots(db)
+        await db.commit()
+    return inserted
+
+
+def register_jobs(scheduler: Scheduler):
+    """注册定时任务"""
+    scheduler.add_job("expire_unaccepted_bookings", settings.BOOKING_EXPIRE_INTERVAL_SECONDS, expire_unaccepted_bookings)
+    scheduler.add_job("send_booking_reminders", settings.BOOKING_REMINDER_INTERVAL_SECONDS, send_booking_reminders)
+    scheduler.add_job("materialize_upcoming_slots", settings.SLOT_MATERIALIZE_INTERVAL_SECONDS, materialize_upcoming_slots)
+    scheduler.add_job("recompute_rating_aggregates", settings.RATING_REPAIR_INTERVAL_SECONDS, recompute_rating_aggregates)
+    scheduler.add_job("refresh_therapist_ranks", settings.THERAPIST_RANK_REFRESH_INTERVAL_SECONDS, refresh_therapist_ranks)
@@ -0,0 +1,470 @@
+"""
+排班时段引擎
+
+可用时段 = 排班规则（每周规则 + 指定日期例外）切分成时段 - 已有预约占用的区间 - 单个时段的不可用覆盖。
+
+- 查询可用时段时实时计算：每次只读取一个技师在日期范围内的规则、预约和例外行（3 次查询），
+  计算量为 O(天数 × 每天时段数)，与技师总数无关
+- 定时任务按规则滚动生成未来 SLOT_MATERIALIZE_DAYS 天的 TherapistTimeSlot 行（批量 INSERT ... ON CONFLICT DO NOTHING），
+  供创建预约时锁定时段；超出窗口的日期在预约时按需生成
+- 没有任何排班规则的技师沿用预生成的 TherapistTimeSlot 行（兼容 seed_data 生成的数据）
+
+预约之间的重叠由 bookings 表上的排除约束（技师 + 时间区间）在数据库层保证；
+IntervalIndex 是同样语义的纯 Python 实现，用于可用性计算和非 PostgreSQL 环境下的预检查。
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.booking import Booking, BookingStatus
+from app.models.therapist import TherapistSchedule, TherapistTimeSlot
+
+# 占用技师时间的预约状态
+OCCUPYING_STATUSES = (
+    BookingStatus.PENDING,
+    BookingStatus.CONFIRMED,
+    BookingStatus.EN_ROUTE,
+    BookingStatus.IN_PROGRESS,
+    BookingStatus.COMPLETED,
+)
+
+Interval = Tuple[int, int]  # 当天分钟数 [start, end)
+
+
+class SlotState(NamedTuple):
+    """计算得到的单个时段"""
+    start: time
+    end: time
+    available: bool
+    booked: bool
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def _interval(start: time, end: time) -> Interval:
+    """时间段转分钟区间，结束时间不晚于开始时间视为到当天 24:00"""
+    s, e = _minutes(start), _minutes(end)
+    return (s, e if e > s else 24 * 60)
+
+
+def _to_time(minutes: int) -> time:
+    """分钟数转时间，24:00 记为 00:00（_interval 把不晚于开始时间的结束时间还原为 24:00）"""
+    minutes = min(minutes, 24 * 60) % (24 * 60)
+    return time(minutes // 60, minutes % 60)
+
+
+def _overlaps(a: Interval, b: Interval) -> bool:
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def booking_interval(start_time: time, duration: int) -> Interval:
+    """预约占用的分钟区间（按服务时长计算，可跨越多个时段）"""
+    start = _minutes(start_time)
+    return (start, start + duration)
+
+
+class IntervalIndex:
+    """
+    单个技师单天的占用区间索引
+
+    内部保存按开始时间排序、互不重叠（相交的区间合并）的区间，
+    重叠检测用二分查找，O(log n)。
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for interval in sorted(intervals):
+            self.add(interval)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlaps(self, interval: Interval) -> bool:
+        """是否与已有区间重叠（端点相接不算重叠）"""
+        # 开始时间早于 interval 结束的最后一个区间；区间互不重叠，其结束时间也是所有候选中最大的
+        i = bisect_left(self._starts, interval[1]) - 1
+        return i >= 0 and self._ends[i] > interval[0]
+
+    def add(self, interval: Interval) -> None:
+        """加入区间，与已有区间重叠时合并"""
+        start, end = interval
+        lo = bisect_left(self._ends, start)
+        hi = bisect_left(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+            del self._starts[lo:hi]
+            del self._ends[lo:hi]
+        insort(self._starts, start)
+        self._ends.insert(bisect_left(self._starts, start), end)
+
+
+@dataclass
+class ScheduleRules:
+    """单个技师的排班规则"""
+    weekly: Dict[int, List[Interval]] = field(default_factory=lambda: defaultdict(list))
+    open_dates: Dict[date, List[Interval]] = field(default_factory=lambda: defaultdict(list))
+    closed_dates: Dict[date, List[Interval]] = field(default_factory=lambda: defaultdict(list))
+
+    def add(self, rule) -> None:
+        interval = _interval(rule.start_time, rule.end_time)
+        if rule.date is None:
+            if rule.is_available:
+                self.weekly[rule.weekday].append(interval)
+        elif rule.is_available:
+            self.open_dates[rule.date].append(interval)
+        else:
+            self.closed_dates[rule.date].append(interval)
+
+    def __bool__(self) -> bool:
+        return bool(self.weekly or self.open_dates or self.closed_dates)
+
+    def slots(self, day: date, interval: int) -> List[Interval]:
+        """某天按规则切分出的时段（已去掉请假/休息区间），按开始时间排序"""
+        windows = self.open_dates.get(day) or self.weekly.get(day.weekday(), [])
+        closed = self.closed_dates.get(day, [])
+        result = []
+        for start, end in sorted(windows):
+            m = start
+            while m + interval <= end:
+                slot = (m, m + interval)
+                if not any(_overlaps(slot, c) for c in closed):
+                    result.append(slot)
+                m += interval
+        return result
+
+
+def _rules_query(therapist_ids: Sequence[int], start_date: date, end_date: date):
+    return (
+        select(
+            TherapistSchedule.therapist_id,
+            TherapistSchedule.weekday,
+            TherapistSchedule.date,
+            TherapistSchedule.start_time,
+            TherapistSchedule.end_time,
+            TherapistSchedule.is_available,
+        )
+        .where(TherapistSchedule.therapist_id.in_(therapist_ids))
+        .where(or_(
+            TherapistSchedule.weekday.is_not(None),
+            TherapistSchedule.date.between(start_date, end_date),
+        ))
+    )
+
+
+async def load_rules(
+    db: AsyncSession, therapist_ids: Sequence[int], start_date: date, end_date: date
+) -> Dict[int, ScheduleRules]:
+    """批量读取技师在日期范围内生效的排班规则"""
+    rules: Dict[int, ScheduleRules] = defaultdict(ScheduleRules)
+    result = await db.execute(_rules_query(therapist_ids, start_date, end_date))
+    for row in result:
+        rules[row.therapist_id].add(row)
+    return rules
+
+
+def _days(start_date: date, end_date: date) -> Iterable[date]:
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+# ==================== 实时可用性 ====================
+
+async def get_availability(
+    db: AsyncSession, therapist_id: int, start_date: date, end_date: date
+) -> Dict[date, List[SlotState]]:
+    """
+    计算技师在日期范围内每天的时段状态
+
+    Returns:
+        {日期: [SlotState, ...]}，没有时段的日期不出现在结果中
+    """
+    rules = (await load_rules(db, [therapist_id], start_date, end_date)).get(therapist_id)
+
+    slot_rows = (await db.execute(
+        select(
+            TherapistTimeSlot.date,
+            TherapistTimeSlot.start_time,
+            TherapistTimeSlot.end_time,
+            TherapistTimeSlot.is_available,
+            TherapistTimeSlot.is_booked,
+        )
+        .where(TherapistTimeSlot.therapist_id == therapist_id)
+        .where(TherapistTimeSlot.date.between(start_date, end_date))
+        .order_by(TherapistTimeSlot.date, TherapistTimeSlot.start_time)
+    )).all()
+
+    if not rules:
+        # 没有排班规则：沿用预生成的时段
+        availability: Dict[date, List[SlotState]] = defaultdict(list)
+        for row in slot_rows:
+            availability[row.date].append(SlotState(
+                start=row.start_time,
+                end=row.end_time,
+                available=row.is_available and not row.is_booked,
+                booked=row.is_booked,
+            ))
+        return availability
+
+    booking_rows = (await db.execute(
+        select(Booking.booking_date, Booking.start_time, Booking.end_time)
+        .where(Booking.therapist_id == therapist_id)
+        .where(Booking.booking_date.between(start_date, end_date))
+        .where(Booking.status.in_(OCCUPYING_STATUSES))
+    )).all()
+
+    booked: Dict[date, IntervalIndex] = defaultdict(IntervalIndex)
+    for row in booking_rows:
+        booked[row.booking_date].add(_interval(row.start_time, row.end_time))
+    blocked = {
+        (row.date, _minutes(row.start_time))
+        for row in slot_rows if not row.is_available
+    }
+
+    interval = settings.SLOT_INTERVAL_MINUTES
+    availability = {}
+    for day in _days(start_date, end_date):
+        day_slots = rules.slots(day, interval)
+        if not day_slots:
+            continue
+        occupied = booked.get(day)
+        states = []
+        for slot in day_slots:
+            is_booked = occupied is not None and occupied.overlaps(slot)
+            is_blocked = (day, slot[0]) in blocked
+            states.append(SlotState(
+                start=_to_time(slot[0]),
+                end=_to_time(slot[1]),
+                available=not is_booked and not is_blocked,
+                booked=is_booked,
+            ))
+        availability[day] = states
+    return availability
+
+
+async def ensure_slots(db: AsyncSession, therapist_id: int, slot_date: date, interval: Interval) -> None:
+    """
+    确保预约区间覆盖的 TherapistTimeSlot 行存在
+
+    超出后台预生成窗口的日期，按排班规则一次性写入区间覆盖的所有时段；
+    没有排班规则的技师不做任何事。
+    """
+    rules = (await load_rules(db, [therapist_id], slot_date, slot_date)).get(therapist_id)
+    if not rules:
+        return
+    await _insert_slots(db, [
+        _slot_row(therapist_id, slot_date, slot)
+        for slot in rules.slots(slot_date, settings.SLOT_INTERVAL_MINUTES)
+        if _overlaps(slot, interval)
+    ])
+
+
+def _covering_query(therapist_id: int, slot_date: date, interval: Interval):
+    """预约结束前开始的时段（结束时间可能跨零点，精确的重叠判断在 Python 中完成）"""
+    stmt = (
+        select(TherapistTimeSlot)
+        .where(TherapistTimeSlot.therapist_id == therapist_id)
+        .where(TherapistTimeSlot.date == slot_date)
+        .order_by(TherapistTimeSlot.start_time)
+    )
+    if interval[1] < 24 * 60:
+        # 预约到 24:00（或之后）时当天所有时段都在预约结束前开始
+        stmt = stmt.where(TherapistTimeSlot.start_time < _to_time(interval[1]))
+    return stmt
+
+
+def candidate_slots_clause(therapist_id_column, slot_date: date, start_time: time):
+    """
+    当天可能与预约区间重叠的时段（结束时间晚于预约开始时间，或跨零点）的连接条件
+
+    用于把时段并入其他查询（如创建预约的校验查询）一次取回，服务时长未知时也能使用；
+    精确的覆盖判断由 find_covering_slots(candidates=...) 完成。
+    """
+    return and_(
+        TherapistTimeSlot.therapist_id == therapist_id_column,
+        TherapistTimeSlot.date == slot_date,
+        or_(
+            TherapistTimeSlot.end_time > start_time,
+            TherapistTimeSlot.end_time <= TherapistTimeSlot.start_time,
+        ),
+    )
+
+
+def _covers(slots: Sequence[TherapistTimeSlot], interval: Interval) -> bool:
+    """按开始时间排序的时段是否从预约开始时间起首尾相接、无空档地覆盖整个预约区间"""
+    if not slots or _minutes(slots[0].start_time) != interval[0]:
+        return False
+    end = interval[0]
+    for slot in slots:
+        slot_start, slot_end = _interval(slot.start_time, slot.end_time)
+        if slot_start != end:
+            return False
+        end = slot_end
+    return end >= interval[1]
+
+
+async def find_covering_slots(
+    db: AsyncSession,
+    therapist_id: int,
+    slot_date: date,
+    interval: Interval,
+    candidates: Optional[Iterable[TherapistTimeSlot]] = None,
+) -> Optional[List[TherapistTimeSlot]]:
+    """
+    查找预约区间覆盖的全部时段（一次查询），任一时段不可用时返回 None
+
+    时段必须从预约开始时间开始、首尾相接地覆盖到预约结束时间（不能跨越午休等空档，也不能超出当天最后一个时段）；
+    超出预生成窗口时按排班规则补建。
+    candidates 为已随其他查询取回的当天候选时段（见 candidate_slots_clause），传入时省去查询。
+    """
+    if candidates is not None:
+        slots = sorted(
+            (slot for slot in candidates if _overlaps(_interval(slot.start_time, slot.end_time), interval)),
+            key=lambda slot: slot.start_time,
+        )
+    else:
+        slots = await _load_covering(db, therapist_id, slot_date, interval)
+    if not _covers(slots, interval):
+        await ensure_slots(db, therapist_id, slot_date, interval)
+        slots = await _load_covering(db, therapist_id, slot_date, interval)
+
+    if not _covers(slots, interval):
+        return None
+    if any(not slot.is_available or slot.is_booked for slot in slots):
+        return None
+    return slots
+
+
+async def _load_covering(db: AsyncSession, therapist_id: int, slot_date: date, interval: Interval):
+    result = await db.execute(_covering_query(therapist_id, slot_date, interval))
+    return [
+        slot for slot in result.scalars()
+        if _overlaps(_interval(slot.start_time, slot.end_time), interval)
+    ]
+
+
+async def has_booking_overlap(db: AsyncSession, therapist_id: int, slot_date: date, interval: Interval) -> bool:
+    """预约区间是否与技师当天已有预约重叠（排除约束的纯 Python 等价实现）"""
+    result = await db.execute(
+        select(Booking.start_time, Booking.end_time)
+        .where(Booking.therapist_id == therapist_id)
+        .where(Booking.booking_date == slot_date)
+        .where(Booking.status.in_(OCCUPYING_STATUSES))
+    )
+    index = IntervalIndex(_interval(row.start_time, row.end_time) for row in result)
+    return index.overlaps(interval)
+
+
+async def reserve_slots(db: AsyncSession, slots: Sequence[TherapistTimeSlot], booking_id: int) -> None:
+    """将预约覆盖的所有时段标记为已预约（单条 UPDATE）"""
+    await db.execute(
+        update(TherapistTimeSlot)
+        .where(TherapistTimeSlot.id.in_([slot.id for slot in slots]))
+        .values(is_booked=True, booking_id=booking_id, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def release_slots(db: AsyncSession, booking_ids: Sequence[int]) -> None:
+    """释放预约占用的所有时段（单条 UPDATE）"""
+    if not booking_ids:
+        return
+    await db.execute(
+        update(TherapistTimeSlot)
+        .where(TherapistTimeSlot.booking_id.in_(booking_ids))
+        .values(is_booked=False, booking_id=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ==================== 滚动预生成 ====================
+
+def _slot_row(therapist_id: int, slot_date: date, slot: Interval) -> dict:
+    now = datetime.utcnow()
+    return {
+        "therapist_id": therapist_id,
+        "date": slot_date,
+        "start_time": _to_time(slot[0]),
+        "end_time": _to_time(slot[1]),
+        "is_available": True,
+        "is_booked": False,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def _insert_slots(db: AsyncSession, rows: List[dict]) -> int:
+    """批量写入时段（insertmanyvalues 多行 INSERT），已存在的 (技师, 日期, 开始时间) 跳过，返回新写入行数"""
+    if not rows:
+        return 0
+    stmt = (
+        pg_insert(TherapistTimeSlot)
+        .on_conflict_do_nothing(constraint="uq_therapist_time_slots_therapist_date_start")
+        .returning(TherapistTimeSlot.id)
+    )
+    result = await db.execute(stmt, rows)
+    return len(result.all())
+
+
+async def materialize_slots(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    days: Optional[int] = None,
+    therapist_ids: Optional[Sequence[int]] = None,
+    chunk_size: int = 500,
+) -> int:
+    """
+    按排班规则生成未来窗口内的时段行
+
+    按技师 ID 分块读取规则，每累计 SLOT_MATERIALIZE_BATCH_SIZE 行批量写入一次，
+    内存占用与技师总数无关。
+
+    Returns:
+        新写入的时段数
+    """
+    start_date = start_date or date.today()
+    end_date = start_date + timedelta(days=(days or settings.SLOT_MATERIALIZE_DAYS) - 1)
+    interval = settings.SLOT_INTERVAL_MINUTES
+    batch_size = settings.SLOT_MATERIALIZE_BATCH_SIZE
+
+    ids_query = select(TherapistSchedule.therapist_id).distinct().order_by(TherapistSchedule.therapist_id)
+    if therapist_ids is not None:
+        ids_query = ids_query.where(TherapistSchedule.therapist_id.in_(therapist_ids))
+
+    inserted = 0
+    rows: List[dict] = []
+    last_id = 0
+    while True:
+        chunk = list((await db.execute(
+            ids_query.where(TherapistSchedule.therapist_id > last_id).limit(chunk_size)
+        )).scalars())
+        if not chunk:
+            break
+        last_id = chunk[-1]
+
+        rules = await load_rules(db, chunk, start_date, end_date)
+        for therapist_id in chunk:
+            therapist_rules = rules.get(therapist_id)
+            if not therapist_rules:
+                continue
+            for day in _days(start_date, end_date):
+                for slot in therapist_rules.slots(day, interval):
+                    rows.append(_slot_row(therapist_id, day, slot))
+            if len(rows) >= batch_size:
+                inserted += await _insert_slots(db, rows)
+                rows = []
+
+    inserted += await _insert_slots(db, rows)
+    return inserted
@@ -0,0 +1,241 @@
+"""
+技师排序分
+
+定时任务按 ID 分批汇总每个已认证技师的指标，计算排序分写入 therapist_ranks，列表接口直接按分数翻页：
+
+- 评分：贝叶斯平均（评价少的技师向先验评分收缩），归一化到 0~1
+- 评价量、完成单量：对数压缩，避免头部技师分数无限拉开
+- 接单率：统计窗口内已接单 / (已接单 + 技师拒单或超时未接单)，带平滑先验
+- 近期可约：未来几天内可预约的时段数，达到目标值即满分
+
+推荐技师额外加 FEATURED_BOOST，保持原来“推荐优先”的顺序。距离与请求方位置相关，不适合预计算，未纳入。
+"""
+import math
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.booking import Booking, BookingStatus
+from app.models.therapist import Therapist, TherapistRank, TherapistTimeSlot
+
+# 各项指标权重（合计 1）
+WEIGHTS = {
+    "rating": 0.45,
+    "reviews": 0.15,
+    "completed": 0.15,
+    "acceptance": 0.15,
+    "availability": 0.10,
+}
+
+# 推荐技师加分（其余分数在 0~1 之间，推荐技师始终排在前面）
+FEATURED_BOOST = 1.0
+
+# 评分先验：相当于每个技师预先有 PRIOR_REVIEWS 条 PRIOR_RATING 分的评价
+PRIOR_RATING = 4.5
+PRIOR_REVIEWS = 10
+
+# 接单率先验：相当于预先接了 4 单、拒了 1 单
+PRIOR_ACCEPTED = 4
+PRIOR_DECIDED = 5
+
+# 对数压缩的饱和点
+REVIEWS_SATURATION = 500
+COMPLETED_SATURATION = 1000
+
+# 近期可约时段数达到该值即满分
+OPEN_SLOTS_TARGET = 16
+
+_ACCEPTED_STATUSES = (
+    BookingStatus.CONFIRMED,
+    BookingStatus.EN_ROUTE,
+    BookingStatus.IN_PROGRESS,
+    BookingStatus.COMPLETED,
+)
+
+_ranks = TherapistRank.__table__
+
+
+def _log_scale(value: int, saturation: int) -> float:
+    return min(1.0, math.log1p(max(value, 0)) / math.log1p(saturation))
+
+
+def compute_score(
+    *,
+    rating: float,
+    review_count: int,
+    completed_count: int,
+    accepted: int,
+    rejected: int,
+    open_slots: int,
+    is_featured: bool,
+) -> Tuple[float, float]:
+    """计算排序分，返回 (score, acceptance_rate)"""
+    bayesian_rating = (
+        (rating or 0) * review_count + PRIOR_RATING * PRIOR_REVIEWS
+    ) / (review_count + PRIOR_REVIEWS)
+    acceptance_rate = (accepted + PRIOR_ACCEPTED) / (accepted + rejected + PRIOR_DECIDED)
+
+    score = (
+        WEIGHTS["rating"] * bayesian_rating / 5
+        + WEIGHTS["reviews"] * _log_scale(review_count, REVIEWS_SATURATION)
+        + WEIGHTS["completed"] * _log_scale(completed_count, COMPLETED_SATURATION)
+        + WEIGHTS["acceptance"] * acceptance_rate
+        + WEIGHTS["availability"] * min(open_slots, OPEN_SLOTS_TARGET) / OPEN_SLOTS_TARGET
+    )
+    if is_featured:
+        score += FEATURED_BOOST
+    return round(score, 6), round(acceptance_rate, 4)
+
+
+def insert_default_rank(connection, therapist) -> None:
+    """
+    为刚通过认证的技师写入默认排序分（已有排序分时不覆盖）
+
+    只用技师表上已有的评分、评价数、完成单数计算，接单率取先验、近期可约按 0 计，
+    下次 refresh_therapist_ranks 重算时更新为完整指标。在 flush 过程中（ORM 事件）以同步连接调用。
+    """
+    score, acceptance_rate = compute_score(
+        rating=therapist.rating or 0,
+        review_count=therapist.review_count or 0,
+        completed_count=therapist.completed_count or 0,
+        accepted=0,
+        rejected=0,
+        open_slots=0,
+        is_featured=bool(therapist.is_featured),
+    )
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    connection.execute(
+        insert(_ranks)
+        .values(
+            therapist_id=therapist.id,
+            score=score,
+            rating=therapist.rating or 0,
+            review_count=therapist.review_count or 0,
+            completed_count=therapist.completed_count or 0,
+            acceptance_rate=acceptance_rate,
+            open_slots=0,
+            refreshed_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=[_ranks.c.therapist_id])
+    )
+
+
+def _metrics_query(after_id: int, upto_id: int, today: date):
+    """(after_id, upto_id] 范围内已认证技师的排序指标"""
+    def in_range(column):
+        return and_(column > after_id, column <= upto_id)
+
+    bookings = (
+        select(
+            Booking.therapist_id,
+            func.count().filter(Booking.status.in_(_ACCEPTED_STATUSES)).label("accepted"),
+            func.count().filter(
+                and_(
+                    Booking.status == BookingStatus.CANCELLED,
+                    Booking.cancelled_by.in_(("therapist", "system")),
+                )
+            ).label("rejected"),
+        )
+        .where(in_range(Booking.therapist_id))
+        .where(Booking.created_at >= datetime.utcnow() - timedelta(days=settings.THERAPIST_RANK_WINDOW_DAYS))
+        .group_by(Booking.therapist_id)
+        .subquery()
+    )
+    slots = (
+        select(TherapistTimeSlot.therapist_id, func.count().label("open_slots"))
+        .where(in_range(TherapistTimeSlot.therapist_id))
+        .where(TherapistTimeSlot.date >= today)
+        .where(TherapistTimeSlot.date < today + timedelta(days=settings.THERAPIST_RANK_SLOT_DAYS))
+        .where(TherapistTimeSlot.is_available.is_(True))
+        .where(TherapistTimeSlot.is_booked.is_(False))
+        .group_by(TherapistTimeSlot.therapist_id)
+        .subquery()
+    )
+    return (
+        select(
+            Therapist.id,
+            Therapist.rating,
+            Therapist.review_count,
+            Therapist.completed_count,
+            Therapist.is_featured,
+            func.coalesce(bookings.c.accepted, 0).label("accepted"),
+            func.coalesce(bookings.c.rejected, 0).label("rejected"),
+            func.coalesce(slots.c.open_slots, 0).label("open_slots"),
+        )
+        .outerjoin(bookings, bookings.c.therapist_id == Therapist.id)
+        .outerjoin(slots, slots.c.therapist_id == Therapist.id)
+        .where(in_range(Therapist.id))
+        .where(Therapist.is_verified.is_(True))
+    )
+
+
+async def refresh_therapist_ranks(batch_size: Optional[int] = None) -> int:
+    """
+    按 ID 分批重算全部技师的排序分（每批单独提交），返回写入的技师数
+
+    每个已认证技师都会 upsert 一行，认证事件之外产生的已认证技师（如直接改库、批量导入）在此补齐
+    """
+    batch_size = batch_size or settings.SCHEDULER_BATCH_SIZE
+    today = datetime.now(ZoneInfo(settings.BOOKING_TIMEZONE)).date()
+    total = 0
+    after_id = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(
+                select(Therapist.id).where(Therapist.id > after_id).order_by(Therapist.id).limit(batch_size)
+            )).scalars().all()
+            if not ids:
+                break
+            upto_id = ids[-1]
+
+            now = datetime.utcnow()
+            values = []
+            for row in await db.execute(_metrics_query(after_id, upto_id, today)):
+                score, acceptance_rate = compute_score(
+                    rating=row.rating,
+                    review_count=row.review_count,
+                    completed_count=row.completed_count,
+                    accepted=row.accepted,
+                    rejected=row.rejected,
+                    open_slots=row.open_slots,
+                    is_featured=row.is_featured,
+                )
+                values.append({
+                    "therapist_id": row.id,
+                    "score": score,
+                    "rating": row.rating,
+                    "review_count": row.review_count,
+                    "completed_count": row.completed_count,
+                    "acceptance_rate": acceptance_rate,
+                    "open_slots": row.open_slots,
+                    "refreshed_at": now,
+                })
+
+            # 本批范围内未认证（或已取消认证）的技师移出排序
+            await db.execute(
+                delete(TherapistRank)
+                .where(TherapistRank.therapist_id > after_id, TherapistRank.therapist_id <= upto_id)
+                .where(TherapistRank.therapist_id.not_in([value["therapist_id"] for value in values]))
+            )
+            if values:
+                upsert = pg_insert(_ranks).values(values)
+                await db.execute(upsert.on_conflict_do_update(
+                    index_elements=[_ranks.c.therapist_id],
+                    set_={
+                        column: upsert.excluded[column]
+                        for column in values[0] if column != "therapist_id"
+                    },
+                ))
+            await db.commit()
+
+        total += len(values)
+        after_id = upto_id
+        if len(ids) < batch_size:
+            break
+    return total
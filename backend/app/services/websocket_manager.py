@@ -1,12 +1,20 @@
 """
 WebSocket 连接管理器
+
+连接/断开各输出一条 INFO 日志；每次发送的结果只输出 DEBUG，发送失败按 key 限流（见 app.core.log）。
 """
 from typing import Dict, List, Set
 from fastapi import WebSocket
-import json
 import asyncio
+import orjson
 from loguru import logger
 
+from app.core import metrics
+from app.core.tracing import span
+
+# 发送失败的日志限流（连接批量失效时避免刷屏）
+_send_failed_log = logger.bind(throttle="ws.send_failed")
+
 
 class ConnectionManager:
     """WebSocket 连接管理器"""
@@ -27,28 +35,35 @@ class ConnectionManager:
         
         self.active_connections[therapist_id].add(websocket)
         self.websocket_to_therapist[websocket] = therapist_id
+        self._update_metrics()
         
-        logger.info(f"✅ 技师 {therapist_id} 建立 WebSocket 连接")
-        logger.info(f"📊 当前在线技师数: {len(self.active_connections)}")
+        logger.info(
+            "✅ 技师 {} 建立 WebSocket 连接（在线技师 {}，连接 {}）",
+            therapist_id, len(self.active_connections), len(self.websocket_to_therapist),
+        )
         
     def disconnect(self, websocket: WebSocket):
-        """断开 WebSocket 连接"""
-        therapist_id = self.websocket_to_therapist.get(websocket)
+        """断开 WebSocket 连接（重复调用时直接返回）"""
+        therapist_id = self.websocket_to_therapist.pop(websocket, None)
+        if therapist_id is None:
+            return
         
-        if therapist_id and therapist_id in self.active_connections:
-            self.active_connections[therapist_id].discard(websocket)
-            
+        connections = self.active_connections.get(therapist_id)
+        if connections is not None:
+            connections.discard(websocket)
             # 如果该技师没有任何连接了，移除该技师
-            if not self.active_connections[therapist_id]:
+            if not connections:
                 del self.active_connections[therapist_id]
-                logger.info(f"❌ 技师 {therapist_id} 所有 WebSocket 连接已断开")
-            else:
-                logger.info(f"⚠️ 技师 {therapist_id} 断开一个 WebSocket 连接，剩余 {len(self.active_connections[therapist_id])} 个")
+        self._update_metrics()
         
-        if websocket in self.websocket_to_therapist:
-            del self.websocket_to_therapist[websocket]
-        
-        logger.info(f"📊 当前在线技师数: {len(self.active_connections)}")
+        logger.info(
+            "🔌 技师 {} 断开 WebSocket 连接（剩余 {} 个，在线技师 {}）",
+            therapist_id, len(connections or ()), len(self.active_connections),
+        )
+    
+    def _update_metrics(self):
+        """同步连接数指标（websocket_to_therapist 每个连接一项）"""
+        metrics.set_websocket_connections(len(self.websocket_to_therapist), len(self.active_connections))
     
     def is_therapist_online(self, therapist_id: int) -> bool:
         """检查技师是否在线（至少有一个活跃连接）"""
@@ -57,32 +72,34 @@ class ConnectionManager:
     async def send_personal_message(self, message: dict, therapist_id: int) -> bool:
         """发送消息给指定技师的所有连接"""
         if therapist_id not in self.active_connections:
-            logger.warning(f"⚠️ 技师 {therapist_id} 不在线，无法发送 WebSocket 消息")
+            logger.debug("技师 {} 不在线，跳过 WebSocket 消息", therapist_id)
             return False
         
         connections = self.active_connections[therapist_id].copy()
-        message_str = json.dumps(message, ensure_ascii=False)
+        # orjson 输出 UTF-8（等价于 ensure_ascii=False），且原生支持 datetime
+        message_str = orjson.dumps(message).decode()
         
         success_count = 0
         failed_connections = []
         
-        for websocket in connections:
-            try:
-                await websocket.send_text(message_str)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"❌ 发送消息失败: {e}")
-                failed_connections.append(websocket)
+        with span("websocket.send", therapist_id=therapist_id, connections=len(connections)):
+            for websocket in connections:
+                try:
+                    await websocket.send_text(message_str)
+                    success_count += 1
+                except Exception as e:
+                    _send_failed_log.warning("❌ WebSocket 发送失败（技师 {}）: {}", therapist_id, e)
+                    failed_connections.append(websocket)
         
         # 清理失败的连接
         for websocket in failed_connections:
             self.disconnect(websocket)
         
         if success_count > 0:
-            logger.info(f"✅ 成功发送消息给技师 {therapist_id} 的 {success_count} 个连接")
+            logger.debug("WebSocket 消息已发送给技师 {} 的 {} 个连接", therapist_id, success_count)
             return True
         else:
-            logger.warning(f"⚠️ 发送消息给技师 {therapist_id} 失败，所有连接都不可用")
+            _send_failed_log.warning("⚠️ 发送消息给技师 {} 失败，所有连接都不可用", therapist_id)
             return False
     
     async def broadcast(self, message: dict, therapist_ids: List[int] = None):
@@ -98,7 +115,7 @@ class ConnectionManager:
         if tasks:
             results = await asyncio.gather(*tasks, return_exceptions=True)
             success_count = sum(1 for r in results if r is True)
-            logger.info(f"📢 广播消息完成: {success_count}/{len(tasks)} 成功")
+            logger.info("📢 广播消息完成: {}/{} 成功", success_count, len(tasks))
     
     def get_online_therapists(self) -> List[int]:
         """获取所有在线技师 ID 列表"""
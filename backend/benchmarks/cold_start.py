@@ -0,0 +1,126 @@
+"""
+冷启动耗时基准
+
+每轮都启动一个新的解释器，测量：
+
+- import : 导入 app.main 的耗时（模块加载 + 路由构建）
+- ready  : 从启动 uvicorn 进程到 /livez 首次返回 200 的耗时（含解释器启动、导入和 lifespan）
+- readyz : 从启动到 /readyz 首次返回 200 的耗时（依赖检查通过，可以接流量；--no-deps 时不测）
+
+输出各项的中位数 / p95，并与预算比较，超出预算时以非零状态退出（可放进 CI 防止启动变慢）。
+导入耗时的细分见 scripts/profile_startup.py。
+
+默认需要本地 PostgreSQL（已执行 alembic upgrade head）和 Redis；没有依赖时加 --no-deps，
+关闭迁移版本检查和定时任务，只测导入和 /livez。
+
+用法:
+    python benchmarks/cold_start.py --runs 10
+    python benchmarks/cold_start.py --no-deps --budget-import-ms 1500 --budget-ready-ms 2500
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    """新解释器中导入 app.main 的耗时（毫秒）"""
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_ready(env: Dict[str, str], port: int, probes: List[str], timeout: float = 60.0) -> Dict[str, float]:
+    """启动 uvicorn，返回每个探针首次返回 200 的耗时（毫秒）"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    results = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            for probe in probes:
+                while probe not in results:
+                    if time.perf_counter() - started > timeout:
+                        raise RuntimeError(f"{probe} 在 {timeout}s 内未返回 200")
+                    if process.poll() is not None:
+                        raise RuntimeError(f"服务进程已退出（返回码 {process.returncode}）")
+                    try:
+                        if client.get(probe).status_code == 200:
+                            results[probe] = (time.perf_counter() - started) * 1000
+                            continue
+                    except httpx.HTTPError:
+                        pass
+                    time.sleep(0.01)
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    return results
+
+
+def summarize(name: str, samples: List[float], budget: Optional[float]) -> bool:
+    """打印一行统计，返回是否在预算内"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    median = statistics.median(ordered)
+    within = budget is None or median <= budget
+    budget_text = f"{budget:>10.0f}" if budget is not None else f"{'-':>10}"
+    verdict = "" if budget is None else ("  OK" if within else "  超出预算")
+    print(f"{name:<10}{median:>10.0f}{p95:>10.0f}{min(ordered):>10.0f}{budget_text}{verdict}")
+    return within
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动耗时基准")
+    parser.add_argument("--runs", type=int, default=10, help="每项测量的轮数")
+    parser.add_argument("--port", type=int, default=8190)
+    parser.add_argument("--no-deps", action="store_true", help="无数据库/Redis 时使用：关闭迁移检查和定时任务，不测 /readyz")
+    parser.add_argument("--budget-import-ms", type=float, default=2500, help="导入耗时预算（中位数，毫秒）")
+    parser.add_argument("--budget-ready-ms", type=float, default=3500, help="/livez 可用耗时预算（中位数，毫秒）")
+    parser.add_argument("--budget-readyz-ms", type=float, default=4500, help="/readyz 就绪耗时预算（中位数，毫秒）")
+    args = parser.parse_args()
+
+    env = dict(os.environ, DEBUG="false")
+    probes = ["/livez", "/readyz"]
+    if args.no_deps:
+        env.update(SCHEMA_REVISION_CHECK="off", SCHEDULER_ENABLED="false")
+        probes = ["/livez"]
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    ready: Dict[str, List[float]] = {probe: [] for probe in probes}
+    for _ in range(args.runs):
+        for probe, elapsed in measure_ready(env, args.port, probes).items():
+            ready[probe].append(elapsed)
+
+    print(f"{'stage':<10}{'p50 ms':>10}{'p95 ms':>10}{'min ms':>10}{'budget':>10}")
+    print("-" * 50)
+    ok = summarize("import", imports, args.budget_import_ms)
+    ok &= summarize("livez", ready["/livez"], args.budget_ready_ms)
+    if "/readyz" in ready:
+        ok &= summarize("readyz", ready["/readyz"], args.budget_readyz_ms)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+启动方式压测对比
+
+依次以两种方式启动 API，并用相同的负载压测：
+- legacy     : uvicorn app.main:app --reload（旧 Dockerfile 的单进程启动方式）
+- production : gunicorn -c gunicorn.conf.py app.main:app（多 worker + uvloop/httptools）
+
+需要本地 PostgreSQL（已执行 alembic upgrade head 并导入 seed_data）。
+
+用法:
+    python benchmarks/launch_modes.py [--concurrency 64] [--duration 20] [--port 8100]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.append(str(Path(__file__).parent))
+
+from loadgen import format_table, run_load
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+MODES = {
+    "legacy": lambda port: [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--reload",
+    ],
+    "production": lambda port: [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+        "--bind", f"127.0.0.1:{port}", "app.main:app",
+    ],
+}
+
+# 压测场景：只读热点接口
+SCENARIOS = {
+    "GET /health": "/health",
+    "GET /api/v1/therapists": "/api/v1/therapists?page_size=20",
+    "GET /api/v1/services": "/api/v1/services",
+}
+
+
+def wait_ready(base_url: str, timeout: float = 60.0):
+    """等待服务可用"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"服务在 {timeout}s 内未就绪: {base_url}")
+
+
+async def drive(base_url: str, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        results = []
+        for name, path in SCENARIOS.items():
+            results.append(await run_load(
+                name,
+                lambda c, _seq, path=path: c.get(path),
+                client,
+                concurrency=concurrency,
+                duration=duration,
+            ))
+        return results
+
+
+def run_mode(mode: str, port: int, concurrency: int, duration: float):
+    env = dict(os.environ, DEBUG="false")
+    process = subprocess.Popen(
+        MODES[mode](port),
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url)
+        return asyncio.run(drive(base_url, concurrency, duration))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动方式压测对比")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0, help="每个场景压测时长（秒）")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        print(f"\n=== {mode} (concurrency={args.concurrency}, {args.duration:.0f}s/scenario) ===")
+        print(format_table(run_mode(mode, args.port, args.concurrency, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
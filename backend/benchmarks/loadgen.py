@@ -0,0 +1,112 @@
+"""
+简单的异步压测工具（httpx）
+
+供 benchmarks 下的各个脚本复用：固定并发数持续压测一段时间，统计延迟分位数和吞吐。
+"""
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+
+@dataclass
+class LoadResult:
+    """单个场景的压测结果"""
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    @property
+    def throughput(self) -> float:
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "rps": round(self.throughput, 1),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "mean_ms": round(statistics.fmean(self.latencies_ms), 2) if self.latencies_ms else 0.0,
+        }
+
+
+def format_table(results: List[LoadResult]) -> str:
+    """格式化为文本表格"""
+    header = f"{'scenario':<28}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        s = r.summary()
+        lines.append(
+            f"{r.name:<28}{s['requests']:>8}{s['errors']:>6}{s['rps']:>9.1f}"
+            f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+async def run_load(
+    name: str,
+    request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]],
+    client: httpx.AsyncClient,
+    concurrency: int = 16,
+    duration: Optional[float] = 10.0,
+    total: Optional[int] = None,
+) -> LoadResult:
+    """
+    以固定并发压测一个场景
+
+    Args:
+        name: 场景名称
+        request: 发起一次请求的协程函数 (client, seq) -> Response
+        client: httpx 客户端
+        concurrency: 并发数
+        duration: 持续时间（秒），与 total 二选一
+        total: 请求总数
+    """
+    result = LoadResult(name=name)
+    counter = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_seq() -> Optional[int]:
+        nonlocal counter
+        if total is not None and counter >= total:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        counter += 1
+        return counter
+
+    async def worker():
+        while (seq := next_seq()) is not None:
+            start = time.perf_counter()
+            try:
+                response = await request(client, seq)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latency = (time.perf_counter() - start) * 1000
+            if ok:
+                result.latencies_ms.append(latency)
+            else:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,132 @@
+"""
+序列化基准测试 - 每页 100 条数据的 JSON 序列化耗时
+
+对比三种响应路径：
+1. baseline : Pydantic 模型 -> model_dump -> response_model 二次校验 -> 序列化为 dict -> json.dumps
+2. orjson   : 同上，但最后一步使用 orjson（ORJSONResponse 默认类）
+3. fast     : 直接构建 dict -> orjson（列表接口的快速路径，跳过 Pydantic）
+
+用法:
+    python benchmarks/serialization.py [--items 100] [--rounds 2000]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# 添加项目根目录到 Python 路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.schemas.therapist import TherapistListResponse
+
+
+class FakeTherapist:
+    """模拟 ORM 行对象"""
+
+    def __init__(self, i: int):
+        self.id = i
+        self.name = f"Therapist {i}"
+        self.title = "高级按摩治疗师"
+        self.avatar = f"https://cdn.example.com/avatars/{i}.png"
+        self.rating = 4.5 + (i % 5) / 10
+        self.review_count = 100 + i
+        self.base_price = 299.0 + i
+        self.specialties = ["深层组织", "运动康复", "瑞典式"]
+        self.is_featured = i % 3 == 0
+
+
+def build_models(rows) -> List[TherapistListResponse]:
+    return [TherapistListResponse(
+        id=t.id,
+        name=t.name,
+        title=t.title,
+        avatar=t.avatar,
+        rating=t.rating,
+        review_count=t.review_count,
+        base_price=t.base_price,
+        specialties=t.specialties,
+        is_featured=t.is_featured
+    ) for t in rows]
+
+
+def build_dicts(rows) -> List[dict]:
+    return [{
+        "id": t.id,
+        "name": t.name,
+        "title": t.title,
+        "avatar": t.avatar,
+        "rating": t.rating,
+        "review_count": t.review_count,
+        "base_price": t.base_price,
+        "specialties": t.specialties,
+        "is_featured": t.is_featured
+    } for t in rows]
+
+
+adapter = TypeAdapter(List[TherapistListResponse])
+
+
+def _fastapi_serialize(rows):
+    """模拟 FastAPI serialize_response：模型转 dict、按 response_model 校验、再转为 JSON 兼容 dict"""
+    models = build_models(rows)
+    validated = adapter.validate_python([m.model_dump() for m in models])
+    return adapter.dump_python(validated, mode="json")
+
+
+def baseline(rows) -> bytes:
+    content = _fastapi_serialize(rows)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def orjson_default(rows) -> bytes:
+    return orjson.dumps(_fastapi_serialize(rows))
+
+
+def fast_path(rows) -> bytes:
+    return orjson.dumps(build_dicts(rows))
+
+
+def bench(name: str, fn: Callable, rows, rounds: int):
+    # 预热
+    for _ in range(min(50, rounds)):
+        fn(rows)
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(rows)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{name:<10} p50={p50:9.1f}µs  p99={p99:9.1f}µs  mean={statistics.fmean(samples):9.1f}µs")
+    return p50
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表接口序列化基准测试")
+    parser.add_argument("--items", type=int, default=100, help="每页条数")
+    parser.add_argument("--rounds", type=int, default=2000, help="测量轮数")
+    args = parser.parse_args()
+
+    rows = [FakeTherapist(i) for i in range(args.items)]
+
+    # 三种路径的输出必须等价
+    assert orjson.loads(baseline(rows)) == orjson.loads(fast_path(rows))
+
+    print(f"每页 {args.items} 条，{args.rounds} 轮")
+    base = bench("baseline", baseline, rows, args.rounds)
+    orj = bench("orjson", orjson_default, rows, args.rounds)
+    fast = bench("fast", fast_path, rows, args.rounds)
+    print(f"orjson 加速: {base / orj:.1f}x，快速路径加速: {base / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+#!/bin/sh
+# 主库初始化：创建流复制账号并允许其复制连接（仅在数据目录首次初始化时执行）
+# 已有数据卷需手动执行一次：
+#   docker compose exec db sh /docker-entrypoint-initdb.d/init-replication.sh
+#   docker compose restart db
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-SQL
+    DO \$\$
+    BEGIN
+        IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = 'replicator') THEN
+            CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD '${REPLICATION_PASSWORD:-replicator}';
+        END IF;
+    END
+    \$\$;
+SQL
+
+PGDATA="${PGDATA:-/var/lib/postgresql/data}"
+if ! grep -q "^host replication replicator" "$PGDATA/pg_hba.conf"; then
+    echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"
+fi
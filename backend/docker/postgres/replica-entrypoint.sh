@@ -0,0 +1,19 @@
+#!/bin/sh
+# 只读副本：数据目录为空时从主库 pg_basebackup（-R 写入 standby.signal 和 primary_conninfo），然后以 standby 启动
+set -e
+
+PGDATA="${PGDATA:-/var/lib/postgresql/data}"
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -h "$PRIMARY_HOST" -p 5432 -U postgres; do
+        echo "等待主库 $PRIMARY_HOST ..."
+        sleep 1
+    done
+    mkdir -p "$PGDATA"
+    chown postgres:postgres "$PGDATA"
+    chmod 700 "$PGDATA"
+    PGPASSWORD="$REPLICATION_PASSWORD" su-exec postgres \
+        pg_basebackup -h "$PRIMARY_HOST" -p 5432 -U replicator -D "$PGDATA" -X stream -R -P
+fi
+
+exec su-exec postgres postgres -c hot_standby=on
@@ -0,0 +1,69 @@
+"""
+gunicorn 生产配置
+
+用法:
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+import os
+import shutil
+import tempfile
+
+from app.core.config import settings
+from app.core.server import worker_count
+
+# 监听地址
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# worker：每个 CPU 核一个异步 worker（uvloop + httptools）
+workers = worker_count()
+worker_class = "app.core.server.UvicornWorker"
+
+# 不使用 preload_app：每个 worker 在 fork 之后导入应用、独立创建数据库引擎和连接池，避免共享连接
+# （本文件不能导入 app.core.database，否则引擎会在 master 中提前创建）
+preload_app = False
+
+# 优雅关闭：收到 SIGTERM 后停止接收新连接，等待进行中的请求完成
+graceful_timeout = settings.GRACEFUL_TIMEOUT
+timeout = 60
+keepalive = 5
+
+# 定期回收 worker，防止内存缓慢增长（加抖动避免同时重启）
+max_requests = 10000
+max_requests_jitter = 1000
+
+# 日志输出到 stdout/stderr（由容器收集）
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+# Prometheus 多进程模式：各 worker 把指标写入共享目录，/metrics 汇总所有 worker
+# （必须在 worker 导入 prometheus_client 之前设置，worker 由 master fork 时继承环境变量）
+if settings.METRICS_ENABLED:
+    os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "landa-prometheus")
+    )
+
+
+def on_starting(server):
+    """启动时清空上次运行残留的指标文件"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def post_fork(server, worker):
+    """
+    worker fork 后、导入应用前写入实际 worker 数，创建引擎时据此均分连接池
+
+    master 中的 settings 在 worker_count() 写环境变量之前就已创建并被 worker 继承，
+    因此以 server.cfg.workers 为准（同时覆盖命令行 -w 指定的数量）。
+    """
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+
+
+def child_exit(server, worker):
+    """worker 退出（含 max_requests 回收）后移除其实时 gauge，避免连接数重复累计"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
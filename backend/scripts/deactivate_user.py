@@ -0,0 +1,82 @@
+"""
+停用 / 恢复用户账号
+
+停用后：
+- users.is_active 置为 False，HTTP 接口和 WebSocket 握手拒绝该用户
+- 吊销该用户此前签发的全部 Token（写入 Redis 并通知各 worker），已登录设备的 refresh_token 也无法再换取新 Token
+
+需要能连接 Redis，否则只修改数据库并以非零状态码退出（已签发的 Token 在过期前仍可通过吊销检查）。
+
+用法:
+    python scripts/deactivate_user.py 13800138000
+    python scripts/deactivate_user.py --user-id 42
+    python scripts/deactivate_user.py 13800138000 --reactivate
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.redis import close_redis
+from app.core.token_revocation import revocation_store
+from app.models.therapist import Therapist, TherapistStatus
+from app.models.user import User
+
+
+async def set_active(phone: str, user_id: int, active: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        query = select(User).where(User.id == user_id) if user_id else select(User).where(User.phone == phone)
+        user = (await db.execute(query)).scalar_one_or_none()
+        if not user:
+            print(f"❌ 用户不存在: {user_id or phone}")
+            return 1
+
+        user_id, phone = user.id, user.phone
+        user.is_active = active
+        if not active:
+            # 技师下线，不再参与派单
+            therapist = (await db.execute(
+                select(Therapist).where(Therapist.user_id == user.id)
+            )).scalar_one_or_none()
+            if therapist:
+                therapist.status = TherapistStatus.OFFLINE.value
+        await db.commit()
+        print(f"✅ 用户 {user_id}（{phone}）已{'恢复' if active else '停用'}")
+
+        if active:
+            return 0
+
+    await revocation_store.start()
+    try:
+        if not await revocation_store.revoke_user(user_id):
+            print("⚠️  未能写入 Redis，已签发的 Token 未被吊销，请在 Redis 恢复后重新执行")
+            return 1
+    finally:
+        await revocation_store.stop()
+    print("✅ 已吊销该用户的全部 Token")
+    return 0
+
+
+async def main(args) -> int:
+    try:
+        return await set_active(args.phone, args.user_id, args.reactivate)
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="停用 / 恢复用户账号")
+    parser.add_argument("phone", nargs="?", help="手机号")
+    parser.add_argument("--user-id", type=int, help="用户 ID（替代手机号）")
+    parser.add_argument("--reactivate", action="store_true", help="恢复账号")
+    args = parser.parse_args()
+    if not args.phone and not args.user_id:
+        parser.error("需要手机号或 --user-id")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,95 @@
+"""
+启动耗时分析（-X importtime 报告）
+
+在新的解释器中以 python -X importtime 导入目标模块（默认 app.main），解析导入耗时并输出：
+
+- 总导入耗时
+- 按顶层包汇总的自身耗时（第三方库 / 本项目各占多少）
+- 累计耗时最高的模块（含其依赖）、自身耗时最高的模块
+
+用法:
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --module app.api.v1 --top 30
+    python scripts/profile_startup.py --prefix app. --top 40    # 只看本项目模块
+"""
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    """单个模块的导入耗时（微秒）"""
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".")[0]
+
+
+def collect(module: str) -> List[ImportRecord]:
+    """在子进程中导入模块，返回 -X importtime 的解析结果"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        tail = "\n".join(line for line in completed.stderr.splitlines() if not line.startswith("import time:"))
+        raise SystemExit(f"导入 {module} 失败:\n{tail}")
+
+    records = []
+    for line in completed.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append(ImportRecord(name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def report(records: List[ImportRecord], module: str, top: int, prefix: str):
+    total_us = sum(r.self_us for r in records)
+    print(f"导入 {module}: {total_us / 1000:.1f} ms，共 {len(records)} 个模块\n")
+
+    by_package = defaultdict(int)
+    for r in records:
+        by_package[r.package] += r.self_us
+    print(f"{'顶层包':<28}{'自身耗时 ms':>12}{'占比':>8}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<28}{self_us / 1000:>12.1f}{self_us / total_us:>8.1%}")
+
+    selected = [r for r in records if r.name.startswith(prefix)] if prefix else records
+    print(f"\n{'累计耗时最高的模块':<48}{'累计 ms':>10}{'自身 ms':>10}")
+    for r in sorted(selected, key=lambda r: -r.cumulative_us)[:top]:
+        print(f"{r.name:<48}{r.cumulative_us / 1000:>10.1f}{r.self_us / 1000:>10.1f}")
+
+    print(f"\n{'自身耗时最高的模块':<48}{'自身 ms':>10}")
+    for r in sorted(selected, key=lambda r: -r.self_us)[:top]:
+        print(f"{r.name:<48}{r.self_us / 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时分析（-X importtime 报告）")
+    parser.add_argument("--module", default="app.main", help="要导入的模块")
+    parser.add_argument("--top", type=int, default=20, help="每个列表显示的条数")
+    parser.add_argument("--prefix", default="", help="只列出以该前缀开头的模块（如 app.）")
+    args = parser.parse_args()
+
+    report(collect(args.module), args.module, args.top, args.prefix)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 from datetime import datetime, date, time, timedelta
 from sqlalchemy import select
 
-from app.core.database import AsyncSessionLocal, init_db
-from app.models.user import User, Address, MemberLevel
+from app.core.database import AsyncSessionLocal
+from app.models.user import User, Address, MemberLevel, UserRole
 from app.models.therapist import Therapist, TherapistSchedule, TherapistTimeSlot
 from app.models.service import Service, ServiceCategory, TherapistService
 
@@ -266,12 +266,13 @@ async def seed_therapist_services(session):
     print(f"✅ 创建了 {len(associations)} 个治疗师-服务关联")
 
 
-async def seed_time_slots(session):
+async def seed_time_slots(session, therapists=None, days: int = 14):
     """创建治疗师时段"""
-    therapists_result = await session.execute(select(Therapist))
-    therapists = list(therapists_result.scalars())
+    if therapists is None:
+        therapists_result = await session.execute(select(Therapist))
+        therapists = list(therapists_result.scalars())
     
-    # 为每个治疗师创建未来 14 天的时段
+    # 为每个治疗师创建未来 days 天的时段
     today = date.today()
     time_slots_data = [
         time(9, 0), time(10, 0), time(11, 0),
@@ -280,7 +281,7 @@ async def seed_time_slots(session):
     
     count = 0
     for therapist in therapists:
-        for day_offset in range(14):
+        for day_offset in range(days):
             slot_date = today + timedelta(days=day_offset)
             
             # 周末减少时段
@@ -361,14 +362,99 @@ async def seed_test_user(session):
     print(f"✅ 创建测试用户: {user.phone}")
 
 
+async def seed_bulk_users(session, count: int, start: int = 0):
+    """批量创建普通用户（每人一个默认地址），用于压测，手机号 1390xxxxxxx"""
+    users = []
+    for i in range(start, start + count):
+        user = User(
+            phone=f"1390{i:07d}",
+            nickname=f"压测用户{i}",
+            points=10000,
+            is_verified=True
+        )
+        session.add(user)
+        users.append(user)
+    
+    await session.flush()
+    
+    for user in users:
+        session.add(Address(
+            user_id=user.id,
+            label="Home",
+            contact_name=user.nickname,
+            contact_phone=user.phone,
+            province="上海市",
+            city="上海市",
+            district="浦东新区",
+            street="陆家嘴环路1000号",
+            latitude=31.2397,
+            longitude=121.4998,
+            is_default=True
+        ))
+    
+    await session.flush()
+    print(f"✅ 创建了 {count} 个压测用户")
+    
+    return users
+
+
+async def seed_bulk_therapists(session, count: int, start: int = 0):
+    """批量创建技师（技师角色账号 + 技师档案 + 全部服务），用于压测，手机号 1370xxxxxxx"""
+    services_result = await session.execute(select(Service))
+    services = list(services_result.scalars())
+    
+    users = []
+    for i in range(start, start + count):
+        user = User(
+            phone=f"1370{i:07d}",
+            nickname=f"压测技师{i}",
+            role=UserRole.THERAPIST,
+            is_verified=True
+        )
+        session.add(user)
+        users.append(user)
+    
+    await session.flush()
+    
+    therapists = []
+    for i, user in enumerate(users, start=start):
+        therapist = Therapist(
+            user_id=user.id,
+            name=f"Bench Therapist {i}",
+            title="按摩师",
+            experience_years=i % 10,
+            specialties=["瑞典式"],
+            rating=4.0 + (i % 10) / 10,
+            review_count=i % 200,
+            base_price=299,
+            is_verified=True,
+            is_featured=i % 10 == 0
+        )
+        session.add(therapist)
+        therapists.append(therapist)
+    
+    await session.flush()
+    
+    for therapist in therapists:
+        for service in services:
+            session.add(TherapistService(
+                therapist_id=therapist.id,
+                service_id=service.id,
+                price=service.base_price
+            ))
+    
+    await session.flush()
+    print(f"✅ 创建了 {count} 个压测技师")
+    
+    return therapists
+
+
 async def main():
     """主函数"""
     print("🚀 开始初始化测试数据...")
     print("-" * 50)
     
-    # 初始化数据库表
-    await init_db()
-    print("✅ 数据库表已创建")
+    # 表结构由 alembic upgrade head 创建（见 scripts/init_db.sh）
     
     async with AsyncSessionLocal() as session:
         try:
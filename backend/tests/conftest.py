@@ -0,0 +1,80 @@
+"""
+测试公共配置
+
+测试不依赖 PostgreSQL / Redis：每个测试使用 tmp_path 下的 SQLite（aiosqlite）新库，按模型建表
+（PostgreSQL 专有的 bookings.during 列和排除约束在 SQLite 上自动跳过）。
+
+环境变量须在导入 app 之前设置。
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_NULL_POOL", "true")
+os.environ.setdefault("SCHEMA_REVISION_CHECK", "off")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+from datetime import date, time, timedelta
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+import app.models  # noqa: F401  注册全部模型
+from app.models.service import Service, ServiceCategory, TherapistService
+from app.models.therapist import Therapist, TherapistTimeSlot
+from app.models.user import Address, User, UserRole
+
+
+async def create_sqlite_engine(path):
+    """创建 SQLite 引擎并建表"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = await create_sqlite_engine(tmp_path / "test.db")
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(engine):
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def bookable(db):
+    """
+    可预约的数据：客户（含地址）、已认证技师、60 分钟服务，明天 10:00~18:00 每小时一个空闲时段
+
+    返回 dict：user、therapist、service、address、date
+    """
+    user = User(phone="13800000001", nickname="客户")
+    therapist_user = User(phone="13900000001", nickname="技师", role=UserRole.THERAPIST)
+    category = ServiceCategory(name="按摩", name_en="Massage")
+    db.add_all([user, therapist_user, category])
+    await db.flush()
+
+    service = Service(category_id=category.id, name="全身按摩", name_en="Full Body", base_price=300, duration=60)
+    therapist = Therapist(user_id=therapist_user.id, name="技师", title="按摩师", is_verified=True)
+    address = Address(
+        user_id=user.id, contact_name="客户", contact_phone="13800000001",
+        province="上海市", city="上海市", district="浦东新区", street="世纪大道 1 号",
+    )
+    db.add_all([service, therapist, address])
+    await db.flush()
+
+    slot_date = date.today() + timedelta(days=1)
+    db.add(TherapistService(therapist_id=therapist.id, service_id=service.id))
+    db.add_all([
+        TherapistTimeSlot(
+            therapist_id=therapist.id, date=slot_date, start_time=time(hour), end_time=time(hour + 1),
+        )
+        for hour in range(10, 18)
+    ])
+    await db.commit()
+    return {"user": user, "therapist": therapist, "service": service, "address": address, "date": slot_date}
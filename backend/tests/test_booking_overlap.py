@@ -0,0 +1,72 @@
+"""
+预约区间重叠检查（SQLite 路径）
+
+SQLite 没有 bookings.during 列和排除约束，create_booking 用 slot_engine.has_booking_overlap 预检查。
+"""
+from datetime import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.booking import Booking, BookingStatus
+from app.schemas.booking import BookingCreate
+from app.services import slot_engine
+from app.services.booking_pipeline import create_booking
+
+
+async def add_booking(db, data, start, end, status=BookingStatus.PENDING):
+    """直接写入一条已有预约（不锁定时段，只由区间重叠检查拦截）"""
+    db.add(Booking(
+        booking_no=f"BK-{start.hour}-{status.value}",
+        user_id=data["user"].id,
+        therapist_id=data["therapist"].id,
+        service_id=data["service"].id,
+        address_id=data["address"].id,
+        booking_date=data["date"],
+        start_time=start,
+        end_time=end,
+        duration=(end.hour - start.hour) * 60,
+        service_price=300,
+        total_price=300,
+        status=status,
+    ))
+    await db.commit()
+
+
+def booking_request(data, start_time):
+    return BookingCreate(
+        therapist_id=data["therapist"].id,
+        service_id=data["service"].id,
+        address_id=data["address"].id,
+        booking_date=data["date"],
+        start_time=start_time,
+    )
+
+
+@pytest.mark.asyncio
+async def test_has_booking_overlap(db, bookable):
+    await add_booking(db, bookable, time(14), time(16))
+    await add_booking(db, bookable, time(10), time(11), status=BookingStatus.CANCELLED)
+    therapist_id, slot_date = bookable["therapist"].id, bookable["date"]
+
+    assert await slot_engine.has_booking_overlap(db, therapist_id, slot_date, (900, 960))
+    # 已取消的预约不占用时段
+    assert not await slot_engine.has_booking_overlap(db, therapist_id, slot_date, (600, 660))
+    # 首尾相接不算重叠
+    assert not await slot_engine.has_booking_overlap(db, therapist_id, slot_date, (960, 1020))
+
+
+@pytest.mark.asyncio
+async def test_create_booking_rejects_overlap_on_sqlite(db, bookable):
+    assert db.bind.dialect.name == "sqlite"
+    await add_booking(db, bookable, time(14), time(16))
+
+    # 预检查在任何写入之前拒绝，会话无需回滚即可继续使用
+    with pytest.raises(HTTPException) as exc:
+        await create_booking(db, bookable["user"], booking_request(bookable, "15:00"))
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "该时段已被预约"
+
+    booking = await create_booking(db, bookable["user"], booking_request(bookable, "16:00"))
+    await db.commit()
+    assert booking.start_time == time(16)
@@ -0,0 +1,102 @@
+"""
+读写路由（app.core.database）
+
+用两个 SQLite 库代替主库和只读副本：两边建同样的表，各写入一条名称不同的服务分类，
+读到哪一条即可判断查询落在哪个库上。
+"""
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.datastructures import State
+
+from app.core import database
+from app.core.config import settings
+from app.models.service import ServiceCategory
+from tests.conftest import create_sqlite_engine
+
+
+@pytest_asyncio.fixture
+async def routed(tmp_path, monkeypatch):
+    """把 app.core.database 的主库 / 副本引擎、会话工厂和延迟检查替换为两个本地 SQLite 库"""
+    primary = await create_sqlite_engine(tmp_path / "primary.db")
+    replica = await create_sqlite_engine(tmp_path / "replica.db")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        async with engine.begin() as conn:
+            await conn.execute(ServiceCategory.__table__.insert().values(name=name, name_en=name))
+
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "read_engine", replica)
+    monkeypatch.setattr(
+        database, "_primary_autocommit", primary.sync_engine.execution_options(isolation_level="AUTOCOMMIT")
+    )
+    monkeypatch.setattr(
+        database, "_replica_autocommit", replica.sync_engine.execution_options(isolation_level="AUTOCOMMIT")
+    )
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(
+        primary, class_=AsyncSession, expire_on_commit=False, autoflush=False,
+    ))
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", async_sessionmaker(
+        primary, class_=AsyncSession, sync_session_class=database.RoutingSession,
+        expire_on_commit=False, autoflush=False,
+    ))
+    monitor = database.ReplicaMonitor()
+    monkeypatch.setattr(database, "replica_monitor", monitor)
+    # SQLite 没有 pg_last_xact_replay_timestamp()，延迟查询换成返回固定值
+    monkeypatch.setattr(monitor, "LAG_SQL", text("SELECT 0"))
+
+    yield monitor
+    await primary.dispose()
+    await replica.dispose()
+
+
+def request():
+    """只带 state 的请求连接（get_db / get_read_db 只用到 connection.state）"""
+    return SimpleNamespace(state=State())
+
+
+async def read_names(connection):
+    """通过 get_read_db 读取全部分类名称"""
+    async for session in database.get_read_db(connection):
+        names = set((await session.execute(select(ServiceCategory.name))).scalars())
+    return names
+
+
+@pytest.mark.asyncio
+async def test_read_session_uses_replica(routed):
+    assert await read_names(request()) == {"replica"}
+
+
+@pytest.mark.asyncio
+async def test_read_after_write_in_same_request_uses_primary(routed):
+    connection = request()
+    async for session in database.get_db(connection):
+        session.add(ServiceCategory(name="new", name_en="new"))
+        await session.flush()
+    assert connection.state.db_written is True
+
+    # 同一请求写过主库后读主库，能读到刚提交的数据；其他请求仍读副本
+    assert await read_names(connection) == {"primary", "new"}
+    assert await read_names(request()) == {"replica"}
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(routed, monkeypatch):
+    monkeypatch.setattr(routed, "LAG_SQL", text(f"SELECT {settings.DATABASE_READ_MAX_LAG_SECONDS + 1}"))
+    assert await read_names(request()) == {"primary"}
+    assert routed.lag == settings.DATABASE_READ_MAX_LAG_SECONDS + 1
+
+    # 检查间隔内沿用缓存的结果；间隔过后重新检查，延迟恢复后回到副本
+    monkeypatch.setattr(routed, "LAG_SQL", text("SELECT 0"))
+    assert await read_names(request()) == {"primary"}
+    monkeypatch.setattr(settings, "DATABASE_READ_LAG_CHECK_SECONDS", 0)
+    assert await read_names(request()) == {"replica"}
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(routed, monkeypatch):
+    monkeypatch.setattr(routed, "LAG_SQL", text("SELECT pg_is_in_recovery()"))
+    assert await read_names(request()) == {"primary"}
+    assert routed.lag is None
@@ -0,0 +1,55 @@
+"""
+按用户吊销 Token（app.core.token_revocation，未连接 Redis 的进程内模式）
+"""
+import time
+
+import pytest
+
+from app.core.security import create_access_token, verify_token
+from app.core.token_revocation import TokenRevocationStore
+
+
+class FrozenClock:
+    """可手动拨动的 time.time()（签发和吊销共用）"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def is_revoked(store, token):
+    data = verify_token(token)
+    return await store.is_revoked(data["jti"], int(data["user_id"]), data["iat"])
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_keeps_tokens_issued_later_in_same_second(monkeypatch):
+    clock = FrozenClock(1_700_000_000.2)
+    monkeypatch.setattr(time, "time", clock)
+    store = TokenRevocationStore()
+
+    before = create_access_token(1)
+    other_user = create_access_token(2)
+    clock.now = 1_700_000_000.5
+    assert await store.revoke_user(1) is False
+
+    # 同一秒内、吊销之后重新登录签发的 Token 仍然有效
+    clock.now = 1_700_000_000.8
+    after = create_access_token(1)
+
+    assert await is_revoked(store, before)
+    assert not await is_revoked(store, after)
+    assert not await is_revoked(store, other_user)
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_covers_whole_second_tokens(monkeypatch):
+    """整数秒 iat（旧 Token）在吊销时刻之前签发的同样失效"""
+    store = TokenRevocationStore()
+    monkeypatch.setattr(time, "time", FrozenClock(1_700_000_000.5))
+    await store.revoke_user(1)
+
+    assert await store.is_revoked(None, 1, 1_700_000_000)
+    assert not await store.is_revoked(None, 1, 1_700_000_001)
@@ -0,0 +1,85 @@
+"""
+链路追踪（app.core.tracing，TRACING_EXPORTER=memory）
+
+用一个最小的 FastAPI 应用覆盖三类 span：路由、SQL（SQLite 引擎）和推送发送（push.*，外部请求由 MockTransport 应答）。
+"""
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from app.core import http_client, tracing
+from app.core.config import settings
+from app.services.push_notification import ExpoPushService
+
+
+def build_app(engine):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await ExpoPushService.send_push_notification(["ExponentPushToken[test]"], "标题", "内容")
+        return {"id": item_id}
+
+    return app
+
+
+def otel_middlewares(app):
+    return [m for m in app.user_middleware if m.cls.__name__ == "OpenTelemetryMiddleware"]
+
+
+@pytest_asyncio.fixture
+async def traced(engine, monkeypatch):
+    """启用追踪（内存导出器、全部采样），测试结束时撤销埋点"""
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "memory")
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATIO", 1.0)
+    expo = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"data": []})))
+    monkeypatch.setattr(http_client, "_client", expo)
+
+    app = build_app(engine)
+    tracing.setup_tracing(app, [engine])
+    yield app
+    tracing.shutdown_tracing()
+    await expo.aclose()
+
+
+@pytest.mark.asyncio
+async def test_request_records_route_sql_and_push_spans(traced):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=traced), base_url="http://test") as client:
+        response = await client.get("/items/1")
+    assert response.status_code == 200
+
+    spans = tracing.memory_exporter().get_finished_spans()
+    names = [s.name for s in spans]
+    assert "GET /items/{item_id}" in names
+    assert "push.expo.send" in names
+    sql = [s for s in spans if s.attributes.get("db.statement") == "SELECT 1"]
+    assert len(sql) == 1
+
+    # 同一条链路：SQL 和推送 span 都挂在路由 span 下
+    route = next(s for s in spans if s.name == "GET /items/{item_id}")
+    push = next(s for s in spans if s.name == "push.expo.send")
+    assert {sql[0].context.trace_id, push.context.trace_id} == {route.context.trace_id}
+
+
+@pytest.mark.asyncio
+async def test_setup_and_shutdown_are_symmetric(traced, engine):
+    # 重复调用不会重复埋点
+    tracing.setup_tracing(traced, [engine])
+    assert len(otel_middlewares(traced)) == 1
+
+    tracing.shutdown_tracing()
+    assert otel_middlewares(traced) == []
+
+    # 撤销后可以重新启用（Starlette 应用启动后不能再添加中间件，用新的应用），SQL 埋点只注册一次
+    app = build_app(engine)
+    tracing.setup_tracing(app, [engine])
+    assert len(otel_middlewares(app)) == 1
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 2"))
+    sql = [s for s in tracing.memory_exporter().get_finished_spans() if s.attributes.get("db.statement") == "SELECT 2"]
+    assert len(sql) == 1
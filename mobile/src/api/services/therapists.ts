@@ -123,14 +123,16 @@ export const therapistsApi = {
   },
 
   /**
-   * 获取治疗师评价
+   * 获取治疗师评价（游标分页，下一页游标见响应头 X-Next-Cursor）
    */
   getReviews(
     therapistId: number, 
-    page: number = 1, 
-    pageSize: number = 20
+    pageSize: number = 20,
+    cursor?: string
   ): Promise<TherapistReviewResponse[]> {
-    return api.get(`/therapists/${therapistId}/reviews?page=${page}&page_size=${pageSize}`);
+    const params = new URLSearchParams({ page_size: String(pageSize) });
+    if (cursor) params.append('cursor', cursor);
+    return api.get(`/therapists/${therapistId}/reviews?${params.toString()}`);
   },
 
   /**
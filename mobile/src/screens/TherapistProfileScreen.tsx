@@ -78,7 +78,7 @@ export default function TherapistProfileScreen() {
       // 并行请求
       const [therapistData, reviewsData, availabilityData, ratingData] = await Promise.all([
         therapistsApi.getTherapistDetail(id),
-        therapistsApi.getReviews(id, 1, 10),
+        therapistsApi.getReviews(id, 10),
         therapistsApi.getAvailability(id, startDate, endDate),
         therapistsApi.getRatingDistribution(id),
       ]);
@@ -20,15 +20,15 @@ const financeApi = {
     client.post<WithdrawalRecord>('/therapist/finance/withdrawals', data),
 
   /**
-   * 获取提现记录
+   * 获取提现记录（游标分页，下一页游标见响应头 X-Next-Cursor）
    */
-  getWithdrawals: (params?: { skip?: number; limit?: number }) =>
+  getWithdrawals: (params?: { cursor?: string; limit?: number; status?: string; start?: string; end?: string }) =>
     client.get<WithdrawalRecord[]>('/therapist/finance/withdrawals', { params }),
 
   /**
-   * 获取资金流水
+   * 获取资金流水（游标分页，下一页游标见响应头 X-Next-Cursor）
    */
-  getTransactions: (params?: { skip?: number; limit?: number }) =>
+  getTransactions: (params?: { cursor?: string; limit?: number; type?: string; start?: string; end?: string }) =>
     client.get<TransactionRecord[]>('/therapist/finance/transactions', { params }),
 };
 